@@ -1,17 +1,44 @@
+from .colorConversion import UYVYConverter
 from .eventsystem import EventSystem
+from .frameFingerprint import FrameFingerprint
+from .metrics import MetricsServer, MetricsWriter
+from .receiveWorker import ReceiveWorker
+from .stagingPool import StagingBufferPool
+from .streamReaper import StreamReaper
+from .streamScheduler import StreamScheduler
+from .telemetry import StreamStats, StreamTelemetry
+from .tracing import Tracer, TraceTrack
 
 import carb.profiler
+import carb.settings
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 import logging
+import math
 from .deps import NDIlib as ndi
 import numpy as np
 import omni.ui
 import threading
 import time
-from typing import List
+from typing import Dict, List, Tuple
 import warp as wp
 
 
 class NDItools():
+    SETTING_WORKER_PROCESS = "/exts/mf.ov.ndi/receiveInWorkerProcess"
+    SETTING_WORKER_SLOT_COUNT = "/exts/mf.ov.ndi/workerSlotCount"
+    SETTING_NATIVE_COLOR = "/exts/mf.ov.ndi/nativeColorConversion"
+    SETTING_COLORIMETRY = "/exts/mf.ov.ndi/colorimetry"
+    SETTING_STATIC_DETECTION = "/exts/mf.ov.ndi/staticFrameDetection"
+    SETTING_STATIC_REFRESH = "/exts/mf.ov.ndi/staticFrameRefreshInterval"
+    SETTING_TRACING = "/exts/mf.ov.ndi/tracing"
+    SETTING_METRICS = "/exts/mf.ov.ndi/metricsEnabled"
+    SETTING_METRICS_PORT = "/exts/mf.ov.ndi/metricsPort"
+    DEFAULT_METRICS_PORT = 9464
+    SETTING_WARM_TTL = "/exts/mf.ov.ndi/warmReceiverTTL"
+    START_WORKERS = 4  # receivers created concurrently by start_stream_async
+
     def __init__(self):
         self._ndi_ok = False
         self._ndi_find = None
@@ -22,7 +49,25 @@ class NDItools():
         self._finder = None
         self._create_finder()
 
-        self._streams = []
+        self._streams = []  # Every running stream, a receiver shared by many dynamic textures is only once in there
+        self._streams_by_id: Dict[str, object] = {}
+        self._receivers: Dict[Tuple[str, bool], NDIVideoStream] = {}  # (source, lowbandwidth) -> shared receiver
+        self._scheduler = StreamScheduler()
+        self._reaper = StreamReaper(self._scheduler)
+        self._executor = ThreadPoolExecutor(NDItools.START_WORKERS, thread_name_prefix="mf.ov.ndi.start")
+        self._pending_receivers: Dict[Tuple[str, bool], Future] = {}  # (source, lowbandwidth) -> receiver creation
+        self._pending_starts: Dict[str, PendingStart] = {}  # dynamic id -> start waiting for its first frame
+        self._standbys: Dict[str, Dict[str, Standby]] = {}  # dynamic id -> source -> low bandwidth receiver kept warm
+        self._abandoned_standbys: List[Future] = []  # Creations of standbys removed before they were done
+        self._warm: Dict[Tuple[str, bool], WarmReceiver] = {}  # (source, lowbandwidth) -> stopped, still connected
+        self._warp_lock = threading.Lock()
+        settings = carb.settings.get_settings()
+        self._tracer = Tracer(bool(settings.get(NDItools.SETTING_TRACING)))
+        self._tracing_sub = settings.subscribe_to_node_change_events(NDItools.SETTING_TRACING,
+                                                                     self._on_tracing_setting_changed)
+
+        self._metrics_server: MetricsServer = None
+        self._create_metrics_server()
 
         stream = omni.kit.app.get_app().get_update_event_stream()
         self._sub = stream.create_subscription_to_pop(self._on_update, name="update")
@@ -30,14 +75,27 @@ class NDItools():
     def destroy(self):
         self._sub.unsubscribe()
         self._sub = None
+        carb.settings.get_settings().unsubscribe_to_change_events(self._tracing_sub)
+        self._tracing_sub = None
+
+        if self._metrics_server is not None:
+            self._metrics_server.destroy()
+            self._metrics_server = None
 
         self._finder.destroy()
 
-        for stream in self._streams:
-            stream.destroy()
-        self._streams.clear()
+        self.stop_all_streams()
+        self._executor.shutdown(wait=True)
+        self._update_pending_starts()  # Reaps the receivers created after their start was cancelled
+        self._update_standbys()
+        reaped = self._reaper.destroy()
+        self._scheduler.destroy()
 
-        if self._ndi_ok:
+        if not reaped:
+            # Destroying the library under a receiver still shutting down could crash Kit, leaking it is safer
+            logger = logging.getLogger(__name__)
+            logger.error("NDI® was not destroyed, some receivers didn't shut down in time")
+        elif self._ndi_ok:
             if self._ndi_find is not None:
                 ndi.find_destroy(self._ndi_find)
             ndi.destroy()
@@ -47,15 +105,21 @@ class NDItools():
         return self._ndi_ok
 
     def _on_update(self, e):
+        self._update_pending_starts()
+        self._update_standbys()
+        self._update_warm_receivers()
+
         to_remove = []
         for stream in self._streams:
             if not stream.is_running():
                 to_remove.append(stream)
 
         for stream in to_remove:
-            self._streams.remove(stream)
-            EventSystem.send_event(EventSystem.STREAM_STOP_TIMEOUT_EVENT, payload={"dynamic_id": stream.get_id()})
-            stream.destroy()
+            dynamic_ids = stream.get_ids()
+            self._forget_stream(stream)
+            for dynamic_id in dynamic_ids:
+                EventSystem.send_event(EventSystem.STREAM_STOP_TIMEOUT_EVENT, payload={"dynamic_id": dynamic_id})
+            self._destroy_stream(stream)
 
     def _ndi_init(self):
         if not ndi.initialize():
@@ -78,106 +142,696 @@ class NDItools():
     def get_ndi_find(self):
         return self._ndi_find
 
-    def get_stream(self, dynamic_id):
-        return next((x for x in self._streams if x.get_id() == dynamic_id), None)
+    def get_sources(self) -> List[str]:
+        return self._finder.get_sources() if self._finder is not None else []
 
-    def try_add_stream(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool,
-                       update_fps_fn, update_dimensions_fn) -> bool:
-        stream: NDIVideoStream = NDIVideoStream(dynamic_id, ndi_source, lowbandwidth, self,
-                                                update_fps_fn, update_dimensions_fn)
-        if not stream.is_ok:
+    def find_source(self, name: str):
+        """The ndi.Source of that name, waits a moment if it wasn't discovered yet. None if it doesn't show up."""
+        return self._finder.find_source(name) if self._finder is not None else None
+
+# region metrics
+    def _create_metrics_server(self):
+        settings = carb.settings.get_settings()
+        if not settings.get(NDItools.SETTING_METRICS):
+            return
+
+        port = settings.get(NDItools.SETTING_METRICS_PORT) or NDItools.DEFAULT_METRICS_PORT
+        try:
+            self._metrics_server = MetricsServer(self.collect_metrics, port)
+        except OSError as e:
             logger = logging.getLogger(__name__)
-            logger.error(f"Error opening stream: {ndi_source}")
-            return False
+            logger.error(f"Could not serve NDI® metrics on port {port}: {e}")
+
+    def collect_metrics(self) -> str:
+        """Prometheus text page of the sources and streams, called from the metrics server thread."""
+        writer = MetricsWriter()
+        streams = list(self._streams)
+        bindings = list(self._streams_by_id.items())
+        receivers = [x for x in streams if isinstance(x, NDIVideoStream)]
+
+        writer.declare("mf_ndi_sources_discovered", MetricsWriter.GAUGE, "NDI sources found on the network")
+        writer.sample("mf_ndi_sources_discovered", len(self.get_sources()))
+        writer.declare("mf_ndi_streams_running", MetricsWriter.GAUGE, "Receivers running, shared ones counted once")
+        writer.sample("mf_ndi_streams_running", len(streams))
+        writer.declare("mf_ndi_binding_streaming", MetricsWriter.GAUGE, "Dynamic textures playing a stream")
+        for dynamic_id, stream in bindings:
+            writer.sample("mf_ndi_binding_streaming", 1, {"dynamic_id": dynamic_id, "source": stream.get_source()})
+
+        writer.declare("mf_ndi_frames_received_total", MetricsWriter.COUNTER, "Video frames received")
+        writer.declare("mf_ndi_frames_dropped_total", MetricsWriter.COUNTER,
+                       "Video frames received but replaced by a newer one before being uploaded")
+        writer.declare("mf_ndi_frames_torn_total", MetricsWriter.COUNTER,
+                       "Video frames overwritten in shared memory while uploaded, worker receivers only")
+        writer.declare("mf_ndi_frames_oversized_total", MetricsWriter.COUNTER,
+                       "Video frames too large for a shared memory slot, worker receivers only")
+        writer.declare("mf_ndi_sdk_frames_dropped_total", MetricsWriter.COUNTER,
+                       "Video frames dropped by the NDI receiver, in process receivers only")
+        writer.declare("mf_ndi_frames_unchanged_total", MetricsWriter.COUNTER,
+                       "Video frames not uploaded because identical to the previous one")
+        writer.declare("mf_ndi_received_bytes_total", MetricsWriter.COUNTER, "Bytes of video frames received")
+        writer.declare("mf_ndi_received_bytes_per_second", MetricsWriter.GAUGE,
+                       "Size of the last video frame times the current frame rate")
+        writer.declare("mf_ndi_upload_seconds", MetricsWriter.HISTOGRAM, "Time spent converting and uploading frames")
+        writer.declare("mf_ndi_staging_hits_total", MetricsWriter.COUNTER,
+                       "Uploads into a buffer already in the staging pool of the receiver")
+        writer.declare("mf_ndi_staging_misses_total", MetricsWriter.COUNTER,
+                       "Uploads that allocated a buffer in the staging pool of the receiver")
+        writer.declare("mf_ndi_staging_bytes", MetricsWriter.GAUGE, "Bytes held by the staging pool of the receiver")
+        for stream in receivers:
+            labels = stream.get_metrics_labels()
+            writer.sample("mf_ndi_frames_received_total", stream.get_frames_received(), labels)
+            writer.sample("mf_ndi_frames_dropped_total", stream.get_frames_dropped(), labels)
+            writer.sample("mf_ndi_frames_torn_total", stream.get_frames_torn(), labels)
+            writer.sample("mf_ndi_frames_oversized_total", stream.get_frames_oversized(), labels)
+            writer.sample("mf_ndi_sdk_frames_dropped_total", stream.get_telemetry_recorder().get_sdk_frames_dropped(),
+                          labels)
+            writer.sample("mf_ndi_frames_unchanged_total", stream.get_uploads_unchanged(), labels)
+            writer.sample("mf_ndi_received_bytes_total", stream.get_bytes_received(), labels)
+            writer.sample("mf_ndi_received_bytes_per_second", stream.get_bytes_per_second(), labels)
+            bounds, counts, total = stream.get_telemetry_recorder().get_upload_histogram()
+            writer.histogram("mf_ndi_upload_seconds", bounds, counts, total, labels)
+            staging = stream.get_staging_pool_stats()
+            writer.sample("mf_ndi_staging_hits_total", staging["hits"], labels)
+            writer.sample("mf_ndi_staging_misses_total", staging["misses"], labels)
+            writer.sample("mf_ndi_staging_bytes", staging["bytes_allocated"], labels)
+        return writer.to_text()
+# endregion
+
+    def get_reaper_pending_count(self) -> int:
+        """Streams stopped but still being torn down in the background."""
+        return self._reaper.get_pending_count()
+
+    def get_tracer(self) -> Tracer:
+        return self._tracer
+
+    def _on_tracing_setting_changed(self, item, event_type):
+        recording = bool(carb.settings.get_settings().get(NDItools.SETTING_TRACING))
+        if recording != self._tracer.is_recording():
+            self._tracer.set_recording(recording)
+            EventSystem.send_event(EventSystem.TRACING_CHANGED_EVENT, payload={"recording": recording})
+
+    def dump_trace(self, path: str):
+        """Writes the spans recorded for every stream as Chrome trace JSON, open it in chrome://tracing or Perfetto."""
+        self._tracer.dump(path)
+
+    def get_scheduler_queue_depth(self) -> int:
+        return self._scheduler.get_queue_depth()
 
-        self._streams.append(stream)
+    def get_stream(self, dynamic_id):
+        return self._streams_by_id.get(dynamic_id, None)
+
+    def try_add_stream(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool, lowlatency: bool = False,
+                       region: Tuple[int, int, int, int] = None, max_fps: float = 0.0) -> bool:
+        # Dynamic textures bound to the same source and bandwidth share a single receiver, even with different regions
+        key = (ndi_source, lowbandwidth)
+        stream: NDIVideoStream = self._receivers.get(key, None)
+        if stream is None or not stream.is_running():
+            stream = self._take_warm_receiver(key)
+        if stream is None:
+            stream = self._create_receiver(ndi_source, lowbandwidth)
+            if stream is None:
+                logger = logging.getLogger(__name__)
+                logger.error(f"Error opening stream: {ndi_source}")
+                return False
+            self._receivers[key] = stream
+            self._streams.append(stream)
+            self._scheduler.add(stream)
+
+        stream.add_target(dynamic_id, lowlatency, region, max_fps)
+        self._streams_by_id[dynamic_id] = stream
+        return True
+
+# region async start
+    def start_stream_async(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool, lowlatency: bool = False,
+                           region: Tuple[int, int, int, int] = None, max_fps: float = 0.0) -> Future:
+        """
+        Like try_add_stream without blocking: the receiver is created on a worker thread. The future resolves on the
+        main thread, to True once the first video frame arrived or to False if the stream couldn't start or was stopped.
+        """
+        return self._start(dynamic_id, ndi_source, lowbandwidth, lowlatency, region, max_fps)
+
+    def _start(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool, lowlatency: bool,
+               region: Tuple[int, int, int, int], max_fps: float, replaces: bool = False) -> Future:
+        future = Future()
+        key = (ndi_source, lowbandwidth)
+        start = PendingStart(dynamic_id, key, lowlatency, region, max_fps, future, replaces)
+        self._pending_starts[dynamic_id] = start
+
+        stream: NDIVideoStream = self._receivers.get(key, None)
+        if stream is None or not stream.is_running():
+            stream = self._take_warm_receiver(key)
+        if stream is not None:
+            self._attach_start(start, stream)
+        elif key not in self._pending_receivers:
+            self._pending_receivers[key] = self._executor.submit(self._create_receiver, ndi_source, lowbandwidth)
+        return future
+
+    def is_stream_pending(self, dynamic_id: str) -> bool:
+        return dynamic_id in self._pending_starts
+
+    def get_pending_start(self, dynamic_id: str) -> Future:
+        """Future of the start waiting for its first frame, None if the dynamic texture isn't starting."""
+        start = self._pending_starts.get(dynamic_id, None)
+        return start.future if start is not None and not start.replaces else None
+
+    def _attach_start(self, start: "PendingStart", stream: "NDIVideoStream"):
+        start.stream = stream
+        if not start.replaces:
+            stream.add_target(start.dynamic_id, start.lowlatency, start.region, start.max_fps)
+            self._streams_by_id[start.dynamic_id] = stream
+
+    def _finish_start(self, start: "PendingStart", result: bool):
+        del self._pending_starts[start.dynamic_id]
+        stream = start.stream
+        if not result and stream is not None and len(stream.get_ids()) == 0 and stream in self._streams:
+            # A receiver opened to replace a stream, that nothing else uses
+            if not any(x.stream is stream for x in self._pending_starts.values()):
+                self._forget_stream(stream)
+                self._destroy_stream(stream)
+        start.future.set_result(result)
+
+    def _update_pending_starts(self):
+        for key, creation in list(self._pending_receivers.items()):
+            if not creation.done():
+                continue
+            del self._pending_receivers[key]
+
+            starts = [x for x in self._pending_starts.values() if x.key == key and x.stream is None]
+            try:
+                stream: NDIVideoStream = creation.result()
+            except Exception as e:
+                stream = None
+                logger = logging.getLogger(__name__)
+                logger.error(f"Could not create NDI® receiver: {e}")
+
+            if stream is None:
+                logger = logging.getLogger(__name__)
+                logger.error(f"Error opening stream: {key[0]}")
+                for start in starts:
+                    self._finish_start(start, False)
+                continue
+
+            running: NDIVideoStream = self._receivers.get(key, None)
+            if running is not None and running.is_running():
+                self._destroy_stream(stream)  # try_add_stream opened the same receiver in the meantime
+                stream = running
+            elif len(starts) == 0:
+                self._destroy_stream(stream)  # Every start was cancelled while the receiver was created
+                continue
+            else:
+                self._receivers[key] = stream
+                self._streams.append(stream)
+                self._scheduler.add(stream)
+
+            for start in starts:
+                self._attach_start(start, stream)
+
+        for start in [x for x in self._pending_starts.values() if x.stream is not None]:
+            if start.stream.get_frames_received() > 0:
+                if start.replaces:
+                    self._finish_start(start, self._cut_over(start.dynamic_id, start.stream, start.lowlatency,
+                                                             start.region, start.max_fps))
+                else:
+                    self._finish_start(start, True)
+            elif not start.stream.is_running():
+                self._finish_start(start, False)
+# endregion
+
+# region standby
+    def add_standby(self, dynamic_id: str, ndi_source: str) -> Future:
+        """
+        Keeps a low bandwidth receiver of the source connected for the dynamic texture, so switch_stream can cut over
+        to it right away. The future resolves on the main thread, to True once the standby receives frames.
+        """
+        standbys = self._standbys.setdefault(dynamic_id, {})
+        standby = standbys.get(ndi_source, None)
+        if standby is None:
+            creation = self._executor.submit(self._create_receiver, ndi_source, True)
+            standby = Standby(ndi_source, creation, Future())
+            standbys[ndi_source] = standby
+        return standby.ready
+
+    def remove_standby(self, dynamic_id: str, ndi_source: str):
+        standby = self._standbys.get(dynamic_id, {}).pop(ndi_source, None)
+        if standby is not None:
+            self._drop_standby(standby)
+
+    def get_standbys(self, dynamic_id: str) -> Dict[str, bool]:
+        """Standby sources of the dynamic texture, and whether each of them receives frames already."""
+        standbys = self._standbys.get(dynamic_id, {})
+        return {source: x.ready.done() and x.ready.result() for source, x in standbys.items()}
+
+    def switch_stream(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool, lowlatency: bool = False,
+                      region: Tuple[int, int, int, int] = None, max_fps: float = 0.0) -> Future:
+        """
+        Moves a playing dynamic texture to another source. From a ready standby, the texture is cut over to it on its
+        next frame, and in high bandwidth to a new high bandwidth receiver once that one receives frames. Without a
+        ready standby, the stream is restarted like with start_stream_async. Resolves like start_stream_async.
+        """
+        standby = self._standbys.get(dynamic_id, {}).get(ndi_source, None)
+        if self.get_stream(dynamic_id) is None or standby is None or not self.get_standbys(dynamic_id)[ndi_source]:
+            self.stop_stream(dynamic_id)
+            return self.start_stream_async(dynamic_id, ndi_source, lowbandwidth, lowlatency, region, max_fps)
+
+        # A receiver of the source, low bandwidth, already shared by other dynamic textures is used as is
+        key = (ndi_source, True)
+        stream: NDIVideoStream = self._receivers.get(key, None)
+        if stream is None or not stream.is_running():
+            del self._standbys[dynamic_id][ndi_source]
+            stream = standby.stream
+            self._receivers[key] = stream
+            self._streams.append(stream)
+        start = self._pending_starts.get(dynamic_id, None)
+        if start is not None:
+            self._finish_start(start, False)
+        self._cut_over(dynamic_id, stream, lowlatency, region, max_fps)
+
+        if lowbandwidth:
+            future = Future()
+            future.set_result(True)
+            return future
+        return self._start(dynamic_id, ndi_source, False, lowlatency, region, max_fps, replaces=True)
+
+    def _cut_over(self, dynamic_id: str, stream: "NDIVideoStream", lowlatency: bool,
+                  region: Tuple[int, int, int, int], max_fps: float) -> bool:
+        """Moves the dynamic texture from its stream to another one, False if it stopped playing in the meantime."""
+        previous = self._streams_by_id.get(dynamic_id, None)
+        if previous is None:
+            return False
+        if previous is stream:
+            return True
+
+        # The new stream overwrites the last frame of the previous one, it doesn't get its final frame
+        if previous.remove_target(dynamic_id, release=False) == 0:
+            self._forget_stream(previous)
+            self._park_stream(previous)
+        stream.add_target(dynamic_id, lowlatency, region, max_fps)
+        self._streams_by_id[dynamic_id] = stream
         return True
 
+    def _drop_standby(self, standby: "Standby"):
+        if standby.stream is not None:
+            self._destroy_stream(standby.stream)
+        elif not standby.creation.done():
+            self._abandoned_standbys.append(standby.creation)
+        if not standby.ready.done():
+            standby.ready.set_result(False)
+
+    def _update_standbys(self):
+        """Sends STANDBYS_CHANGED_EVENT for the dynamic textures whose standbys stopped or became ready."""
+        for creation in [x for x in self._abandoned_standbys if x.done()]:
+            self._abandoned_standbys.remove(creation)
+            if creation.exception() is None and creation.result() is not None:
+                self._destroy_stream(creation.result())
+
+        changed: List[str] = []
+        for dynamic_id, standbys in self._standbys.items():
+            for source, standby in list(standbys.items()):
+                if standby.stream is None:
+                    if not standby.creation.done():
+                        continue
+                    try:
+                        standby.stream = standby.creation.result()
+                    except Exception as e:
+                        logger = logging.getLogger(__name__)
+                        logger.error(f"Could not create NDI® receiver: {e}")
+                    if standby.stream is None:
+                        logger = logging.getLogger(__name__)
+                        logger.error(f"Error opening standby stream: {source}")
+                        del standbys[source]
+                        standby.ready.set_result(False)
+                        changed.append(dynamic_id)
+                        continue
+                    # Without dynamic texture, the frames are received and freed right away
+                    self._scheduler.add(standby.stream)
+
+                if not standby.stream.is_running():
+                    logger = logging.getLogger(__name__)
+                    logger.warning(f"Standby stream stopped: {source}")
+                    del standbys[source]
+                    self._drop_standby(standby)
+                    changed.append(dynamic_id)
+                elif not standby.ready.done() and standby.stream.get_frames_received() > 0:
+                    standby.ready.set_result(True)
+                    changed.append(dynamic_id)
+
+        for dynamic_id in dict.fromkeys(changed):
+            EventSystem.send_event(EventSystem.STANDBYS_CHANGED_EVENT, payload={"dynamic_id": dynamic_id})
+
+    def remove_standbys(self, dynamic_id: str):
+        for standby in self._standbys.pop(dynamic_id, {}).values():
+            self._drop_standby(standby)
+
+    def get_standby_ids(self) -> List[str]:
+        return list(self._standbys.keys())
+
+    def _stop_all_standbys(self):
+        for standbys in self._standbys.values():
+            for standby in standbys.values():
+                self._drop_standby(standby)
+        self._standbys.clear()
+# endregion
+
+# region warm receivers
+    def _park_stream(self, stream):
+        """
+        A receiver no dynamic texture uses anymore stays connected for a moment, so binding its source again doesn't
+        reconnect. It is destroyed right away when the warm pool is disabled.
+        """
+        ttl = carb.settings.get_settings().get(NDItools.SETTING_WARM_TTL) or 0.0
+        if ttl <= 0 or not isinstance(stream, NDIVideoStream) or not stream.is_running():
+            self._destroy_stream(stream)
+            return
+
+        key = stream.get_receiver_key()
+        previous = self._warm.pop(key, None)
+        if previous is not None:
+            self._destroy_stream(previous.stream)
+        self._warm[key] = WarmReceiver(stream, time.monotonic() + ttl)
+
+    def _take_warm_receiver(self, key: Tuple[str, bool]) -> "NDIVideoStream":
+        """The warm receiver of that source and bandwidth, running again as a shared receiver. None if there isn't."""
+        warm = self._warm.pop(key, None)
+        if warm is None:
+            return None
+        if not warm.stream.is_running():
+            self._destroy_stream(warm.stream)
+            return None
+
+        self._receivers[key] = warm.stream
+        self._streams.append(warm.stream)
+        return warm.stream
+
+    def get_warm_receiver_count(self) -> int:
+        return len(self._warm)
+
+    def _update_warm_receivers(self):
+        now = time.monotonic()
+        for key, warm in list(self._warm.items()):
+            if now >= warm.expires or not warm.stream.is_running():
+                del self._warm[key]
+                self._destroy_stream(warm.stream)
+
+    def _stop_all_warm_receivers(self):
+        for warm in self._warm.values():
+            self._destroy_stream(warm.stream)
+        self._warm.clear()
+# endregion
+
+# region reconciliation
+    def get_stream_ids(self) -> List[str]:
+        """Dynamic textures playing or starting a stream."""
+        return list(self._streams_by_id.keys() | self._pending_starts.keys())
+
+    def is_stream_bound_to(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool, lowlatency: bool = False,
+                           region: Tuple[int, int, int, int] = None) -> bool:
+        """Whether the dynamic texture plays, or is starting, that source with those settings."""
+        start = self._pending_starts.get(dynamic_id, None)
+        if start is not None:
+            return start.key == (ndi_source, lowbandwidth) and start.lowlatency == lowlatency and start.region == region
+        stream = self._streams_by_id.get(dynamic_id, None)
+        return stream is not None and stream.matches(dynamic_id, ndi_source, lowbandwidth, lowlatency, region)
+# endregion
+
+    def _create_receiver(self, ndi_source: str, lowbandwidth: bool):
+        """Can be called from the start workers, must not touch the stream lists."""
+        with self._warp_lock:
+            wp.init()  # Receivers created concurrently would race on the first initialization
+
+        settings = carb.settings.get_settings()
+        out_of_process = bool(settings.get(NDItools.SETTING_WORKER_PROCESS))
+        slot_count = settings.get(NDItools.SETTING_WORKER_SLOT_COUNT) or ReceiveWorker.DEFAULT_SLOT_COUNT
+        converter = None
+        if settings.get(NDItools.SETTING_NATIVE_COLOR):
+            converter = UYVYConverter(settings.get(NDItools.SETTING_COLORIMETRY) or UYVYConverter.AUTO)
+        fingerprint = FrameFingerprint() if settings.get(NDItools.SETTING_STATIC_DETECTION) else None
+        refresh_interval = settings.get(NDItools.SETTING_STATIC_REFRESH) or 0.0
+        stream: NDIVideoStream = NDIVideoStream(ndi_source, lowbandwidth, self, out_of_process, slot_count, converter,
+                                                fingerprint, refresh_interval)
+        return stream if stream.is_ok else None
+
+    def get_stream_stats(self, dynamic_id: str) -> dict:
+        """Latest statistics published for the dynamic texture, see StreamStats. None if it isn't playing."""
+        stream = self.get_stream(dynamic_id)
+        if stream is None:
+            return None
+        stats = stream.get_stats(dynamic_id)
+        if stats is None:
+            return None
+        fourcc = stats.pop("fourcc")
+        stats["color_format"] = str(ndi.FourCCVideoType(fourcc)) if fourcc != 0 else ""
+        return stats
+
+    def get_stream_telemetry(self, dynamic_id: str) -> dict:
+        """Percentiles of the recent frames of the stream playing on the dynamic texture, see StreamTelemetry."""
+        stream = self.get_stream(dynamic_id)
+        if isinstance(stream, NDIVideoStream):
+            return stream.get_telemetry()
+        return None
+
+    def set_stream_max_fps(self, dynamic_id: str, max_fps: float):
+        stream = self.get_stream(dynamic_id)
+        if isinstance(stream, NDIVideoStream):
+            stream.set_target_max_fps(dynamic_id, max_fps)
+
     def try_add_stream_proxy(self, dynamic_id: str, ndi_source: str, fps: float,
                              lowbandwidth: bool) -> bool:
-        stream: NDIVideoStreamProxy = NDIVideoStreamProxy(dynamic_id, ndi_source, fps, lowbandwidth)
+        track = self._tracer.create_track(f"{dynamic_id} ({ndi_source})")
+        stream: NDIVideoStreamProxy = NDIVideoStreamProxy(dynamic_id, ndi_source, fps, lowbandwidth, track)
         if not stream.is_ok:
             logger = logging.getLogger(__name__)
             logger.error(f"Error opening stream: {ndi_source}")
             return False
 
         self._streams.append(stream)
+        self._streams_by_id[dynamic_id] = stream
+        self._scheduler.add(stream)
         return True
 
     def stop_stream(self, dynamic_id: str):
-        stream = self.get_stream(dynamic_id)
-        if stream is not None:
-            self._streams.remove(stream)
-            stream.destroy()
+        start = self._pending_starts.get(dynamic_id, None)
+        if start is not None:
+            self._finish_start(start, False)
+
+        stream = self._streams_by_id.pop(dynamic_id, None)
+        if stream is None:
+            return
+
+        # The receiver keeps running as long as another dynamic texture uses it
+        if stream.remove_target(dynamic_id) == 0:
+            self._forget_stream(stream)
+            self._park_stream(stream)
 
     def stop_all_streams(self):
+        self._stop_all_standbys()
+        self._stop_all_warm_receivers()
+        for start in list(self._pending_starts.values()):
+            self._finish_start(start, False)
         for stream in self._streams:
-            stream.destroy()
+            self._destroy_stream(stream)
         self._streams.clear()
+        self._streams_by_id.clear()
+        self._receivers.clear()
+
+    def _forget_stream(self, stream):
+        self._streams.remove(stream)
+        for dynamic_id in stream.get_ids():
+            if self._streams_by_id.get(dynamic_id, None) is stream:
+                del self._streams_by_id[dynamic_id]
+        key = next((k for k, v in self._receivers.items() if v is stream), None)
+        if key is not None:
+            del self._receivers[key]
+
+    def _destroy_stream(self, stream):
+        """Returns right away, the stream stops being serviced and is torn down in the background."""
+        self._reaper.reap(stream)
+
+
+@dataclass
+class CachedSource():
+    source: object  # ndi.Source, a copy that stays valid after the next enumeration
+    last_seen: float  # monotonic time of the last enumeration it was part of
 
 
 class NDIfinder():
-    SLEEP_INTERVAL: float = 2  # seconds
+    WAIT_TIMEOUT: int = 100  # ms, longest a single wait for new sources blocks, bounds how long destroy takes
+    SOURCE_WAIT_TIMEOUT: float = 1  # seconds a stream waits for a source that wasn't discovered yet
+    SOURCE_TTL: float = 30  # seconds a source that went away stays in the cache, it may come back on the same address
 
     def __init__(self, tools: NDItools):
         self._tools = tools
-        self._previous_sources: List[str] = []
+        self._sources: List[str] = []  # Replaced, never mutated, can be read from any thread
+        self._cache: Dict[str, CachedSource] = {}  # name -> source, also replaced
+        self._condition = threading.Condition()
 
         self._is_running = True
         self._thread = threading.Thread(target=self._search)
         self._thread.start()
 
     def destroy(self):
-        self._is_running = False
+        with self._condition:
+            self._is_running = False
+            self._condition.notify_all()
         self._thread.join()
         self._thread = None
 
+    def get_sources(self) -> List[str]:
+        return self._sources
+
+    def find_source(self, name: str, timeout: float = SOURCE_WAIT_TIMEOUT):
+        entry = self._cache.get(name, None)
+        if entry is None:
+            with self._condition:
+                self._condition.wait_for(lambda: name in self._cache or not self._is_running, timeout)
+            entry = self._cache.get(name, None)
+        return entry.source if entry is not None else None
+
+    def get_last_seen(self, name: str) -> float:
+        """Monotonic time the source was last discovered, None if it isn't in the cache."""
+        entry = self._cache.get(name, None)
+        return entry.last_seen if entry is not None else None
+
+    def _update_cache(self, sources):
+        now = time.monotonic()
+        cache = {k: v for k, v in self._cache.items() if now - v.last_seen < NDIfinder.SOURCE_TTL}
+        for source in sources:
+            cache[source.ndi_name] = CachedSource(ndi.Source(source.ndi_name, source.url_address), now)
+        with self._condition:
+            self._cache = cache
+            self._condition.notify_all()
+
     def _search(self):
         find = self._tools.get_ndi_find()
         if find:
             while self._is_running:
+                # Returns as soon as the network sources change, or False after the timeout
+                if not ndi.find_wait_for_sources(find, NDIfinder.WAIT_TIMEOUT):
+                    continue
+
                 sources = ndi.find_get_current_sources(find)
+                self._update_cache(sources)
                 result = [s.ndi_name for s in sources]
-                delta = set(result) ^ set(self._previous_sources)
-                if len(delta) > 0:
-                    self._previous_sources = result
-                    EventSystem.send_event(EventSystem.NDIFINDER_NEW_SOURCES, payload={"sources": result})
-                time.sleep(NDIfinder.SLEEP_INTERVAL)
+                current, previous = set(result), set(self._sources)
+                added = [x for x in result if x not in previous]
+                removed = [x for x in self._sources if x not in current]
+                if len(added) > 0 or len(removed) > 0:
+                    self._sources = result
+                    # Empty lists are left out, carb can't tell the type of their items
+                    payload = {}
+                    if len(added) > 0:
+                        payload["added"] = added
+                    if len(removed) > 0:
+                        payload["removed"] = removed
+                    EventSystem.send_event(EventSystem.NDIFINDER_NEW_SOURCES, payload=payload)
         self._is_running = False
 
 
-class NDIVideoStream():
-    NO_FRAME_TIMEOUT = 5  # seconds
+@dataclass
+class PendingStart():
+    dynamic_id: str
+    key: Tuple[str, bool]  # (source, lowbandwidth) of the receiver
+    lowlatency: bool
+    region: Tuple[int, int, int, int]
+    max_fps: float
+    future: Future
+    replaces: bool = False  # The dynamic texture plays meanwhile, it is cut over once the receiver has a frame
+    stream: "NDIVideoStream" = None  # Once the receiver exists, the dynamic texture was added to it unless replaces
 
-    def __init__(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool, tools: NDItools,
-                 update_fps_fn, update_dimensions_fn):
-        wp.init()
 
-        self._dynamic_id = dynamic_id
+@dataclass
+class Standby():
+    ndi_source: str
+    creation: Future  # of the low bandwidth receiver, on a start worker
+    ready: Future  # True once the receiver gets frames
+    stream: "NDIVideoStream" = None
+
+
+@dataclass
+class WarmReceiver():
+    stream: "NDIVideoStream"
+    expires: float  # monotonic time it is destroyed at, unless a dynamic texture binds its source again
+
+
+@dataclass
+class StreamTarget():
+    dynamic_id: str
+    dynamic_texture: omni.ui.DynamicTextureProvider
+    stats: StreamStats
+    lowlatency: bool
+    region: Tuple[int, int, int, int] = None  # (x, y, width, height) of the frame to upload, None for all of it
+    max_fps: float = 0.0  # 0 or less uploads every frame
+    next_upload: float = 0.0  # monotonic time
+    uploads_skipped: int = 0
+    fingerprint: int = None  # of the last frame uploaded to the texture, None until one was
+    last_upload: float = 0.0  # monotonic time
+
+
+class NDIVideoStream():
+    NO_FRAME_TIMEOUT = 5  # seconds
+    DEFAULT_FPS = 60.0  # used until the source reports its frame rate
+    SCHEDULE_AHEAD = 0.75  # fraction of a frame period to wait after a frame before looking for the next one
+    POLL_INTERVAL = 0.25  # fraction of a frame period between two looks while waiting for a frame
+    IDLE_BACKOFF = 0.25  # fraction of the time since the last frame waited before the next look, when longer
+    IDLE_POLL_MAX = 0.1  # seconds, longest backoff between two looks at a source that stopped sending
+    MAX_DRAIN = 64  # most frames captured in a single wakeup in low latency mode
+    SDK_POLL_INTERVAL = 1.0  # seconds between two reads of the receiver performance counters
+    FINAL_FRAME = np.array([[[0, 0, 0, 255]]], dtype=np.uint8)  # what a dynamic texture shows once it stopped, RGBA
+
+    def __init__(self, ndi_source: str, lowbandwidth: bool, tools: NDItools, out_of_process: bool = False,
+                 slot_count: int = ReceiveWorker.DEFAULT_SLOT_COUNT, converter: UYVYConverter = None,
+                 fingerprint: FrameFingerprint = None, refresh_interval: float = 0.0):
         self._ndi_source = ndi_source
         self._lowbandwidth = lowbandwidth
-        self._thread: threading.Thread = None
+        self._track = tools.get_tracer().create_track(f"{ndi_source} ({'low' if lowbandwidth else 'high'} bandwidth)")
+        self._lowlatency = False
+        self._is_running = False
         self._ndi_recv = None
+        self._worker: ReceiveWorker = None
+        # Replaced, never mutated, so the thread servicing the stream can iterate it without locking
+        self._targets: Tuple[StreamTarget, ...] = ()
+        self._released: deque = deque()  # Removed targets, set to their final frame by the thread servicing the stream
+        self._staging_pool = StagingBufferPool()
+        self._converter = converter  # When set, receive UYVY as sent and convert it ourselves
+        # When set, a frame identical to the last one a texture shows isn't uploaded to it again
+        self._fingerprint = fingerprint
+        self._refresh_interval = refresh_interval  # seconds, uploads an unchanged frame anyway after it, 0 never
+        self._uploads_unchanged = 0
 
-        self._update_fps_fn = update_fps_fn
         self._fps_current = 0.0
         self._fps_avg_total = 0.0
         self._fps_avg_count = 0
         self._fps_expected = 0.0
-        self._update_dimensions_fn = update_dimensions_fn
+        self._frames_dropped = 0
+        self._bytes_received = 0
+        self._last_frame_bytes = 0
+        self._telemetry = StreamTelemetry()
+        self._last_video_perf = None  # perf_counter, monotonic has a coarse resolution on Windows
+        self._next_sdk_poll = 0.0
+
+        self._fps = NDIVideoStream.DEFAULT_FPS
+        self._last_frame = time.monotonic()  # any frame, used for the no frame timeout
+        self._last_video_frame = None
+        self._index = 0
 
         self.is_ok = False
 
         if not tools.is_ndi_ok():
             return
 
-        ndi_find = tools.get_ndi_find()
-        source = None
-        sources = ndi.find_get_current_sources(ndi_find)
-        source_candidates = [s for s in sources if s.ndi_name == self._ndi_source]
-        if len(source_candidates) != 0:
-            source = source_candidates[0]
+        if out_of_process:
+            # The worker process finds the source and receives it, frames come back through shared memory
+            try:
+                self._worker = ReceiveWorker(ndi_source, lowbandwidth, slot_count,
+                                             color_format=int(self.get_recv_color_format()))
+            except OSError as e:
+                logger = logging.getLogger(__name__)
+                logger.error(f"Could not start NDI® receive worker: {e}")
+                return
+            self._is_running = True
+            self.is_ok = True
+            return
 
+        source = tools.find_source(self._ndi_source)
         if source is None:
             logger = logging.getLogger(__name__)
             logger.error(f"TIMEOUT: Could not find source at \"{self._ndi_source}\".")
@@ -197,183 +851,456 @@ class NDIVideoStream():
         ndi.recv_connect(self._ndi_recv, source)
 
         self._is_running = True
-        self._thread = threading.Thread(target=self._update_texture, args=(self._dynamic_id, ))
-        self._thread.start()
-
         self.is_ok = True
 
-    def _update_fps(self):
-        self._update_fps_fn(self._fps_current, self._fps_avg_total / self._fps_avg_count if self._fps_avg_count != 0 else 0, self._fps_expected)
+    def add_target(self, dynamic_id: str, lowlatency: bool, region: Tuple[int, int, int, int] = None,
+                   max_fps: float = 0.0):
+        target = StreamTarget(dynamic_id, omni.ui.DynamicTextureProvider(dynamic_id), StreamStats(), lowlatency,
+                              region, max_fps)
+        self._targets = tuple(x for x in self._targets if x.dynamic_id != dynamic_id) + (target, )
+        self._lowlatency = any(x.lowlatency for x in self._targets)
+
+    def remove_target(self, dynamic_id: str, release: bool = True) -> int:
+        """Returns how many dynamic textures still use the stream. Released textures are set to their final frame."""
+        if release:
+            self._released.extend(x for x in self._targets if x.dynamic_id == dynamic_id)
+        self._targets = tuple(x for x in self._targets if x.dynamic_id != dynamic_id)
+        self._lowlatency = any(x.lowlatency for x in self._targets)
+        return len(self._targets)
+
+    def get_ids(self) -> List[str]:
+        return [x.dynamic_id for x in self._targets]
+
+    def set_target_max_fps(self, dynamic_id: str, max_fps: float):
+        target = next((x for x in self._targets if x.dynamic_id == dynamic_id), None)
+        if target is not None:
+            target.max_fps = max_fps
+            target.next_upload = 0.0
+
+    def get_stats(self, dynamic_id: str) -> dict:
+        target = next((x for x in self._targets if x.dynamic_id == dynamic_id), None)
+        return target.stats.read() if target is not None else None
+
+    def _publish_stats(self):
+        fps_average = self._fps_avg_total / self._fps_avg_count if self._fps_avg_count != 0 else 0
+        frames_dropped = self.get_frames_dropped()
+        frames_torn = self.get_frames_torn()
+        frames_oversized = self.get_frames_oversized()
+        staging = self._staging_pool
+        for target in self._targets:
+            target.stats.publish(self._fps_current, fps_average, self._fps_expected, frames_dropped,
+                                 target.uploads_skipped, self._uploads_unchanged, frames_torn, frames_oversized)
+            target.stats.publish_staging(staging.hits, staging.misses, staging.bytes_allocated)
+
+    def stop(self):
+        """The scheduler drops the stream the next time it services it, destroy can then be called from any thread."""
+        self._is_running = False
 
     def destroy(self):
-        self._update_fps()
+        """Must not be serviced anymore, see StreamReaper."""
+        self._released.extend(self._targets)
+        self._targets = ()
         self._is_running = False
-        self._thread.join()
-        self._thread = None
-        ndi.recv_destroy(self._ndi_recv)
-
-    def get_id(self) -> str:
-        return self._dynamic_id
+        self._release_targets()
+        self._staging_pool.destroy()
+        self._track.close()
+        if self._worker is not None:
+            self._worker.destroy()
+            self._worker = None
+        else:
+            ndi.recv_destroy(self._ndi_recv)
+            self._ndi_recv = None
 
     def is_running(self) -> bool:
         return self._is_running
 
+    def _release_targets(self):
+        final = NDIVideoStream.FINAL_FRAME
+        while len(self._released) > 0:
+            target: StreamTarget = self._released.popleft()
+            target.dynamic_texture.set_data_array(final, [1, 1, final.shape[2]])
+
+    def get_frames_dropped(self) -> int:
+        """Frames received but never uploaded because a newer one was already available."""
+        if self._worker is not None:
+            return self._worker.get_frames_skipped()
+        return self._frames_dropped
+
+    def get_frames_torn(self) -> int:
+        """Worker frames overwritten in shared memory while they were uploaded, 0 in process."""
+        return self._worker.get_frames_torn() if self._worker is not None else 0
+
+    def get_frames_oversized(self) -> int:
+        """Worker frames too large for a shared memory slot, 0 in process."""
+        return self._worker.get_frames_oversized() if self._worker is not None else 0
+
+    def get_uploads_unchanged(self) -> int:
+        """Frames not uploaded to a texture because it already showed an identical one."""
+        return self._uploads_unchanged
+
+    def get_telemetry(self) -> dict:
+        return self._telemetry.snapshot()
+
+    def get_telemetry_recorder(self) -> StreamTelemetry:
+        return self._telemetry
+
+    def get_source(self) -> str:
+        return self._ndi_source
+
+    def get_metrics_labels(self) -> Dict[str, str]:
+        return {"source": self._ndi_source, "bandwidth": "low" if self._lowbandwidth else "high"}
+
+    def get_receiver_key(self) -> Tuple[str, bool]:
+        return (self._ndi_source, self._lowbandwidth)
+
+    def matches(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool, lowlatency: bool,
+                region: Tuple[int, int, int, int]) -> bool:
+        target = next((x for x in self._targets if x.dynamic_id == dynamic_id), None)
+        return (target is not None and self.get_receiver_key() == (ndi_source, lowbandwidth)
+                and target.lowlatency == lowlatency and target.region == region)
+
+    def get_frames_received(self) -> int:
+        return self._index
+
+    def get_bytes_received(self) -> int:
+        return self._bytes_received
+
+    def get_bytes_per_second(self) -> float:
+        return self._last_frame_bytes * self._fps_current
+
+    def get_staging_pool_stats(self) -> dict:
+        return self._staging_pool.get_stats()
+
+    def get_recv_color_format(self):
+        if self._converter is not None:
+            return ndi.RECV_COLOR_FORMAT_FASTEST  # UYVY or UYVA, no conversion in the SDK
+        return ndi.RECV_COLOR_FORMAT_RGBX_RGBA
+
     def get_recv_high_bandwidth(self):
         recv_create_desc = ndi.RecvCreateV3()
-        recv_create_desc.color_format = ndi.RECV_COLOR_FORMAT_RGBX_RGBA
+        recv_create_desc.color_format = self.get_recv_color_format()
         recv_create_desc.bandwidth = ndi.RECV_BANDWIDTH_HIGHEST
         return recv_create_desc
 
     def get_recv_low_bandwidth(self):
         recv_create_desc = ndi.RecvCreateV3()
-        recv_create_desc.color_format = ndi.RECV_COLOR_FORMAT_RGBX_RGBA
+        recv_create_desc.color_format = self.get_recv_color_format()
         recv_create_desc.bandwidth = ndi.RECV_BANDWIDTH_LOWEST
         return recv_create_desc
 
-    @carb.profiler.profile
-    def _update_texture(self, dynamic_id: str):
-        carb.profiler.begin(0, 'Omniverse NDI®::Init')
-        dynamic_texture = omni.ui.DynamicTextureProvider(dynamic_id)
-
-        last_read = time.time() - 1  # Make sure we run on the first frame
-        fps = 120.0
-        no_frame_chances = NDIVideoStream.NO_FRAME_TIMEOUT * fps
-        index = 0
+    def _free_video(self, v) -> bool:
+        """False if the worker overwrote the frame in its ring while it was used."""
+        if self._worker is not None:
+            return self._worker.release(v)
+        ndi.recv_free_video_v2(self._ndi_recv, v)
+        return True
 
-        self._fps_avg_total = 0.0
-        self._fps_avg_count = 0
+    def _free_frame(self, frame_type, v, a, m):
+        if frame_type == ndi.FRAME_TYPE_AUDIO:
+            ndi.recv_free_audio_v2(self._ndi_recv, a)
+        elif frame_type == ndi.FRAME_TYPE_METADATA:
+            ndi.recv_free_metadata(self._ndi_recv, m)
 
-        carb.profiler.end(0)
-        while self._is_running:
-            carb.profiler.begin(1, 'Omniverse NDI®::loop outer')
-            now = time.time()
-            time_delta = now - last_read
-            if (time_delta < 1.0 / fps):
-                carb.profiler.end(1)
-                continue
-            carb.profiler.begin(2, 'Omniverse NDI®::loop inner')
-            self._fps_current = 1.0 / time_delta
-            last_read = now
-
-            carb.profiler.begin(3, 'Omniverse NDI®::receive frame')
-            t, v, _, _ = ndi.recv_capture_v2(self._ndi_recv, 0)
-            carb.profiler.end(3)
+    @carb.profiler.profile
+    def service(self) -> float:
+        """Called by the StreamScheduler, returns when to look for the next frame or None once stopped."""
+        if not self._is_running:
+            return None
+        if len(self._released) > 0:
+            self._release_targets()  # After any upload to them, this thread did the last ones
+        if self._worker is not None:
+            return self._service_worker()
+
+        with self._track.zone('Omniverse NDI®::service'):
+            with self._track.zone('Omniverse NDI®::receive frame'):
+                capture_start = time.perf_counter()
+                t, v, a, m = ndi.recv_capture_v2(self._ndi_recv, 0)
+            now = time.monotonic()
+
+            if now >= self._next_sdk_poll:
+                self._poll_sdk_performance()
+                self._next_sdk_poll = now + NDIVideoStream.SDK_POLL_INTERVAL
 
             if t == ndi.FRAME_TYPE_VIDEO:
-                carb.profiler.begin(3, 'Omniverse NDI®::prepare frame')
-                fps = v.frame_rate_N / v.frame_rate_D
-                self._fps_expected = fps
-                if (index == 0):
-                    self._fps_current = fps
-                color_format = v.FourCC
-                frame = v.data
-                height, width, channels = frame.shape
-
-                isGPU = height == width
-                carb.profiler.end(3)
-                if isGPU:
-                    carb.profiler.begin(3, 'Omniverse NDI®::begin gpu')
-                    with wp.ScopedDevice("cuda"):
-                        # CUDA doesnt handle non square texture well, so we need to resize if the te
-                        # We are keeping this code in case we find a workaround
-                        #
-                        #    carb.profiler.begin(4, 'Omniverse NDI®::begin cpu resize')
-                        #    frame = np.resize(frame, (width, width, channels))
-                        #    carb.profiler.end(4)
-
-                        # 38 ms
-                        carb.profiler.begin(4, 'Omniverse NDI®::gpu uploading')
-                        pixels_data = wp.from_numpy(frame, dtype=wp.uint8, device="cuda")
-                        carb.profiler.end(4)
-
-                        # 1 ms
-                        carb.profiler.begin(4, 'Omniverse NDI®::create gpu texture')
-                        self._update_dimensions_fn(width, height, str(color_format))
-                        dynamic_texture.set_bytes_data_from_gpu(pixels_data.ptr, [width, width])
-                        carb.profiler.end(4)
-
-                    carb.profiler.end(3)
+                if self._lowlatency:
+                    v = self._drain_video(v)
+                self._update_texture(v, now, time.perf_counter() - capture_start)
+                next_deadline = now + NDIVideoStream.SCHEDULE_AHEAD / self._fps
+            elif t == ndi.FRAME_TYPE_NONE:
+                next_deadline = self._get_poll_deadline(now)
+            else:
+                # Audio or metadata, the video frame might be right behind it
+                self._free_frame(t, v, a, m)
+                next_deadline = now
+
+            if t != ndi.FRAME_TYPE_NONE:
+                self._last_frame = now
+            elif now - self._last_frame > NDIVideoStream.NO_FRAME_TIMEOUT:
+                self._is_running = False
+                next_deadline = None
+
+        return next_deadline
+
+    def _poll_sdk_performance(self):
+        total, dropped = ndi.recv_get_performance(self._ndi_recv)
+        queue = ndi.recv_get_queue(self._ndi_recv)
+        self._telemetry.record_sdk(total.video_frames, dropped.video_frames, queue.video_frames)
+
+    def _drain_video(self, v):
+        """Captures every queued frame and only keeps the newest video frame, the others are freed right away."""
+        with self._track.zone('Omniverse NDI®::drain frames'):
+            for _ in range(NDIVideoStream.MAX_DRAIN):
+                t, newer, a, m = ndi.recv_capture_v2(self._ndi_recv, 0)
+                if t == ndi.FRAME_TYPE_VIDEO:
+                    ndi.recv_free_video_v2(self._ndi_recv, v)
+                    self._frames_dropped += 1
+                    v = newer
+                elif t == ndi.FRAME_TYPE_NONE:
+                    break
                 else:
-                    carb.profiler.begin(3, 'Omniverse NDI®::begin cpu')
-                    self._update_dimensions_fn(width, height, str(color_format))
-                    dynamic_texture.set_data_array(frame, [width, height, channels])
-                    carb.profiler.end(3)
-
-                ndi.recv_free_video_v2(self._ndi_recv, v)
-                carb.profiler.end(3)
-
-                self._fps_avg_total += self._fps_current
-                self._fps_avg_count += 1
-                self._update_fps()
-                index += 1
-
-            if t == ndi.FRAME_TYPE_NONE:
-                no_frame_chances -= 1
-                if (no_frame_chances <= 0):
-                    self._is_running = False
+                    self._free_frame(t, newer, a, m)
+        return v
+
+    def _get_region_view(self, frame: np.ndarray, region: Tuple[int, int, int, int]) -> np.ndarray:
+        if region is None:
+            return frame
+        x, y, width, height = region
+        return frame[y:y + height, x:x + width]  # Clamped to the frame bounds by numpy, may be empty
+
+    def _convert_uyvy(self, v, frame):
+        alpha = None
+        if v.FourCC == ndi.FOURCC_VIDEO_TYPE_UYVA:
+            # The alpha plane follows the UYVY plane
+            flat = frame.reshape(-1)
+            plane_size = v.xres * v.yres * 2
+            if flat.size >= plane_size + v.xres * v.yres:
+                alpha = flat[plane_size:plane_size + v.xres * v.yres]
+            frame = flat[:plane_size]
+        return self._converter.convert(frame, v.xres, v.yres, alpha)
+
+    def _service_worker(self) -> float:
+        with self._track.zone('Omniverse NDI®::service worker'):
+            now = time.monotonic()
+            next_deadline = self._get_poll_deadline(now)
+
+            # Only the newest frame is read, older ones the worker wrote in the meantime are dropped
+            with self._track.zone('Omniverse NDI®::receive frame'):
+                capture_start = time.perf_counter()
+                v = self._worker.capture()
+            if v is not None:
+                self._update_texture(v, now, time.perf_counter() - capture_start)
+                self._last_frame = now
+                next_deadline = now + NDIVideoStream.SCHEDULE_AHEAD / self._fps
+            elif self._worker.is_starting():
+                self._last_frame = now
+            elif not self._worker.is_alive() or now - self._last_frame > NDIVideoStream.NO_FRAME_TIMEOUT:
+                self._is_running = False
+                next_deadline = None
+
+        return next_deadline
+
+    def _get_poll_deadline(self, now: float) -> float:
+        """When to look again for a frame that wasn't there yet, less and less often the longer none arrives."""
+        idle = max(now - self._last_frame, 0.0)
+        backoff = min(idle * NDIVideoStream.IDLE_BACKOFF, NDIVideoStream.IDLE_POLL_MAX)
+        return now + max(NDIVideoStream.POLL_INTERVAL / self._fps, backoff)
+
+    def _get_targets_due(self, now: float) -> List[StreamTarget]:
+        """Targets allowed to upload this frame by their max fps, the others count it as skipped."""
+        due = []
+        for target in self._targets:
+            if target.max_fps <= 0:
+                due.append(target)
+            elif now >= target.next_upload:
+                # Half a source frame of tolerance so the jitter between frames doesn't skip an extra one
+                target.next_upload = now + 1.0 / target.max_fps - 0.5 / self._fps
+                due.append(target)
             else:
-                no_frame_chances = NDIVideoStream.NO_FRAME_TIMEOUT * fps
+                target.uploads_skipped += 1
+        return due
+
+    def _get_changed_targets(self, frame: np.ndarray, targets: List[StreamTarget], now: float) -> List[StreamTarget]:
+        """
+        Targets not already showing the frame. Each keeps the fingerprint of its own last upload, a target capped by
+        its max fps may have missed a frame the others got.
+        """
+        if self._fingerprint is None or len(targets) == 0:
+            return targets
+
+        with self._track.zone('Omniverse NDI®::fingerprint'):
+            fingerprint = self._fingerprint.compute(frame)
+        changed = []
+        for target in targets:
+            refresh = self._refresh_interval > 0 and now - target.last_upload >= self._refresh_interval
+            if target.fingerprint != fingerprint or refresh:
+                target.fingerprint = fingerprint
+                target.last_upload = now
+                changed.append(target)
+        if len(changed) < len(targets):
+            self._uploads_unchanged += 1
+        return changed
+
+    def _get_latency(self, v) -> float:
+        """Timestamps are in 100 ns units since the Unix epoch, set by the sender if it supports it."""
+        if v.timestamp == ndi.RECV_TIMESTAMP_UNDEFINED or v.timestamp <= 0:
+            return math.nan
+        return time.time() - v.timestamp * 1e-7
+
+    def _update_texture(self, v, now: float, capture_duration: float = math.nan):
+        with self._track.zone('Omniverse NDI®::update texture'):
+            latency = self._get_latency(v)
+            received = time.perf_counter()
+            interval = received - self._last_video_perf if self._last_video_perf is not None else math.nan
+            self._last_video_perf = received
+            targets = self._get_targets_due(now)
+            if self._last_video_frame is not None:
+                self._fps_current = 1.0 / max(now - self._last_video_frame, 1e-6)
+            self._last_video_frame = now
+
+            with self._track.zone('Omniverse NDI®::prepare frame'):
+                self._fps = v.frame_rate_N / v.frame_rate_D
+                self._fps_expected = self._fps
+                if (self._index == 0):
+                    self._fps_current = self._fps
+                color_format = v.FourCC if self._worker is None else ndi.FourCCVideoType(v.FourCC)
+                frame = v.data
+                self._last_frame_bytes = frame.nbytes
+                self._bytes_received += frame.nbytes
+                targets = self._get_changed_targets(frame, targets, now)
+                is_uyvy = color_format in (ndi.FOURCC_VIDEO_TYPE_UYVY, ndi.FOURCC_VIDEO_TYPE_UYVA)
+                if self._converter is not None and is_uyvy and len(targets) > 0:
+                    with self._track.zone('Omniverse NDI®::color conversion'):
+                        frame = self._convert_uyvy(v, frame)
+
+            # Every target may be capped by its max fps or the frame unchanged, it is then only freed
+            if len(targets) > 0:
+                self._upload(frame, int(color_format), targets)
+            upload_duration = time.perf_counter() - received if len(targets) > 0 else 0.0
+
+            if not self._free_video(v):
+                # The textures may show a torn frame, the next one is uploaded to them even if it looks the same
+                for target in targets:
+                    target.fingerprint = None
+            self._telemetry.record(latency, capture_duration, upload_duration, interval, 1.0 / self._fps)
+
+            self._fps_avg_total += self._fps_current
+            self._fps_avg_count += 1
+            self._publish_stats()
+            self._index += 1
+
+    def _upload(self, frame: np.ndarray, fourcc: int, targets: List[StreamTarget]):
+        height, width, channels = frame.shape
+
+        # Regions are views of the frame, they can't be uploaded from the single contiguous GPU buffer
+        full_targets = [x for x in targets if x.region is None]
+        region_targets = [x for x in targets if x.region is not None]
+
+        isGPU = height == width and len(full_targets) > 0
+        if isGPU:
+            with self._track.zone('Omniverse NDI®::begin gpu'), wp.ScopedDevice("cuda"):
+                # CUDA doesnt handle non square texture well, so we need to resize if the te
+                # We are keeping this code in case we find a workaround
+                #
+                #    with self._track.zone('Omniverse NDI®::begin cpu resize'):
+                #        frame = np.resize(frame, (width, width, channels))
+
+                # Copies into a buffer reused across frames, allocating one per frame took 38 ms
+                with self._track.zone('Omniverse NDI®::gpu uploading'):
+                    pixels_data = self._staging_pool.upload(frame, "cuda")
+
+                # 1 ms, uploaded once and shared by every dynamic texture using this stream
+                with self._track.zone('Omniverse NDI®::create gpu texture'):
+                    for target in full_targets:
+                        target.stats.publish_format(width, height, fourcc)
+                        target.dynamic_texture.set_bytes_data_from_gpu(pixels_data.ptr, [width, width])
+        else:
+            region_targets = targets
 
-            carb.profiler.end(2)
-            carb.profiler.end(1)
+        if len(region_targets) > 0:
+            with self._track.zone('Omniverse NDI®::begin cpu'):
+                for target in region_targets:
+                    # Slicing only creates a strided view, the frame is received once and never copied here
+                    view = self._get_region_view(frame, target.region)
+                    view_height, view_width, _ = view.shape
+                    if view_height == 0 or view_width == 0:
+                        continue
+                    target.stats.publish_format(view_width, view_height, fourcc)
+                    target.dynamic_texture.set_data_array(view, [view_width, view_height, channels])
 
 
 class NDIVideoStreamProxy():
-    def __init__(self, dynamic_id: str, ndi_source: str, fps: float, lowbandwidth: bool):
+    def __init__(self, dynamic_id: str, ndi_source: str, fps: float, lowbandwidth: bool, track: TraceTrack):
         self._dynamic_id = dynamic_id
         self._ndi_source = ndi_source
         self._fps = fps
         self._lowbandwidth = lowbandwidth
-        self._thread: threading.Thread = None
+        self._track = track
 
         self.is_ok = False
 
         denominator = 1
         if lowbandwidth:
             denominator = 3
-        w = int(1920 / denominator)  # TODO: dimensions from name like for fps
-        h = int(1080 / denominator)
+        self._width = int(1920 / denominator)  # TODO: dimensions from name like for fps
+        self._height = int(1080 / denominator)
 
-        self._is_running = True
-        self._thread = threading.Thread(target=self._update_texture, args=(self._dynamic_id, self._fps, w, h, ))
-        self._thread.start()
+        color = np.array([255, 0, 0, 255], np.uint8)
+        self._channels = len(color)
+        self._frame = np.full((self._height, self._width, self._channels), color, dtype=np.uint8)
+        self._dynamic_texture = omni.ui.DynamicTextureProvider(dynamic_id)
+        self._next_frame = time.monotonic()
+        self._release = True  # False when another stream took the dynamic texture over
+
+        # Always the same frame at the requested rate, the statistics never change
+        self._stats = StreamStats()
+        self._stats.publish(fps, fps, fps, 0, 0, 0)
+        self._stats.publish_format(self._width, self._height, int(ndi.FOURCC_VIDEO_TYPE_RGBA))
 
+        self._is_running = True
         self.is_ok = True
 
+    def stop(self):
+        self._is_running = False
+
     def destroy(self):
+        """Must not be serviced anymore, see StreamReaper."""
         self._is_running = False
-        self._thread.join()
-        self._thread = None
+        self._track.close()
+        if self._release:
+            final = NDIVideoStream.FINAL_FRAME
+            self._dynamic_texture.set_data_array(final, [1, 1, final.shape[2]])
+
+    def get_ids(self) -> List[str]:
+        return [self._dynamic_id]
+
+    def remove_target(self, dynamic_id: str, release: bool = True) -> int:
+        self._release = release
+        return 0
 
-    def get_id(self) -> str:
-        return self._dynamic_id
+    def get_stats(self, dynamic_id: str) -> dict:
+        return self._stats.read()
+
+    def get_source(self) -> str:
+        return self._ndi_source
+
+    def matches(self, dynamic_id: str, ndi_source: str, lowbandwidth: bool, lowlatency: bool,
+                region: Tuple[int, int, int, int]) -> bool:
+        """The proxy ignores the latency and region of its binding."""
+        return (dynamic_id, ndi_source, lowbandwidth) == (self._dynamic_id, self._ndi_source, self._lowbandwidth)
 
     def is_running(self) -> bool:
         return self._is_running
 
     @carb.profiler.profile
-    def _update_texture(self, dynamic_id: str, fps: float, width: float, height: float):
-        carb.profiler.begin(0, 'Omniverse NDI®::Init')
-        color = np.array([255, 0, 0, 255], np.uint8)
-        channels = len(color)
-        dynamic_texture = omni.ui.DynamicTextureProvider(dynamic_id)
-        frame = np.full((height, width, channels), color, dtype=np.uint8)
-
-        last_read = time.time() - 1
-        carb.profiler.end(0)
-        while self._is_running:
-            carb.profiler.begin(1, 'Omniverse NDI®::Proxy loop outer')
-            now = time.time()
-            time_delta = now - last_read
-            if (time_delta < 1.0 / fps):
-                carb.profiler.end(1)
-                continue
-            carb.profiler.begin(2, 'Omniverse NDI®::Proxy loop inner')
-            last_read = now
-
-            carb.profiler.begin(3, 'Omniverse NDI®::set_data')
-            dynamic_texture.set_data_array(frame, [width, height, channels])
-            carb.profiler.end(3)
-
-            carb.profiler.end(2)
-            carb.profiler.end(1)
+    def service(self) -> float:
+        if not self._is_running:
+            return None
+
+        with self._track.zone('Omniverse NDI®::Proxy set_data'):
+            self._dynamic_texture.set_data_array(self._frame, [self._width, self._height, self._channels])
+
+        now = time.monotonic()
+        self._next_frame += 1.0 / self._fps
+        if self._next_frame < now:  # Don't try to catch up after a stall
+            self._next_frame = now + 1.0 / self._fps
+        return self._next_frame
@@ -3,17 +3,40 @@ from .bindings import DynamicPrim
 import logging
 import numpy as np
 import omni.ext
-from pxr import Usd, UsdGeom, UsdShade, Sdf, UsdLux, Tf
-from typing import List
+from pxr import Usd, UsdGeom, UsdShade, Sdf, UsdLux, Tf, Gf
+from typing import Dict, Iterable, List, Set, Tuple
 from unidecode import unidecode
 
 
 class USDtools():
     ATTR_NDI_NAME = 'ndi:source'
     ATTR_BANDWIDTH_NAME = "ndi:lowbandwidth"
+    ATTR_LATENCY_NAME = "ndi:lowlatency"
+    ATTR_MAXFPS_NAME = "ndi:maxfps"  # 0 or less uploads every frame
+    ATTR_REGION_NAME = "ndi:region"  # (x, y, width, height) in pixels of the source frame
     PREFIX = "dynamic://"
     SCOPE_NAME = "NDI_Looks"
 
+    # Inputs of OmniPBR that can hold a dynamic texture, read straight from their attributes
+    SHADER_TEXTURE_INPUTS = ("inputs:diffuse_texture", "inputs:emissive_color_texture")
+    RECT_LIGHT_TEXTURE_INPUTS = ("texture:file",)
+
+    KIND_OTHER = 0
+    KIND_SHADER = 1
+    KIND_RECT_LIGHT = 2
+
+    ATTR_TYPES = {
+        ATTR_NDI_NAME: Sdf.ValueTypeNames.String,
+        ATTR_BANDWIDTH_NAME: Sdf.ValueTypeNames.Bool,
+        ATTR_LATENCY_NAME: Sdf.ValueTypeNames.Bool,
+        ATTR_MAXFPS_NAME: Sdf.ValueTypeNames.Float,
+        ATTR_REGION_NAME: Sdf.ValueTypeNames.Int4,
+    }
+
+    # Attributes of a shader or rect light that change what it binds, edits to any other attribute are ignored
+    WATCHED_ATTRIBUTES = frozenset(SHADER_TEXTURE_INPUTS + RECT_LIGHT_TEXTURE_INPUTS + (
+        ATTR_NDI_NAME, ATTR_BANDWIDTH_NAME, ATTR_LATENCY_NAME, ATTR_MAXFPS_NAME, ATTR_REGION_NAME))
+
     def get_stage() -> Usd.Stage:
         usd_context = omni.usd.get_context()
         return usd_context.get_stage()
@@ -51,108 +74,166 @@ class USDtools():
         dynamic_texture = omni.ui.DynamicTextureProvider(safename)
         dynamic_texture.set_data_array(frame, [width, height, channels])
 
-    def find_all_dynamic_sources() -> List[DynamicPrim]:
-        stage = USDtools.get_stage()
+    def find_all_dynamic_sources(stage: Usd.Stage = None) -> List[DynamicPrim]:
+        """Dynamic textures of the shaders first, then of the rect lights. Defaults to the stage of the usd context."""
+        stage = stage or USDtools.get_stage()
         if not stage:
             logger = logging.getLogger(__name__)
             logger.warning("Could not get stage")
             return []
 
-        dynamic_sources: List[str] = []
-        dynamic_shaders, dynamic_sources = USDtools._find_all_dynamic_shaders(stage, dynamic_sources)
-        dynamic_lights, _ = USDtools._find_all_dynamic_lights(stage, dynamic_sources)
-        return dynamic_shaders + dynamic_lights
-
-    def _find_all_dynamic_shaders(stage: Usd.Stage, sources: List[str]):
-        shaders: List[UsdShade.Shader] = [UsdShade.Shader(x) for x in stage.Traverse() if x.IsA(UsdShade.Shader)]
+        return USDtools.merge_dynamic_prims(USDtools.find_dynamic_prims_below(stage.GetPseudoRoot()).values())
+
+    def find_dynamic_prims_below(root: Usd.Prim) -> Dict[Sdf.Path, Tuple[int, List[DynamicPrim]]]:
+        """Shaders and rect lights with a dynamic texture at or below root, in traversal order, with their kind."""
+        result: Dict[Sdf.Path, Tuple[int, List[DynamicPrim]]] = {}
+        kinds: Dict[str, int] = {}  # prim type name -> kind, IsA is only called once per type
+
+        # Like stage.Traverse(), skips inactive, unloaded and abstract prims with their descendants and instance proxies
+        prim_range = iter(Usd.PrimRange(root, Usd.PrimDefaultPredicate))
+        for prim in prim_range:
+            type_name: str = prim.GetTypeName()
+            kind = kinds.get(type_name, None)
+            if kind is None:
+                kind = USDtools._get_kind(prim)
+                kinds[type_name] = kind
+
+            if kind == USDtools.KIND_OTHER:
+                continue
+            if kind == USDtools.KIND_SHADER:
+                prim_range.PruneChildren()  # Nothing to find below a shader
+            dynamic_prims = USDtools._make_dynamic_prims(prim, kind)
+            if len(dynamic_prims) > 0:
+                result[prim.GetPath()] = (kind, dynamic_prims)
+        return result
+
+    def find_dynamic_prims_on(prim: Usd.Prim) -> Tuple[int, List[DynamicPrim]]:
+        """Kind and dynamic textures of a single prim, None if it has none or stage.Traverse() wouldn't reach it."""
+        if not USDtools.is_traversed(prim):
+            return None
+        kind = USDtools._get_kind(prim)
+        if kind == USDtools.KIND_OTHER:
+            return None
+        dynamic_prims = USDtools._make_dynamic_prims(prim, kind)
+        return (kind, dynamic_prims) if len(dynamic_prims) > 0 else None
+
+    def is_traversed(prim: Usd.Prim) -> bool:
+        return prim.IsValid() and prim.IsActive() and prim.IsLoaded() and prim.IsDefined() and not prim.IsAbstract() \
+            and not prim.IsInstanceProxy() and not prim.IsInPrototype()
+
+    def merge_dynamic_prims(entries: Iterable[Tuple[int, List[DynamicPrim]]]) -> List[DynamicPrim]:
+        """
+        Shaders first, a dynamic id is only kept for the first shader using it. Rect lights come last and only skip the
+        dynamic ids of the shaders.
+        """
         result: List[DynamicPrim] = []
-
+        sources: Set[str] = set()
+        lights: List[DynamicPrim] = []
+        for kind, dynamic_prims in entries:
+            if kind == USDtools.KIND_RECT_LIGHT:
+                lights.extend(dynamic_prims)
+                continue
+            for dynamic_prim in dynamic_prims:
+                if dynamic_prim.dynamic_id not in sources:
+                    sources.add(dynamic_prim.dynamic_id)
+                    result.append(dynamic_prim)
+
+        result.extend(x for x in lights if x.dynamic_id not in sources)
+        return result
+
+    def _get_kind(prim: Usd.Prim) -> int:
+        if prim.IsA(UsdShade.Shader):
+            return USDtools.KIND_SHADER
+        if prim.IsA(UsdLux.RectLight):
+            return USDtools.KIND_RECT_LIGHT
+        return USDtools.KIND_OTHER
+
+    def _make_dynamic_prims(prim: Usd.Prim, kind: int) -> List[DynamicPrim]:
+        # TODO: Filter the rect lights that have "isProjector" (the attribute doesn't exist)
+        inputs = USDtools.SHADER_TEXTURE_INPUTS if kind == USDtools.KIND_SHADER else USDtools.RECT_LIGHT_TEXTURE_INPUTS
+        return [USDtools._make_dynamic_prim(prim, name) for name in USDtools._get_dynamic_names(prim, inputs)]
+
+    def _get_dynamic_names(prim: Usd.Prim, attribute_names: Tuple[str, ...]) -> List[str]:
+        names: List[str] = []
         prefix_length: int = len(USDtools.PREFIX)
-        for shader in shaders:
-            albedo = shader.GetInput("diffuse_texture").Get()
-            # roughness = shader.GetInput("reflectionroughness_texture").Get()
-            # metallic = shader.GetInput("metallic_texture").Get()
-            # orm = shader.GetInput("ORM_texture").Get()
-            # ambient_occlusion = shader.GetInput("ao_texture").Get()
-            emissive = shader.GetInput("emissive_color_texture").Get()
-            # emissive_mask = shader.GetInput("emissive_mask_texture").Get()
-            # opacity = shader.GetInput("opacity_texture").Get()
-            # normal = shader.GetInput("normalmap_texture").Get()
-            # normal_detail = shader.GetInput("detail_normalmap_texture").Get()
-
-            values_set = set([albedo, emissive])
-            values_unique = list(values_set)
-
-            for texture_value in values_unique:
-                if texture_value:
-                    path: str = texture_value.path
-                    if len(path) > prefix_length:
-                        candidate = path[:prefix_length]
-                        if candidate == USDtools.PREFIX:
-                            name = path[prefix_length:]
-                            if name not in sources:
-                                sources.append(name)
-                                attr_ndi = shader.GetPrim().GetAttribute(USDtools.ATTR_NDI_NAME)
-                                attr_ndi = attr_ndi.Get() if attr_ndi.IsValid() else None
-                                attr_low = shader.GetPrim().GetAttribute(USDtools.ATTR_BANDWIDTH_NAME)
-                                attr_low = attr_low.Get() if attr_low.IsValid() else False
-                                p = DynamicPrim(shader.GetPath().pathString, name, attr_ndi, attr_low)
-                                result.append(p)
-
-        return result, sources
-
-    def _find_all_dynamic_lights(stage: Usd.Stage, sources: List[str]):
-        rect_lights: List[UsdLux.Rectlight] = [UsdLux.RectLight(x) for x in stage.Traverse() if x.IsA(UsdLux.RectLight)]
-        result: List[DynamicPrim] = []
-
-        prefix_length: int = len(USDtools.PREFIX)
-        for rect_light in rect_lights:
-            # TODO: Filter those that have "isProjector" (the attribute doesn't exist)
-            attribute = rect_light.GetPrim().GetAttribute("texture:file").Get()
-            if attribute:
-                path: str = attribute.path
-                if len(path) > prefix_length:
-                    candidate = path[:prefix_length]
-                    if candidate == USDtools.PREFIX:
-                        name = path[prefix_length:]
-                        if name not in sources:
-                            attr_ndi = rect_light.GetPrim().GetAttribute(USDtools.ATTR_NDI_NAME)
-                            attr_ndi = attr_ndi.Get() if attr_ndi.IsValid() else None
-                            attr_low = rect_light.GetPrim().GetAttribute(USDtools.ATTR_BANDWIDTH_NAME)
-                            attr_low = attr_low.Get() if attr_low.IsValid() else False
-                            p = DynamicPrim(rect_light.GetPath().pathString, name, attr_ndi, attr_low)
-                            result.append(p)
-
-        return result, sources
-
-    def set_prim_ndi_attribute(path: str, value: str):
-        stage = USDtools.get_stage()
-        if not stage:
-            logger = logging.getLogger(__name__)
-            logger.error("Could not get stage")
-            return
-
-        prim: Usd.Prim = stage.GetPrimAtPath(path)
-        if not prim.IsValid():
+        for attribute_name in attribute_names:
+            value: Sdf.AssetPath = USDtools._get_attribute_value(prim, attribute_name, None)
+            if value:
+                path: str = value.path
+                if len(path) > prefix_length and path.startswith(USDtools.PREFIX):
+                    name = path[prefix_length:]
+                    if name not in names:
+                        names.append(name)
+        return names
+
+    def _make_dynamic_prim(prim: Usd.Prim, name: str) -> DynamicPrim:
+        attr_ndi = USDtools._get_attribute_value(prim, USDtools.ATTR_NDI_NAME, None)
+        attr_low = USDtools._get_attribute_value(prim, USDtools.ATTR_BANDWIDTH_NAME, False)
+        attr_latency = USDtools._get_attribute_value(prim, USDtools.ATTR_LATENCY_NAME, False)
+        attr_region = USDtools._get_region(prim)
+        attr_maxfps = USDtools._get_attribute_value(prim, USDtools.ATTR_MAXFPS_NAME, 0.0)
+        return DynamicPrim(prim.GetPath().pathString, name, attr_ndi, attr_low, attr_latency, attr_region,
+                           attr_maxfps)
+
+    def _get_attribute_value(prim: Usd.Prim, name: str, default):
+        attr = prim.GetAttribute(name)
+        return attr.Get() if attr.IsValid() else default
+
+    def _get_region(prim: Usd.Prim) -> Tuple[int, int, int, int]:
+        value = USDtools._get_attribute_value(prim, USDtools.ATTR_REGION_NAME, None)
+        if value is None:
+            return None
+
+        x, y, width, height = (int(v) for v in value)
+        if x < 0 or y < 0 or width <= 0 or height <= 0:
             logger = logging.getLogger(__name__)
-            logger.error(f"Could not set the ndi attribute of prim at {path}")
-            return
+            logger.warning(f"Ignoring invalid region {tuple(value)} of prim at {prim.GetPath()}")
+            return None
+        return (x, y, width, height)
 
-        prim.CreateAttribute(USDtools.ATTR_NDI_NAME, Sdf.ValueTypeNames.String).Set(value)
+    def set_prim_ndi_attribute(path: str, value: str):
+        USDtools.set_prims_attributes([(str(path), USDtools.ATTR_NDI_NAME, value)])
 
     def set_prim_lowbandwidth_attribute(path: str, value: bool):
+        USDtools.set_prims_attributes([(str(path), USDtools.ATTR_BANDWIDTH_NAME, value)])
+
+    def set_prims_attributes(edits: List[Tuple[str, str, object]]) -> int:
+        """
+        Authors many ndi attributes at once, as (prim path, attribute name, value), on the layer of the edit target.
+        A value of None removes the attribute. Every edit is made in a single Sdf.ChangeBlock, so the stage and
+        its listeners are notified once. Returns the number of edits made, edits of missing prims are skipped.
+        """
         stage = USDtools.get_stage()
         if not stage:
             logger = logging.getLogger(__name__)
             logger.error("Could not get stage")
-            return
-
-        prim: Usd.Prim = stage.GetPrimAtPath(path)
-        if not prim.IsValid():
-            logger = logging.getLogger(__name__)
-            logger.error(f"Could not set the bandwidth attribute of prim at {path}")
-
-        prim.CreateAttribute(USDtools.ATTR_BANDWIDTH_NAME, Sdf.ValueTypeNames.Bool).Set(value)
+            return 0
+
+        edit_target: Usd.EditTarget = stage.GetEditTarget()
+        layer: Sdf.Layer = edit_target.GetLayer()
+        valid: List[Tuple[Sdf.Path, str, object]] = []
+        for path, name, value in edits:
+            if name not in USDtools.ATTR_TYPES:
+                raise ValueError(f"{name} is not an ndi attribute")
+            # Prims are checked on the composed stage, only the Sdf API is safe to use inside the change block
+            if not stage.GetPrimAtPath(path).IsValid():
+                logger = logging.getLogger(__name__)
+                logger.error(f"Could not set the {name} attribute of prim at {path}")
+                continue
+            valid.append((edit_target.MapToSpecPath(Sdf.Path(path)), name, value))
+
+        with Sdf.ChangeBlock():
+            for spec_path, name, value in valid:
+                prim_spec: Sdf.PrimSpec = Sdf.CreatePrimInLayer(layer, spec_path)
+                attr_spec: Sdf.AttributeSpec = prim_spec.attributes.get(name)
+                if value is None:
+                    if attr_spec is not None:
+                        prim_spec.RemoveProperty(attr_spec)
+                    continue
+                if attr_spec is None:
+                    attr_spec = Sdf.AttributeSpec(prim_spec, name, USDtools.ATTR_TYPES[name], declaresCustom=True)
+                attr_spec.default = Gf.Vec4i(*value) if name == USDtools.ATTR_REGION_NAME else value
+        return len(valid)
 
 # region stage events
     def subscribe_to_stage_events(callback):
@@ -162,6 +243,10 @@ class USDtools():
             .create_subscription_to_pop(callback, name="mf.ov.ndi.STAGE_EVENT")
         )
 
+    def subscribe_to_stage_changes(stage: Usd.Stage, callback):
+        """callback(notice, stage) is called for each Usd.Notice.ObjectsChanged of the stage until revoke()."""
+        return Tf.Notice.Register(Usd.Notice.ObjectsChanged, callback, stage)
+
     def is_StageEventType_OPENED(type) -> bool:
         return type == int(omni.usd.StageEventType.OPENED)
 
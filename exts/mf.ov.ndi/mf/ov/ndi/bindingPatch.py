@@ -0,0 +1,120 @@
+import csv
+from dataclasses import dataclass
+import io
+import json
+import os
+import re
+from typing import Dict, List, Tuple
+
+
+@dataclass
+class BindingPatch():
+    """New values of a binding, None leaves a value as it is."""
+    dynamic_id: str
+    ndi_source: str = None
+    lowbandwidth: bool = None
+    lowlatency: bool = None
+    max_fps: float = None
+    region: Tuple[int, int, int, int] = None  # (x, y, width, height), () removes the region
+
+
+class BindingPatchReader():
+    """
+    Reads a list of binding patches from CSV or JSON.
+
+    CSV has a header row with a `dynamic_id` column and any of `source`, `lowbandwidth`, `lowlatency`, `maxfps` and
+    `region`, an empty cell leaves the value as it is. JSON is a list of objects with the same keys. A region is
+    "x y width height" (any of space, comma or semicolon between the numbers) or a list of 4 numbers in JSON, "none"
+    (null in JSON) removes it.
+    """
+    KEY_ID = "dynamic_id"
+    KEY_SOURCE = "source"
+    KEY_BANDWIDTH = "lowbandwidth"
+    KEY_LATENCY = "lowlatency"
+    KEY_MAXFPS = "maxfps"
+    KEY_REGION = "region"
+    KEYS = (KEY_ID, KEY_SOURCE, KEY_BANDWIDTH, KEY_LATENCY, KEY_MAXFPS, KEY_REGION)
+
+    TRUE_VALUES = ("true", "1", "yes", "on")
+    FALSE_VALUES = ("false", "0", "no", "off")
+    NO_REGION = "none"
+
+    def read_file(path: str) -> List[BindingPatch]:
+        """Format from the extension, .json or anything else as CSV. Raises OSError or ValueError."""
+        with open(path, "r", encoding="utf-8-sig", newline="") as file:
+            text = file.read()
+        if os.path.splitext(path)[1].lower() == ".json":
+            return BindingPatchReader.read_json(text)
+        return BindingPatchReader.read_csv(text)
+
+    def read_csv(text: str) -> List[BindingPatch]:
+        reader = csv.DictReader(io.StringIO(text, newline=""), skipinitialspace=True)
+        if reader.fieldnames is None or BindingPatchReader.KEY_ID not in reader.fieldnames:
+            raise ValueError(f"CSV binding patches need a \"{BindingPatchReader.KEY_ID}\" column")
+
+        patches: List[BindingPatch] = []
+        for row in reader:
+            # Empty cells are the same as missing keys, only "none" removes a region
+            values = {k: v.strip() for k, v in row.items() if k in BindingPatchReader.KEYS and v and v.strip()}
+            if BindingPatchReader.KEY_REGION in values and values[BindingPatchReader.KEY_REGION].lower() == \
+                    BindingPatchReader.NO_REGION:
+                values[BindingPatchReader.KEY_REGION] = None
+            patches.append(BindingPatchReader._make_patch(values, f"line {reader.line_num}"))
+        return patches
+
+    def read_json(text: str) -> List[BindingPatch]:
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON binding patches: {e}")
+        if not isinstance(items, list):
+            raise ValueError("JSON binding patches must be a list of objects")
+
+        patches: List[BindingPatch] = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f"Binding patch {i} is not an object")
+            patches.append(BindingPatchReader._make_patch(item, f"patch {i}"))
+        return patches
+
+    def _make_patch(values: Dict[str, object], where: str) -> BindingPatch:
+        dynamic_id = values.get(BindingPatchReader.KEY_ID, None)
+        if not dynamic_id:
+            raise ValueError(f"Missing {BindingPatchReader.KEY_ID} ({where})")
+
+        patch = BindingPatch(str(dynamic_id))
+        try:
+            if values.get(BindingPatchReader.KEY_SOURCE, None) is not None:
+                patch.ndi_source = str(values[BindingPatchReader.KEY_SOURCE])
+            if values.get(BindingPatchReader.KEY_BANDWIDTH, None) is not None:
+                patch.lowbandwidth = BindingPatchReader._to_bool(values[BindingPatchReader.KEY_BANDWIDTH])
+            if values.get(BindingPatchReader.KEY_LATENCY, None) is not None:
+                patch.lowlatency = BindingPatchReader._to_bool(values[BindingPatchReader.KEY_LATENCY])
+            if values.get(BindingPatchReader.KEY_MAXFPS, None) is not None:
+                patch.max_fps = max(float(values[BindingPatchReader.KEY_MAXFPS]), 0.0)
+            if BindingPatchReader.KEY_REGION in values:
+                patch.region = BindingPatchReader._to_region(values[BindingPatchReader.KEY_REGION])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid binding patch for {dynamic_id} ({where}): {e}")
+        return patch
+
+    def _to_bool(value) -> bool:
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in BindingPatchReader.TRUE_VALUES:
+            return True
+        if text in BindingPatchReader.FALSE_VALUES:
+            return False
+        raise ValueError(f"\"{value}\" is not a boolean")
+
+    def _to_region(value) -> Tuple[int, int, int, int]:
+        if value is None:
+            return ()
+        numbers = re.split(r"[\s,;]+", value.strip()) if isinstance(value, str) else list(value)
+        if len(numbers) != 4:
+            raise ValueError(f"a region is 4 numbers, got {value}")
+        x, y, width, height = (int(v) for v in numbers)
+        if x < 0 or y < 0 or width <= 0 or height <= 0:
+            raise ValueError(f"invalid region {value}")
+        return (x, y, width, height)
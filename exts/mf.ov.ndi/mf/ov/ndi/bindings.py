@@ -3,7 +3,7 @@ from .eventsystem import EventSystem
 
 import carb.events
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Tuple
 
 
 @dataclass
@@ -12,6 +12,9 @@ class DynamicPrim:
     dynamic_id: str
     ndi_source_attr: str
     lowbandwidth_attr: bool
+    lowlatency_attr: bool = False
+    region_attr: Tuple[int, int, int, int] = None  # (x, y, width, height), None for the whole frame
+    maxfps_attr: float = 0.0
 
 
 @dataclass
@@ -19,6 +22,9 @@ class Binding():
     dynamic_id: str
     ndi_source: str
     lowbandwidth: bool
+    lowlatency: bool = False
+    region: Tuple[int, int, int, int] = None
+    max_fps: float = 0.0  # 0 or less uploads every frame
 
 
 @dataclass
@@ -28,14 +34,28 @@ class NDIData():
 
 
 class BindingsModel():
+    """
+    Bindings, dynamic prims and NDI® sources of the stage.
+
+    Each is kept in a list, for the order of the panels and the combobox, and indexed in dicts by dynamic id, prim path
+    and source name so lookups don't depend on the size of the stage. A source activity update only touches the sources
+    that changed.
+    """
     NONE_DATA = NDIData(ComboboxModel.NONE_VALUE, False)
 
     def __init__(self):
         self._bindings: List[Binding] = []
+        self._bindings_by_id: Dict[str, Binding] = {}
         self._dynamic_prims: List[DynamicPrim] = []
+        self._prims_by_id: Dict[str, List[DynamicPrim]] = {}
+        self._prims_by_path: Dict[str, DynamicPrim] = {}
         self._ndi_sources: List[NDIData] = []
+        self._ndi_by_source: Dict[str, NDIData] = {}
+        self._source_list: List[str] = []  # Names of _ndi_sources, rebuilt when a source is added
 
         self._ndi_sources.append(BindingsModel.NONE_DATA)
+        self._ndi_by_source[BindingsModel.NONE_DATA.source] = BindingsModel.NONE_DATA
+        self._source_list.append(BindingsModel.NONE_DATA.source)
 
         self._sub = EventSystem.subscribe(EventSystem.NDIFINDER_NEW_SOURCES, self._ndi_sources_change_evt_callback)
 
@@ -44,27 +64,46 @@ class BindingsModel():
         self._sub = None
 
         self._dynamic_prims = []
+        self._prims_by_id = {}
+        self._prims_by_path = {}
         self._bindings = []
+        self._bindings_by_id = {}
         self._ndi_sources = []
+        self._ndi_by_source = {}
+        self._source_list = []
 
     def count(self):
         return len(self._bindings)
 
-    def get(self, index: int) -> Binding:
-        binding: Binding = self._bindings[index]
-        prim: DynamicPrim = self.find_binding_from_id(binding.dynamic_id)
+    def get(self, index: int) -> Tuple[Binding, DynamicPrim, NDIData]:
+        return self.get_from_id(self._bindings[index].dynamic_id)
+
+    def get_from_id(self, dynamic_id: str) -> Tuple[Binding, DynamicPrim, NDIData]:
+        binding: Binding = self._bindings_by_id[dynamic_id]
+        prims: List[DynamicPrim] = self._prims_by_id.get(binding.dynamic_id, [])
+        prim: DynamicPrim = prims[0] if len(prims) > 0 else None
         ndi: NDIData = self._find_ndi_from_source(binding.ndi_source)
         return binding, prim, ndi
 
+    def get_bindings(self) -> List[Binding]:
+        return [x for x in self._bindings]
+
     def get_source_list(self) -> List[str]:
-        return [x.source for x in self._ndi_sources]
+        """Shared, must not be modified."""
+        return self._source_list
 
     def _get_non_static_source_list(self) -> List[NDIData]:
         return self._ndi_sources[1:]  # Excludes NONE_DATA
 
-    def get_prim_list(self) -> List[str]:
+    def get_prim_list(self) -> List[DynamicPrim]:
         return [x for x in self._dynamic_prims]
 
+    def get_prims_with_id(self, dynamic_id: str) -> List[DynamicPrim]:
+        return self._prims_by_id.get(dynamic_id, [])
+
+    def find_prim_from_path(self, path: str) -> DynamicPrim:
+        return self._prims_by_path.get(path, None)
+
     def bind(self, dynamic_id, new_source):
         binding: Binding = self.find_binding_from_id(dynamic_id)
         binding.ndi_source = new_source
@@ -73,55 +112,111 @@ class BindingsModel():
         binding: Binding = self.find_binding_from_id(dynamic_id)
         binding.lowbandwidth = value
 
-    def find_binding_from_id(self, dynamic_id: str) -> Binding:
-        return next((x for x in self._bindings if x.dynamic_id == dynamic_id), None)
+    def set_low_latency(self, dynamic_id: str, value: bool):
+        binding: Binding = self.find_binding_from_id(dynamic_id)
+        binding.lowlatency = value
 
-    def _find_binding_from_ndi(self, ndi_source: str) -> Binding:
-        return next((x for x in self._bindings if x.source == ndi_source), None)
+    def set_region(self, dynamic_id: str, value: Tuple[int, int, int, int]):
+        binding: Binding = self.find_binding_from_id(dynamic_id)
+        binding.region = value
+
+    def set_max_fps(self, dynamic_id: str, value: float):
+        binding: Binding = self.find_binding_from_id(dynamic_id)
+        binding.max_fps = value
+
+    def find_binding_from_id(self, dynamic_id: str) -> Binding:
+        return self._bindings_by_id.get(dynamic_id, None)
 
     def _find_ndi_from_source(self, ndi_source: str) -> NDIData:
         if ndi_source is None:
             return self._ndi_sources[0]
-        return next((x for x in self._ndi_sources if x.source == ndi_source), None)
+        return self._ndi_by_source.get(ndi_source, None)
 
     def update_dynamic_prims(self, prims: List[DynamicPrim]):
         self._dynamic_prims = prims
+        self._prims_by_id = {}
+        for prim in prims:
+            self._prims_by_id.setdefault(prim.dynamic_id, []).append(prim)
+        self._prims_by_path = {x.path: x for x in prims}
         self._update_ndi_from_prims()
-        self._update_bindings_from_prims()
-        EventSystem.send_event(EventSystem.BINDINGS_CHANGED_EVENT)
+        added, removed, changed = self._update_bindings_from_prims()
 
-    def _update_ndi_from_prims(self):
-        for dynamic_prim in self._dynamic_prims:
-            ndi: NDIData = self._find_ndi_from_source(dynamic_prim.ndi_source_attr)
-            if ndi is None:
-                self._ndi_sources.append(NDIData(dynamic_prim.ndi_source_attr, False))
+        # Only the dynamic ids that changed, empty lists are left out since carb can't tell the type of their items
+        payload = {}
+        for key, ids in (("added", added), ("removed", removed), ("changed", changed)):
+            if len(ids) > 0:
+                payload[key] = ids
+        if len(payload) > 0:
+            EventSystem.send_event(EventSystem.BINDINGS_CHANGED_EVENT, payload=payload)
 
-    def _update_bindings_from_prims(self):
-        self._bindings.clear()
+    def _update_ndi_from_prims(self):
+        new_sources = False
         for dynamic_prim in self._dynamic_prims:
+            source = dynamic_prim.ndi_source_attr
+            if source is not None and source not in self._ndi_by_source:
+                data = NDIData(source, False)
+                self._ndi_sources.append(data)
+                self._ndi_by_source[source] = data
+                new_sources = True
+        if new_sources:
+            self._source_list = [x.source for x in self._ndi_sources]
+
+    def _update_bindings_from_prims(self) -> Tuple[List[str], List[str], List[str]]:
+        """Diffs the bindings with the prims, returns the added, removed and changed dynamic ids."""
+        added: List[str] = []
+        changed: List[str] = []
+        bindings_by_id: Dict[str, Binding] = {}
+        # Prims sharing a dynamic id share its texture, the first one found makes the binding
+        for dynamic_id, prims in self._prims_by_id.items():
+            dynamic_prim = prims[0]
             source_attr = dynamic_prim.ndi_source_attr
             source: str = source_attr if source_attr is not None else BindingsModel.NONE_DATA.source
-            self._bindings.append(Binding(dynamic_prim.dynamic_id, source, dynamic_prim.lowbandwidth_attr))
+            binding = Binding(dynamic_id, source, dynamic_prim.lowbandwidth_attr, dynamic_prim.lowlatency_attr,
+                              dynamic_prim.region_attr, dynamic_prim.maxfps_attr)
+            previous: Binding = self._bindings_by_id.get(dynamic_id, None)
+            if previous is None:
+                added.append(dynamic_id)
+            elif previous == binding:
+                binding = previous
+            else:
+                changed.append(dynamic_id)
+            bindings_by_id[dynamic_id] = binding
+
+        removed = [x for x in self._bindings_by_id if x not in bindings_by_id]
+        # Bindings keep their order, new ones come last
+        kept = [bindings_by_id[x.dynamic_id] for x in self._bindings if x.dynamic_id in bindings_by_id]
+        self._bindings = kept + [bindings_by_id[x] for x in added]
+        self._bindings_by_id = bindings_by_id
+        return added, removed, changed
 
     def _ndi_sources_change_evt_callback(self, e: carb.events.IEvent):
-        sources = e.payload["sources"]
-        self._update_ndi_new_and_active_sources(sources)
-        self._update_ndi_inactive_sources(sources)
-        EventSystem.send_event(EventSystem.COMBOBOX_SOURCE_CHANGE_EVENT,
-                               payload={"sources": [x.source for x in self._ndi_sources]})
+        # Only what changed since the previous event, removed sources are kept but inactive
+        added: List[str] = list(e.payload.get("added", []))
+        removed: List[str] = list(e.payload.get("removed", []))
+        self.update_ndi_sources(added, removed)
+
+    def update_ndi_sources(self, added: List[str], removed: List[str]):
+        self._update_ndi_added_sources(added)
+        self._update_ndi_removed_sources(removed)
+        EventSystem.send_event(EventSystem.COMBOBOX_SOURCE_CHANGE_EVENT, payload={"sources": self._source_list})
         EventSystem.send_event(EventSystem.NDI_STATUS_CHANGE_EVENT)
 
-    def _update_ndi_new_and_active_sources(self, sources: List[str]):
+    def _update_ndi_added_sources(self, sources: List[str]):
+        new_sources = False
         for source in sources:
-            data: NDIData = self._find_ndi_from_source(source)
+            data: NDIData = self._ndi_by_source.get(source, None)
             if data is None:
                 data = NDIData(source, True)
                 self._ndi_sources.append(data)
+                self._ndi_by_source[source] = data
+                new_sources = True
             else:
                 data.active = True
+        if new_sources:
+            self._source_list = [x.source for x in self._ndi_sources]
 
-    def _update_ndi_inactive_sources(self, sources: List[str]):
-        for ndi in self._get_non_static_source_list():
-            is_active = next((x for x in sources if x == ndi.source), None)
-            if is_active is None:
-                ndi.active = False
+    def _update_ndi_removed_sources(self, sources: List[str]):
+        for source in sources:
+            data: NDIData = self._ndi_by_source.get(source, None)
+            if data is not None and data is not BindingsModel.NONE_DATA:
+                data.active = False
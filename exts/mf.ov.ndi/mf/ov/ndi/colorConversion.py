@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class UYVYConverter():
+    """
+    Converts UYVY (4:2:2, limited range) frames to RGBA with vectorized numpy operations.
+
+    All intermediate and output buffers are allocated once per resolution and reused, the returned array is only
+    valid until the next call to convert.
+    """
+    BT601 = "BT601"
+    BT709 = "BT709"
+    AUTO = "AUTO"  # BT601 for SD resolutions, BT709 above, like most NDI® senders
+
+    HD_MIN_HEIGHT = 720
+
+    _LUMA_COEFFICIENTS = {  # (Kr, Kb)
+        BT601: (0.299, 0.114),
+        BT709: (0.2126, 0.0722),
+    }
+
+    def __init__(self, colorimetry: str = AUTO):
+        self._colorimetry = colorimetry
+        self._shape = None
+        self._alpha_is_opaque = False
+
+    def get_colorimetry(self, height: int) -> str:
+        if self._colorimetry != UYVYConverter.AUTO:
+            return self._colorimetry
+        return UYVYConverter.BT709 if height >= UYVYConverter.HD_MIN_HEIGHT else UYVYConverter.BT601
+
+    def _coefficients(self, colorimetry: str):
+        kr, kb = UYVYConverter._LUMA_COEFFICIENTS[colorimetry]
+        kg = 1.0 - kr - kb
+        c = 255.0 / 224.0  # Chroma is stored in [16, 240]
+        r_v = 2.0 * (1.0 - kr) * c
+        g_u = -2.0 * kb * (1.0 - kb) / kg * c
+        g_v = -2.0 * kr * (1.0 - kr) / kg * c
+        b_u = 2.0 * (1.0 - kb) * c
+        return r_v, g_u, g_v, b_u
+
+    def _allocate(self, width: int, height: int):
+        half = width // 2
+        self._shape = (width, height)
+        self._y = np.empty((height, half, 2), dtype=np.float32)
+        self._u = np.empty((height, half), dtype=np.float32)
+        self._v = np.empty((height, half), dtype=np.float32)
+        self._chroma = np.empty((height, half), dtype=np.float32)
+        self._scratch = np.empty((height, half), dtype=np.float32)
+        self._channel = np.empty((height, half, 2), dtype=np.float32)
+        self._rgba = np.empty((height, width, 4), dtype=np.uint8)
+        self._alpha_is_opaque = False
+
+    def convert(self, uyvy: np.ndarray, width: int, height: int, alpha: np.ndarray = None) -> np.ndarray:
+        """
+        uyvy holds height lines of width * 2 bytes (U0 Y0 V0 Y1 ...), in any shape. alpha, when the frame is UYVA,
+        holds height lines of width bytes. Returns a (height, width, 4) uint8 RGBA array.
+        """
+        if self._shape != (width, height):
+            self._allocate(width, height)
+
+        half = width // 2
+        packed = uyvy.reshape(height, half, 4)
+        r_v, g_u, g_v, b_u = self._coefficients(self.get_colorimetry(height))
+
+        # Luma is stored in [16, 235], 0.5 rounds the truncating cast to uint8 at the end
+        np.subtract(packed[..., 1::2], 16.0, out=self._y, casting="unsafe")
+        np.multiply(self._y, 255.0 / 219.0, out=self._y)
+        np.add(self._y, 0.5, out=self._y)
+        np.subtract(packed[..., 0], 128.0, out=self._u, casting="unsafe")
+        np.subtract(packed[..., 2], 128.0, out=self._v, casting="unsafe")
+
+        # Each chroma sample is shared by two horizontally adjacent pixels
+        rgba = self._rgba.reshape(height, half, 2, 4)
+        np.multiply(self._v, r_v, out=self._chroma)
+        self._write_channel(rgba, 0)
+        np.multiply(self._u, g_u, out=self._chroma)
+        np.multiply(self._v, g_v, out=self._scratch)
+        np.add(self._chroma, self._scratch, out=self._chroma)
+        self._write_channel(rgba, 1)
+        np.multiply(self._u, b_u, out=self._chroma)
+        self._write_channel(rgba, 2)
+
+        if alpha is not None:
+            self._rgba[..., 3] = alpha.reshape(height, width)
+            self._alpha_is_opaque = False
+        elif not self._alpha_is_opaque:
+            self._rgba[..., 3] = 255
+            self._alpha_is_opaque = True
+        return self._rgba
+
+    def _write_channel(self, rgba: np.ndarray, index: int):
+        np.add(self._y, self._chroma[..., np.newaxis], out=self._channel)
+        np.clip(self._channel, 0.0, 255.0, out=self._channel)
+        rgba[..., index] = self._channel
@@ -17,10 +17,9 @@ class ComboboxModel(ui.AbstractItemModel):
     NONE_VALUE = "NONE"
     PROXY_VALUE = "PROXY (1080p30) - RED"
 
-    def __init__(self, items: List[str], selected: str, name: str, index: int):
+    def __init__(self, items: List[str], selected: str, name: str):
         super().__init__()
         self._name = name
-        self._index = index
 
         # minimal model implementation
         self._current_index = ui.SimpleIntModel()
@@ -31,12 +30,19 @@ class ComboboxModel(ui.AbstractItemModel):
     def _current_index_changed_fn(self):
         self._item_changed(None)
         EventSystem.send_event(EventSystem.COMBOBOX_CHANGED_EVENT,
-                               payload={"id": self._name, "index": self._index, "value": self._current_value()})
+                               payload={"id": self._name, "value": self._current_value()})
 
     def set_items_and_current(self, items: List[str], current: str):
         self._items = [ComboboxItem(text) for text in items]
         self._set_current_from_value(current)
 
+    def set_current_value(self, value: str) -> bool:
+        """Selects the item of that value, False if there's none, the selection is then left as it is."""
+        if not any(item.value() == value for item in self._items):
+            return False
+        self._set_current_from_value(value)
+        return True
+
     def _set_current_from_value(self, current: str):
         index = next((i for i, item in enumerate(self._items) if item.value() == current), 0)
         self._current_index.set_value(index)
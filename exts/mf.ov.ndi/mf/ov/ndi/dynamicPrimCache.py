@@ -0,0 +1,180 @@
+from .bindings import DynamicPrim
+from .USDtools import USDtools
+
+import carb.events
+import logging
+import omni.kit.app
+from pxr import Sdf, Usd
+import threading
+import time
+from typing import Callable, Dict, List, Set, Tuple
+
+
+class DynamicPrimCache():
+    """
+    Dynamic prims of a stage, indexed by the path of their shader or rect light and kept up to date from the change
+    notices of the stage.
+
+    Notices only collect the paths that changed. They are re-examined together once the stage was left alone for
+    `debounce` seconds, or every MAX_DELAY seconds during continuous edits, then on_changed_fn is called with every
+    dynamic prim if any of them changed. A resynced prim is traversed again with its descendants, an edited attribute
+    only re-examines its prim, and only if the attribute is one that changes a binding.
+    """
+    DEBOUNCE = 0.25  # seconds without a change before the changed paths are re-examined
+    MAX_DELAY = 1.0  # seconds, the changed paths are re-examined at least that often while the stage keeps changing
+
+    def __init__(self, stage: Usd.Stage, on_changed_fn: Callable[[List[DynamicPrim]], None],
+                 debounce: float = DEBOUNCE):
+        self._stage = stage
+        self._on_changed_fn = on_changed_fn
+        self._debounce = debounce
+        self._entries: Dict[Sdf.Path, Tuple[int, List[DynamicPrim]]] = {}
+
+        # Notices can come from any thread that edits the stage, they only fill these under the lock
+        self._lock = threading.Lock()
+        self._resynced: Set[Sdf.Path] = set()  # prims to traverse again with their descendants
+        self._changed: Set[Sdf.Path] = set()  # prims with an edited attribute
+        self._first_change: float = None
+        self._last_change: float = None
+
+        self.rescan()
+        self._listener = USDtools.subscribe_to_stage_changes(stage, self._on_objects_changed)
+        stream = omni.kit.app.get_app().get_update_event_stream()
+        self._sub = stream.create_subscription_to_pop(self._on_update, name="mf.ov.ndi dynamic prims")
+
+    def destroy(self):
+        self._sub.unsubscribe()
+        self._sub = None
+        self._listener.Revoke()
+        self._listener = None
+        self._entries = {}
+
+    def get_stage(self) -> Usd.Stage:
+        return self._stage
+
+    def get_dynamic_prims(self) -> List[DynamicPrim]:
+        return USDtools.merge_dynamic_prims(self._entries.values())
+
+    def has_pending_changes(self) -> bool:
+        with self._lock:
+            return self._last_change is not None
+
+    def rescan(self) -> List[DynamicPrim]:
+        """Traverses the whole stage again, the changes waiting to be examined are dropped."""
+        self._take_changes()
+        self._entries = USDtools.find_dynamic_prims_below(self._stage.GetPseudoRoot())
+        return self.get_dynamic_prims()
+
+    def flush(self) -> bool:
+        """Examines the changed paths right away, True if the dynamic prims changed."""
+        resynced, changed = self._take_changes()
+        if not self._update_entries(resynced, changed):
+            return False
+        self._on_changed_fn(self.get_dynamic_prims())
+        return True
+
+    def _on_objects_changed(self, notice: Usd.Notice.ObjectsChanged, stage: Usd.Stage):
+        resynced: List[Sdf.Path] = []
+        changed: List[Sdf.Path] = []
+        for path in notice.GetResyncedPaths():
+            if not path.IsPropertyPath():
+                resynced.append(path)
+            elif path.name in USDtools.WATCHED_ATTRIBUTES:  # Created or removed
+                changed.append(path.GetPrimPath())
+        for path in notice.GetChangedInfoOnlyPaths():
+            if path.IsPropertyPath() and path.name in USDtools.WATCHED_ATTRIBUTES:
+                changed.append(path.GetPrimPath())
+        if len(resynced) == 0 and len(changed) == 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._resynced.update(resynced)
+            self._changed.update(changed)
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+
+    def _on_update(self, e: carb.events.IEvent):
+        now = time.monotonic()
+        with self._lock:
+            if self._last_change is None:
+                return
+            if now - self._last_change < self._debounce and now - self._first_change < DynamicPrimCache.MAX_DELAY:
+                return
+
+        try:
+            self.flush()
+        except Exception:
+            logger = logging.getLogger(__name__)
+            logger.exception("Could not update the dynamic textures from the stage changes")
+
+    def _take_changes(self) -> Tuple[Set[Sdf.Path], Set[Sdf.Path]]:
+        with self._lock:
+            resynced, changed = self._resynced, self._changed
+            self._resynced, self._changed = set(), set()
+            self._first_change = None
+            self._last_change = None
+        return resynced, changed
+
+    def _update_entries(self, resynced: Set[Sdf.Path], changed: Set[Sdf.Path]) -> bool:
+        modified = False
+        added = False
+
+        # Only the outermost resynced prims are traversed, their descendants with them
+        roots: Set[Sdf.Path] = set(Sdf.Path.RemoveDescendentPaths(list(resynced)))
+        if len(roots) > 0:
+            for path in [x for x in self._entries if self._is_below(x, roots)]:
+                del self._entries[path]
+                modified = True
+            for root in roots:
+                prim: Usd.Prim = self._stage.GetPrimAtPath(root)
+                if not USDtools.is_traversed(prim):
+                    continue  # Removed, deactivated, or not reached by a traversal
+                found = USDtools.find_dynamic_prims_below(prim)
+                if len(found) > 0:
+                    self._entries.update(found)
+                    modified = True
+                    added = True
+
+        for path in changed:
+            if self._is_below(path, roots):
+                continue  # Already traversed again
+            entry = USDtools.find_dynamic_prims_on(self._stage.GetPrimAtPath(path))
+            previous = self._entries.get(path, None)
+            if entry == previous:
+                continue
+            if entry is None:
+                del self._entries[path]
+            else:
+                added = added or previous is None
+                self._entries[path] = entry  # An existing prim keeps its place
+            modified = True
+
+        if added:
+            self._sort_entries()
+        return modified
+
+    def _sort_entries(self):
+        """
+        Puts the entries back in traversal order, the first shader of a dynamic id makes its binding like after a
+        full traversal. Only the children of the ancestors of the entries are looked at.
+        """
+        orders: Dict[Sdf.Path, Dict[str, int]] = {}  # parent path -> child name -> index
+
+        def key(path: Sdf.Path) -> List[int]:
+            indices = []
+            for prefix in path.GetPrefixes():
+                parent = prefix.GetParentPath()
+                order = orders.get(parent, None)
+                if order is None:
+                    names = self._stage.GetPrimAtPath(parent).GetChildrenNames()
+                    order = {name: i for i, name in enumerate(names)}
+                    orders[parent] = order
+                indices.append(order.get(prefix.name, len(order)))
+            return indices
+
+        self._entries = {path: self._entries[path] for path in sorted(self._entries, key=key)}
+
+    def _is_below(self, path: Sdf.Path, roots: Set[Sdf.Path]) -> bool:
+        return len(roots) > 0 and any(x in roots for x in path.GetPrefixes())
@@ -9,6 +9,8 @@ class EventSystem():
     COMBOBOX_SOURCE_CHANGE_EVENT = carb.events.type_from_string("mf.ov.ndi.COMBOBOX_SOURCE_CHANGE_EVENT")
     NDI_STATUS_CHANGE_EVENT = carb.events.type_from_string("mf.ov.ndi.NDI_STATUS_CHANGE_EVENT")
     STREAM_STOP_TIMEOUT_EVENT = carb.events.type_from_string("mf.ov.ndi.STREAM_STOP_TIMEOUT_EVENT")
+    STANDBYS_CHANGED_EVENT = carb.events.type_from_string("mf.ov.ndi.STANDBYS_CHANGED_EVENT")
+    TRACING_CHANGED_EVENT = carb.events.type_from_string("mf.ov.ndi.TRACING_CHANGED_EVENT")
 
     def subscribe(event: int, cb: callable) -> carb.events.ISubscription:
         bus = omni.kit.app.get_app().get_message_bus_event_stream()
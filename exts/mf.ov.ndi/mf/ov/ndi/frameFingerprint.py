@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class FrameFingerprint():
+    """
+    Detects frames identical to the previous one (slides, paused playback) without reading every byte.
+
+    A grid of tiles spread over the frame is gathered into a reused buffer and hashed with a vectorized multiply-add
+    over 64 bits words. A change that doesn't touch any sampled tile goes unnoticed, the caller is expected to refresh
+    every so often anyway.
+    """
+    ROWS = 32  # sampled rows, spread over the height of the frame
+    TILES = 32  # sampled tiles per row, spread over its width
+    TILE_BYTES = 64  # contiguous bytes per tile, a cache line
+
+    def __init__(self, rows: int = ROWS, tiles: int = TILES, tile_bytes: int = TILE_BYTES):
+        self._rows = rows
+        self._tiles = tiles
+        self._tile_bytes = tile_bytes
+        self._layout = None
+
+    def compute(self, frame: np.ndarray) -> int:
+        """
+        Any shape and dtype, as long as every row is contiguous. Rows may be strided, i.e. a region of a frame.
+        The shape is part of the fingerprint, frames of a new resolution never match the previous ones.
+        """
+        lines = self._get_lines(frame)
+        height, row_bytes = lines.shape
+        if self._layout != (height, row_bytes):
+            self._allocate(height, row_bytes)
+
+        np.take(lines, self._row_indices, axis=0, out=self._rows_buffer)
+        np.take(self._rows_buffer, self._byte_indices, axis=1, out=self._sample)
+        words = self._sample.view(np.uint64)
+        np.multiply(words, self._weights, out=self._product)
+        return hash((frame.shape, int(self._product.sum(dtype=np.uint64))))
+
+    def _get_lines(self, frame: np.ndarray) -> np.ndarray:
+        # A bytes view of each row, reshaping a region would silently copy the whole of it
+        if frame.ndim < 2 or frame.shape[0] == 0 or not frame[0].flags.c_contiguous:
+            raise ValueError("Frame rows must be contiguous")
+        row_bytes = frame[0].nbytes
+        return np.lib.stride_tricks.as_strided(frame[0].reshape(-1).view(np.uint8), shape=(frame.shape[0], row_bytes),
+                                               strides=(frame.strides[0], 1), writeable=False)
+
+    def _allocate(self, height: int, row_bytes: int):
+        self._layout = (height, row_bytes)
+        rows = max(1, min(self._rows, height))
+        self._row_indices = np.linspace(0, height - 1, rows).astype(np.intp)
+        self._rows_buffer = np.empty((rows, row_bytes), dtype=np.uint8)
+
+        # Tiles start on 8 bytes boundaries and are sized in whole words so the sample can be viewed as uint64
+        if row_bytes < 8:
+            self._byte_indices = np.resize(np.arange(row_bytes, dtype=np.intp), 8)
+        else:
+            tile_bytes = max(8, min(self._tile_bytes, row_bytes) // 8 * 8)
+            tiles = max(1, min(self._tiles, row_bytes // tile_bytes))
+            starts = np.linspace(0, row_bytes - tile_bytes, tiles).astype(np.intp) // 8 * 8
+            self._byte_indices = (starts[:, np.newaxis] + np.arange(tile_bytes)).ravel()
+        self._sample = np.empty((rows, self._byte_indices.size), dtype=np.uint8)
+
+        # Odd weights, fixed seed so fingerprints are comparable between runs
+        generator = np.random.default_rng(0x4E4449)
+        words_shape = (rows, self._byte_indices.size // 8)
+        self._weights = generator.integers(0, 2**63, size=words_shape, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._product = np.empty(words_shape, dtype=np.uint64)
@@ -0,0 +1,107 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import logging
+import threading
+from typing import Callable, Dict, List, Sequence
+
+
+class MetricsWriter():
+    """
+    Builds a page in the Prometheus text exposition format.
+
+    Samples can be added in any order, they are grouped under their metric family when the page is written.
+    """
+    COUNTER = "counter"
+    GAUGE = "gauge"
+    HISTOGRAM = "histogram"
+
+    def __init__(self):
+        self._families: Dict[str, List[str]] = {}  # name -> lines, in declaration order
+
+    def declare(self, name: str, kind: str, description: str):
+        self._families[name] = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+
+    def sample(self, name: str, value: float, labels: Dict[str, str] = None, suffix: str = ""):
+        self._families[name].append(f"{name}{suffix}{self._format_labels(labels)} {self._format_value(value)}")
+
+    def histogram(self, name: str, bounds: Sequence[float], cumulative_counts: Sequence[int], total: float,
+                  labels: Dict[str, str] = None):
+        """cumulative_counts has one more item than bounds, the count of every observation (+Inf bucket)."""
+        labels = labels or {}
+        for bound, count in zip(bounds, cumulative_counts):
+            self.sample(name, count, {**labels, "le": self._format_value(bound)}, "_bucket")
+        self.sample(name, cumulative_counts[-1], {**labels, "le": "+Inf"}, "_bucket")
+        self.sample(name, total, labels, "_sum")
+        self.sample(name, cumulative_counts[-1], labels, "_count")
+
+    def to_text(self) -> str:
+        return "".join(line + "\n" for lines in self._families.values() for line in lines)
+
+    def _format_labels(self, labels: Dict[str, str]) -> str:
+        if not labels:
+            return ""
+        pairs = [f'{key}="{self._escape(str(value))}"' for key, value in labels.items()]
+        return "{" + ",".join(pairs) + "}"
+
+    def _escape(self, value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    def _format_value(self, value: float) -> str:
+        if isinstance(value, int):
+            return str(value)
+        return repr(float(value))
+
+
+class MetricsServer():
+    """
+    Serves the page returned by collect_fn on http://host:port/metrics, from its own thread.
+
+    Listens on localhost by default, scrapes never wait on the Kit update loop, collect_fn is called from the server
+    thread and must only read state.
+    """
+    DEFAULT_HOST = "127.0.0.1"
+    PATH = "/metrics"
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+    POLL_INTERVAL = 0.1  # seconds, how long destroy can wait for the server thread to notice
+
+    def __init__(self, collect_fn: Callable[[], str], port: int, host: str = DEFAULT_HOST):
+        self._collect_fn = collect_fn
+        self._server = HTTPServer((host, port), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mf.ov.ndi.MetricsServer",
+                                        kwargs={"poll_interval": MetricsServer.POLL_INTERVAL}, daemon=True)
+        self._thread.start()
+
+    def destroy(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def get_port(self) -> int:
+        return self._server.server_address[1]
+
+    def _make_handler(self):
+        collect_fn = self._collect_fn
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != MetricsServer.PATH:
+                    self.send_error(404)
+                    return
+
+                try:
+                    body = collect_fn().encode("utf-8")
+                except Exception as e:
+                    logger = logging.getLogger(__name__)
+                    logger.error(f"Could not collect metrics: {e}")
+                    self.send_error(500)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", MetricsServer.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Every scrape would end up in the Kit console
+
+        return Handler
@@ -1,19 +1,29 @@
+from .bindingPatch import BindingPatch, BindingPatchReader
 from .bindings import Binding, BindingsModel
 from .comboboxModel import ComboboxModel
+from .dynamicPrimCache import DynamicPrimCache
 from .NDItools import NDItools
 from .USDtools import DynamicPrim, USDtools
 
+import carb.settings
+from concurrent.futures import Future
+import dataclasses
 import logging
 import re
-from typing import List
+from typing import Dict, List, Tuple
 
 
 class Model():
+    SETTING_LIVE_DISCOVERY = "/exts/mf.ov.ndi/liveDiscovery"
+    SETTING_LIVE_DISCOVERY_DELAY = "/exts/mf.ov.ndi/liveDiscoveryDelay"
+
     def __init__(self):
         self._bindings_model: BindingsModel = BindingsModel()
         self._ndi: NDItools = NDItools()
+        self._dynamic_prim_cache: DynamicPrimCache = None
 
     def destroy(self):
+        self.stop_watching_stage()
         self._ndi.destroy()
         self._bindings_model.destroy()
 
@@ -24,6 +34,12 @@ class Model():
     def get_binding_data_from_index(self, index: int):
         return self._bindings_model.get(index)
 
+    def get_binding_data(self, dynamic_id: str):
+        return self._bindings_model.get_from_id(dynamic_id)
+
+    def get_binding_ids(self) -> List[str]:
+        return [x.dynamic_id for x in self._bindings_model.get_bindings()]
+
     def get_ndi_source_list(self) -> List[str]:
         return self._bindings_model.get_source_list()
 
@@ -32,6 +48,16 @@ class Model():
 
     def apply_lowbandwidth_value(self, dynamic_id: str, value: bool):
         self._bindings_model.set_low_bandwidth(dynamic_id, value)
+
+    def apply_lowlatency_value(self, dynamic_id: str, value: bool):
+        self._bindings_model.set_low_latency(dynamic_id, value)
+
+    def apply_maxfps_value(self, dynamic_id: str, value: float):
+        self._bindings_model.set_max_fps(dynamic_id, value)
+        self._ndi.set_stream_max_fps(dynamic_id, value)
+
+    def apply_region_value(self, dynamic_id: str, value: Tuple[int, int, int, int]):
+        self._bindings_model.set_region(dynamic_id, value)
 # endregion
 
 # region dynamic
@@ -49,28 +75,152 @@ class Model():
             index += 1
 
         USDtools.create_dynamic_material(final_name)
-        self.search_for_dynamic_material()
+        if self.is_watching_stage():
+            self.flush_stage_changes()  # Only the new material is examined, without waiting for the delay
+        else:
+            self.search_for_dynamic_material()
 
     def search_for_dynamic_material(self):
-        result: List[DynamicPrim] = USDtools.find_all_dynamic_sources()
-        self._bindings_model.update_dynamic_prims(result)
+        result: List[DynamicPrim] = self._watch_stage()
+        if result is None:
+            result = USDtools.find_all_dynamic_sources()
+        self._on_dynamic_prims_changed(result)
+
+    def _on_dynamic_prims_changed(self, prims: List[DynamicPrim]):
+        self._reconcile_streams(prims)
+        self._bindings_model.update_dynamic_prims(prims)
+
+    def _watch_stage(self) -> List[DynamicPrim]:
+        """Dynamic prims of the current stage, now kept up to date as it changes. None without live discovery."""
+        settings = carb.settings.get_settings()
+        if not settings.get(Model.SETTING_LIVE_DISCOVERY):
+            self.stop_watching_stage()
+            return None
+
+        stage = USDtools.get_stage()
+        if not stage:
+            self.stop_watching_stage()
+            return None
+
+        # The whole stage is traversed again anyway, for a stage that was already watched it resets its cache
+        if self._dynamic_prim_cache is not None and self._dynamic_prim_cache.get_stage() == stage:
+            return self._dynamic_prim_cache.rescan()
+
+        self.stop_watching_stage()
+        delay = settings.get(Model.SETTING_LIVE_DISCOVERY_DELAY)
+        self._dynamic_prim_cache = DynamicPrimCache(stage, self._on_dynamic_prims_changed,
+                                                    delay if delay is not None else DynamicPrimCache.DEBOUNCE)
+        return self._dynamic_prim_cache.get_dynamic_prims()
+
+    def stop_watching_stage(self):
+        if self._dynamic_prim_cache is not None:
+            self._dynamic_prim_cache.destroy()
+            self._dynamic_prim_cache = None
+
+    def is_watching_stage(self) -> bool:
+        return self._dynamic_prim_cache is not None
+
+    def flush_stage_changes(self) -> bool:
+        """Applies the stage changes waiting for their delay right away, True if the bindings changed."""
+        return self._dynamic_prim_cache is not None and self._dynamic_prim_cache.flush()
+
+    def _reconcile_streams(self, prims: List[DynamicPrim]):
+        """Streams of dynamic textures still bound the same way keep running, only the obsolete ones are stopped."""
+        prims_by_id: Dict[str, DynamicPrim] = {}
+        for prim in prims:
+            prims_by_id.setdefault(prim.dynamic_id, prim)  # The bindings are built from the first prim of each id
+        for dynamic_id in self._ndi.get_stream_ids():
+            prim = prims_by_id.get(dynamic_id, None)
+            if prim is None or not self._ndi.is_stream_bound_to(dynamic_id, prim.ndi_source_attr,
+                                                                prim.lowbandwidth_attr, prim.lowlatency_attr,
+                                                                prim.region_attr):
+                self._ndi.stop_stream(dynamic_id)
+            else:
+                self._ndi.set_stream_max_fps(dynamic_id, prim.maxfps_attr)
+
+        for dynamic_id in self._ndi.get_standby_ids():
+            if dynamic_id not in prims_by_id:
+                self._ndi.remove_standbys(dynamic_id)
 
     def _get_prims_with_id(self, dynamic_id: str) -> List[DynamicPrim]:
-        prims: List[DynamicPrim] = self._bindings_model.get_prim_list()
-        return [x for x in prims if x.dynamic_id == dynamic_id]
+        return self._bindings_model.get_prims_with_id(dynamic_id)
 
+    # Every prim of the dynamic id is authored in a single change block
     def set_ndi_source_prim_attr(self, dynamic_id: str, source: str):
-        for prim in self._get_prims_with_id(dynamic_id):
-            USDtools.set_prim_ndi_attribute(prim.path, source)
+        self._set_prims_attribute(dynamic_id, USDtools.ATTR_NDI_NAME, source)
 
     def set_lowbandwidth_prim_attr(self, dynamic_id: str, value: bool):
-        for prim in self._get_prims_with_id(dynamic_id):
-            USDtools.set_prim_lowbandwidth_attribute(prim.path, value)
+        self._set_prims_attribute(dynamic_id, USDtools.ATTR_BANDWIDTH_NAME, value)
+
+    def set_lowlatency_prim_attr(self, dynamic_id: str, value: bool):
+        self._set_prims_attribute(dynamic_id, USDtools.ATTR_LATENCY_NAME, value)
+
+    def set_maxfps_prim_attr(self, dynamic_id: str, value: float):
+        self._set_prims_attribute(dynamic_id, USDtools.ATTR_MAXFPS_NAME, value)
+
+    def set_region_prim_attr(self, dynamic_id: str, value: Tuple[int, int, int, int]):
+        self._set_prims_attribute(dynamic_id, USDtools.ATTR_REGION_NAME, value)
+
+    def _set_prims_attribute(self, dynamic_id: str, name: str, value):
+        edits = [(x.path, name, value) for x in self._get_prims_with_id(dynamic_id)]
+        if len(edits) > 0:
+            USDtools.set_prims_attributes(edits)
+
+    def apply_binding_patches(self, patches: List[BindingPatch]) -> int:
+        """
+        Authors the patches on every prim of their dynamic id in a single change block, then updates the bindings
+        and streams from the stage like a discovery would. Returns the number of patches applied.
+        """
+        edits: List[Tuple[str, str, object]] = []
+        applied = 0
+        for patch in patches:
+            prims = self._get_prims_with_id(patch.dynamic_id)
+            if len(prims) == 0:
+                logger = logging.getLogger(__name__)
+                logger.warning(f"Ignoring the patch of unknown dynamic texture {patch.dynamic_id}")
+                continue
+
+            values = self._get_patch_attributes(patch)
+            for prim in prims:
+                edits.extend((prim.path, name, value) for name, value in values)
+            applied += 1
+
+        if len(edits) > 0:
+            USDtools.set_prims_attributes(edits)
+            if self.is_watching_stage():
+                self.flush_stage_changes()
+            else:
+                self.search_for_dynamic_material()
+        return applied
+
+    def _get_patch_attributes(self, patch: BindingPatch) -> List[Tuple[str, object]]:
+        values: List[Tuple[str, object]] = []
+        if patch.ndi_source is not None:
+            values.append((USDtools.ATTR_NDI_NAME, patch.ndi_source))
+        if patch.lowbandwidth is not None:
+            values.append((USDtools.ATTR_BANDWIDTH_NAME, patch.lowbandwidth))
+        if patch.lowlatency is not None:
+            values.append((USDtools.ATTR_LATENCY_NAME, patch.lowlatency))
+        if patch.max_fps is not None:
+            values.append((USDtools.ATTR_MAXFPS_NAME, patch.max_fps))
+        if patch.region is not None:
+            values.append((USDtools.ATTR_REGION_NAME, patch.region if len(patch.region) > 0 else None))
+        return values
+
+    def import_binding_patches(self, path: str) -> int:
+        """Applies the binding patches of a CSV or JSON file, see BindingPatchReader. Returns the number applied."""
+        try:
+            patches = BindingPatchReader.read_file(path)
+        except (OSError, ValueError) as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Could not read the binding patches of {path}: {e}")
+            return 0
+        return self.apply_binding_patches(patches)
 # endregion
 
 # region stream
-    def try_add_stream(self, binding: Binding, lowbandwidth: bool, update_fps_fn, update_dimensions_fn) -> bool:
-        if self._ndi.get_stream(binding.dynamic_id) is not None:
+    def _can_start_stream(self, binding: Binding) -> bool:
+        if self._ndi.get_stream(binding.dynamic_id) is not None or self._ndi.is_stream_pending(binding.dynamic_id):
             logger = logging.getLogger(__name__)
             logger.warning(f"There's already a stream running for {binding.dynamic_id}")
             return False
@@ -80,18 +230,108 @@ class Model():
             logger.warning("Won't create stream without NDI® source")
             return False
 
+        return True
+
+    def _try_add_stream_proxy(self, binding: Binding, lowbandwidth: bool) -> bool:
+        fps = float(re.search("\((.*)\)", binding.ndi_source).group(1).split("p")[1])
+        return self._ndi.try_add_stream_proxy(binding.dynamic_id, binding.ndi_source, fps, lowbandwidth)
+
+    def try_add_stream(self, binding: Binding, lowbandwidth: bool) -> bool:
+        if not self._can_start_stream(binding):
+            return False
+
         if binding.ndi_source == ComboboxModel.PROXY_VALUE:
-            fps = float(re.search("\((.*)\)", binding.ndi_source).group(1).split("p")[1])
-            success: bool = self._ndi.try_add_stream_proxy(binding.dynamic_id, binding.ndi_source, fps, lowbandwidth)
+            success: bool = self._try_add_stream_proxy(binding, lowbandwidth)
             return success
         else:
             success: bool = self._ndi.try_add_stream(binding.dynamic_id, binding.ndi_source, lowbandwidth,
-                                                     update_fps_fn, update_dimensions_fn)
+                                                     binding.lowlatency, binding.region, binding.max_fps)
             return success
 
+    def start_stream_async(self, binding: Binding, lowbandwidth: bool) -> Future:
+        """
+        Future resolved on the main thread, to True once the first frame arrived, to False if the stream didn't start.
+        The proxy has no receiver to connect, it starts right away and the future is already done.
+        """
+        if not self._can_start_stream(binding):
+            return self._done_future(False)
+
+        if binding.ndi_source == ComboboxModel.PROXY_VALUE:
+            return self._done_future(self._try_add_stream_proxy(binding, lowbandwidth))
+        return self._ndi.start_stream_async(binding.dynamic_id, binding.ndi_source, lowbandwidth,
+                                            binding.lowlatency, binding.region, binding.max_fps)
+
+    def start_streams_async(self, bindings: List[Tuple[Binding, bool]]) -> List[Future]:
+        """(binding, lowbandwidth) pairs, their receivers are created concurrently."""
+        return [self.start_stream_async(binding, lowbandwidth) for binding, lowbandwidth in bindings]
+
+    def add_standby(self, binding: Binding, ndi_source: str) -> Future:
+        """Future resolved to True once the standby receives frames, see NDItools.add_standby."""
+        if ndi_source in (ComboboxModel.NONE_VALUE, ComboboxModel.PROXY_VALUE):
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Can't keep {ndi_source} on standby")
+            return self._done_future(False)
+        return self._ndi.add_standby(binding.dynamic_id, ndi_source)
+
+    def remove_standby(self, binding: Binding, ndi_source: str):
+        self._ndi.remove_standby(binding.dynamic_id, ndi_source)
+
+    def get_standbys(self, dynamic_id: str) -> Dict[str, bool]:
+        return self._ndi.get_standbys(dynamic_id)
+
+    def switch_stream(self, binding: Binding, ndi_source: str, lowbandwidth: bool) -> Future:
+        """
+        Moves the playing binding to another source, right away from a ready standby. Resolves like
+        start_stream_async, the binding itself is left to the caller.
+        """
+        switched = dataclasses.replace(binding, ndi_source=ndi_source)
+        if ndi_source in (ComboboxModel.NONE_VALUE, ComboboxModel.PROXY_VALUE):
+            self.stop_stream(binding)
+            return self.start_stream_async(switched, lowbandwidth)
+        future = self._ndi.switch_stream(binding.dynamic_id, ndi_source, lowbandwidth, binding.lowlatency,
+                                         binding.region, binding.max_fps)
+        if not lowbandwidth:
+            future.add_done_callback(lambda x: self._on_switch_done(x, switched))
+        return future
+
+    def _on_switch_done(self, future: Future, binding: Binding):
+        # Without its high bandwidth replacement, the texture keeps playing the standby it was cut over to
+        if future.result() or not self._ndi.is_stream_bound_to(binding.dynamic_id, binding.ndi_source, True,
+                                                               binding.lowlatency, binding.region):
+            return
+        logger = logging.getLogger(__name__)
+        logger.error(f"High bandwidth stream of {binding.ndi_source} could not start, {binding.dynamic_id} stays in "
+                     "low bandwidth")
+        # The binding follows, otherwise the next discovery would stop the stream for not matching it
+        self.apply_lowbandwidth_value(binding.dynamic_id, True)
+        self.set_lowbandwidth_prim_attr(binding.dynamic_id, True)
+
+    def is_stream_playing(self, dynamic_id: str) -> bool:
+        return self._ndi.get_stream(dynamic_id) is not None
+
+    def get_pending_start(self, dynamic_id: str) -> Future:
+        return self._ndi.get_pending_start(dynamic_id)
+
+    def _done_future(self, result: bool) -> Future:
+        future = Future()
+        future.set_result(result)
+        return future
+
     def stop_stream(self, binding: Binding):
         self._ndi.stop_stream(binding.dynamic_id)
 
     def stop_all_streams(self):
         self._ndi.stop_all_streams()
+
+    def get_stream_stats(self, dynamic_id: str) -> dict:
+        return self._ndi.get_stream_stats(dynamic_id)
+
+    def get_stream_telemetry(self, dynamic_id: str) -> dict:
+        return self._ndi.get_stream_telemetry(dynamic_id)
+
+    def is_tracing(self) -> bool:
+        return self._ndi.get_tracer().is_recording()
+
+    def dump_trace(self, path: str):
+        self._ndi.dump_trace(path)
 # endregion
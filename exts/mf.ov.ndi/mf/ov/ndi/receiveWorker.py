@@ -0,0 +1,378 @@
+"""
+Receives a NDI® source in a separate process and shares its frames through a ring of shared memory slots.
+
+This module is imported by the extension (ReceiveWorker, SharedFrameRing) and is also the script run by the worker
+process (main). It must not import omni, carb or anything relative to the extension package.
+"""
+import argparse
+from multiprocessing import shared_memory
+import numpy as np
+import os
+import subprocess
+import sys
+import time
+
+
+class SharedFrameRing():
+    """
+    Fixed number of frame slots in shared memory, written by one process and read by another.
+
+    The writer fills the slots in turn, the reader only ever maps the newest complete frame, so frames the reader
+    didn't get to in time are dropped instead of queued. The reader claims the slot it uses in the header and the
+    writer skips that slot, the pixels are used in place without a copy. A slot is marked as being written (sequence
+    -1) before the writer looks at the claim, and the reader checks the sequence again when it releases the slot, so
+    a frame overwritten in the instant it was claimed is still known to be torn.
+    """
+    HEADER_LATEST = 0  # sequence number of the newest complete frame, -1 if none
+    HEADER_STOP = 1  # set by the reader to ask the writer to exit
+    HEADER_STATUS = 2
+    HEADER_HEARTBEAT = 3  # monotonic time in ms written by the reader, the writer exits if it gets too old
+    HEADER_OVERSIZED = 4  # frames the writer dropped because they didn't fit in a slot
+    HEADER_LATEST_SLOT = 5  # slot of the newest complete frame
+    HEADER_CLAIMED = 6  # slot the reader is using, -1 if none
+    HEADER_FIELDS = 8
+
+    SLOT_SEQUENCE = 0
+    SLOT_WIDTH = 1
+    SLOT_HEIGHT = 2
+    SLOT_CHANNELS = 3
+    SLOT_FOURCC = 4
+    SLOT_FRAME_RATE_N = 5
+    SLOT_FRAME_RATE_D = 6
+    SLOT_TIMESTAMP = 7
+    SLOT_FIELDS = 8
+
+    STATUS_STARTING = 0
+    STATUS_RUNNING = 1
+    STATUS_FAILED = 2
+    STATUS_EXITED = 3
+
+    def __init__(self, slot_count: int, slot_size: int, name: str = None):
+        """Creates the ring when name is None, otherwise attaches to the ring created under that name."""
+        if slot_count < 2:
+            raise ValueError("A frame ring needs at least 2 slots, one of them can be claimed by the reader")
+        self._slot_count = slot_count
+        self._slot_size = slot_size
+        self._owner = name is None
+        header_size = (SharedFrameRing.HEADER_FIELDS + slot_count * SharedFrameRing.SLOT_FIELDS) * 8
+
+        if self._owner:
+            self._header_shm = shared_memory.SharedMemory(create=True, size=header_size)
+            self._data_shm = shared_memory.SharedMemory(create=True, size=slot_count * slot_size)
+        else:
+            header_name, data_name = name.split(":")
+            self._header_shm = SharedFrameRing._attach(header_name)
+            self._data_shm = SharedFrameRing._attach(data_name)
+
+        self._header = np.ndarray((header_size // 8, ), dtype=np.int64, buffer=self._header_shm.buf)
+        if self._owner:
+            self._header[:] = 0
+            self._header[SharedFrameRing.HEADER_LATEST] = -1
+            self._header[SharedFrameRing.HEADER_CLAIMED] = -1
+            self._slots()[:, SharedFrameRing.SLOT_SEQUENCE] = -1
+        self._next_sequence = 0
+        self._next_slot = 0
+
+    @staticmethod
+    def _attach(name: str) -> shared_memory.SharedMemory:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name != "nt":
+            # The attaching process must not unlink the memory when it exits, the owner does
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+    def destroy(self):
+        self._header = None
+        self._header_shm.close()
+        self._data_shm.close()
+        if self._owner:
+            self._header_shm.unlink()
+            self._data_shm.unlink()
+
+    def get_name(self) -> str:
+        return f"{self._header_shm.name}:{self._data_shm.name}"
+
+    def get_slot_count(self) -> int:
+        return self._slot_count
+
+    def get_slot_size(self) -> int:
+        return self._slot_size
+
+    def get_header(self, field: int) -> int:
+        return int(self._header[field])
+
+    def set_header(self, field: int, value: int):
+        self._header[field] = value
+
+    def _slots(self) -> np.ndarray:
+        return self._header[SharedFrameRing.HEADER_FIELDS:].reshape(self._slot_count, SharedFrameRing.SLOT_FIELDS)
+
+    def _slot_view(self, index: int, height: int, width: int, channels: int) -> np.ndarray:
+        return np.ndarray((height, width, channels), dtype=np.uint8, buffer=self._data_shm.buf,
+                          offset=index * self._slot_size)
+
+    # region writer
+    def write(self, frame: np.ndarray, fourcc: int, frame_rate_n: int, frame_rate_d: int, timestamp: int) -> bool:
+        height, width, channels = frame.shape
+        if height * width * channels > self._slot_size:
+            self._header[SharedFrameRing.HEADER_OVERSIZED] += 1
+            return False
+
+        sequence = self._next_sequence
+        index = self._next_slot
+        slots = self._slots()
+        previous = int(slots[index][SharedFrameRing.SLOT_SEQUENCE])
+        slots[index][SharedFrameRing.SLOT_SEQUENCE] = -1
+        if self._header[SharedFrameRing.HEADER_CLAIMED] == index:
+            # The reader uses it, the next slot can't be claimed as well
+            slots[index][SharedFrameRing.SLOT_SEQUENCE] = previous
+            index = (index + 1) % self._slot_count
+            slots[index][SharedFrameRing.SLOT_SEQUENCE] = -1
+        slot = slots[index]
+        np.copyto(self._slot_view(index, height, width, channels), frame)  # Single copy, done by numpy
+        slot[SharedFrameRing.SLOT_WIDTH] = width
+        slot[SharedFrameRing.SLOT_HEIGHT] = height
+        slot[SharedFrameRing.SLOT_CHANNELS] = channels
+        slot[SharedFrameRing.SLOT_FOURCC] = fourcc
+        slot[SharedFrameRing.SLOT_FRAME_RATE_N] = frame_rate_n
+        slot[SharedFrameRing.SLOT_FRAME_RATE_D] = frame_rate_d
+        slot[SharedFrameRing.SLOT_TIMESTAMP] = timestamp
+        slot[SharedFrameRing.SLOT_SEQUENCE] = sequence
+        self._header[SharedFrameRing.HEADER_LATEST_SLOT] = index
+        self._header[SharedFrameRing.HEADER_LATEST] = sequence
+        self._next_sequence += 1
+        self._next_slot = (index + 1) % self._slot_count
+        return True
+    # endregion
+
+    # region reader
+    def read_latest(self, last_sequence: int):
+        """
+        Returns (sequence, slot values, pixels view) of the newest frame if newer than last_sequence, else None. The
+        slot is claimed until release is called, the view maps the shared memory and is never copied.
+        """
+        sequence = int(self._header[SharedFrameRing.HEADER_LATEST])
+        if sequence < 0 or sequence == last_sequence:
+            return None
+
+        index = int(self._header[SharedFrameRing.HEADER_LATEST_SLOT])
+        self._header[SharedFrameRing.HEADER_CLAIMED] = index
+        slot = self._slots()[index].copy()
+        if slot[SharedFrameRing.SLOT_SEQUENCE] != sequence:  # Already being overwritten
+            self._header[SharedFrameRing.HEADER_CLAIMED] = -1
+            return None
+
+        view = self._slot_view(index, int(slot[SharedFrameRing.SLOT_HEIGHT]), int(slot[SharedFrameRing.SLOT_WIDTH]),
+                               int(slot[SharedFrameRing.SLOT_CHANNELS]))
+        return sequence, slot, view
+
+    def release(self, sequence: int) -> bool:
+        """Gives the claimed slot back to the writer, False if the frame was torn while it was used."""
+        intact = self.is_intact(sequence)
+        self._header[SharedFrameRing.HEADER_CLAIMED] = -1
+        return intact
+
+    def is_intact(self, sequence: int) -> bool:
+        """Whether the claimed slot still holds this sequence."""
+        index = int(self._header[SharedFrameRing.HEADER_CLAIMED])
+        return index >= 0 and self._slots()[index][SharedFrameRing.SLOT_SEQUENCE] == sequence
+    # endregion
+
+
+class SharedVideoFrame():
+    """Mimics the attributes of a NDI® VideoFrameV2 for a frame read from a SharedFrameRing."""
+    def __init__(self, sequence: int, slot: np.ndarray, data: np.ndarray):
+        self.sequence = sequence
+        self.data = data
+        self.xres = int(slot[SharedFrameRing.SLOT_WIDTH])
+        self.yres = int(slot[SharedFrameRing.SLOT_HEIGHT])
+        self.FourCC = int(slot[SharedFrameRing.SLOT_FOURCC])
+        self.frame_rate_N = int(slot[SharedFrameRing.SLOT_FRAME_RATE_N])
+        self.frame_rate_D = int(slot[SharedFrameRing.SLOT_FRAME_RATE_D])
+        self.timestamp = int(slot[SharedFrameRing.SLOT_TIMESTAMP])
+
+
+class ReceiveWorker():
+    """Extension side of a worker process receiving one NDI® source."""
+    DEFAULT_SLOT_COUNT = 3
+    DEFAULT_SLOT_SIZE = 3840 * 2160 * 4  # bytes, a 4K RGBA frame
+    SHUTDOWN_TIMEOUT = 2  # seconds
+    HEARTBEAT_TIMEOUT = 5  # seconds without heartbeat after which the worker exits on its own
+
+    def __init__(self, ndi_source: str, lowbandwidth: bool, slot_count: int = DEFAULT_SLOT_COUNT,
+                 slot_size: int = DEFAULT_SLOT_SIZE, color_format: int = None):
+        """color_format is a NDIlib.RecvColorFormat value, RGBX_RGBA when None."""
+        self._ring = SharedFrameRing(slot_count, slot_size)
+        self._last_sequence = -1
+        self._frames_skipped = 0
+        self._frames_torn = 0
+        self.heartbeat()
+
+        args = [ReceiveWorker.get_python_executable(), os.path.abspath(__file__),
+                "--source", ndi_source, "--ring", self._ring.get_name(),
+                "--slots", str(slot_count), "--slot-size", str(slot_size)]
+        if lowbandwidth:
+            args.append("--lowbandwidth")
+        if color_format is not None:
+            args.extend(["--color-format", str(int(color_format))])
+        # The bare interpreter doesn't know the paths of Kit, numpy comes from the pip prebundle extension
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(x for x in sys.path if x)}
+        try:
+            self._process = subprocess.Popen(args, stdin=subprocess.DEVNULL, env=env)
+        except OSError:
+            self._ring.destroy()
+            raise
+
+    def destroy(self):
+        self._ring.set_header(SharedFrameRing.HEADER_STOP, 1)
+        try:
+            self._process.wait(ReceiveWorker.SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._ring.destroy()
+
+    @staticmethod
+    def get_python_executable() -> str:
+        # Inside Kit, sys.executable is the kit executable, its python interpreter lives next to it
+        executable = sys.executable
+        if os.path.basename(executable).lower().startswith("python"):
+            return executable
+        name = "python.exe" if os.name == "nt" else "python3"
+        bundled = os.path.join(os.path.dirname(executable), "python", name)
+        return bundled if os.path.exists(bundled) else name
+
+    def heartbeat(self):
+        self._ring.set_header(SharedFrameRing.HEADER_HEARTBEAT, int(time.monotonic() * 1000))
+
+    def is_starting(self) -> bool:
+        return self._ring.get_header(SharedFrameRing.HEADER_STATUS) == SharedFrameRing.STATUS_STARTING
+
+    def is_alive(self) -> bool:
+        status = self._ring.get_header(SharedFrameRing.HEADER_STATUS)
+        failed = status == SharedFrameRing.STATUS_FAILED or status == SharedFrameRing.STATUS_EXITED
+        return not failed and self._process.poll() is None
+
+    def get_frames_skipped(self) -> int:
+        """Frames written by the worker but never read because a newer one was available."""
+        return self._frames_skipped
+
+    def get_frames_torn(self) -> int:
+        """Frames overwritten by the worker while they were used, their textures are uploaded again."""
+        return self._frames_torn
+
+    def get_frames_oversized(self) -> int:
+        return self._ring.get_header(SharedFrameRing.HEADER_OVERSIZED)
+
+    def capture(self) -> SharedVideoFrame:
+        """Newest frame not seen yet, or None. Its pixels map the ring and are only valid until release."""
+        self.heartbeat()
+        latest = self._ring.read_latest(self._last_sequence)
+        if latest is None:
+            return None
+
+        sequence, slot, view = latest
+        if self._last_sequence >= 0:
+            self._frames_skipped += sequence - self._last_sequence - 1
+        self._last_sequence = sequence
+        return SharedVideoFrame(sequence, slot, view)
+
+    def release(self, frame: SharedVideoFrame) -> bool:
+        """False if the worker overwrote the frame while it was used."""
+        if self._ring.release(frame.sequence):
+            return True
+        self._frames_torn += 1
+        return False
+
+
+# region worker process
+CAPTURE_TIMEOUT = 100  # ms
+FIND_TIMEOUT = 5  # seconds
+
+
+def _find_source(ndi, name: str):
+    find = ndi.find_create_v2()
+    if find is None:
+        return None, None
+
+    deadline = time.monotonic() + FIND_TIMEOUT
+    while time.monotonic() < deadline:
+        source = next((s for s in ndi.find_get_current_sources(find) if s.ndi_name == name), None)
+        if source is not None:
+            return find, source
+        ndi.find_wait_for_sources(find, CAPTURE_TIMEOUT)
+    return find, None
+
+
+def _receive(ndi, ring: SharedFrameRing, source_name: str, lowbandwidth: bool, color_format: int = None):
+    find, source = _find_source(ndi, source_name)
+    if source is None:
+        ring.set_header(SharedFrameRing.HEADER_STATUS, SharedFrameRing.STATUS_FAILED)
+        return
+
+    recv_create_desc = ndi.RecvCreateV3()
+    recv_create_desc.color_format = ndi.RECV_COLOR_FORMAT_RGBX_RGBA if color_format is None else \
+        ndi.RecvColorFormat(color_format)
+    recv_create_desc.bandwidth = ndi.RECV_BANDWIDTH_LOWEST if lowbandwidth else ndi.RECV_BANDWIDTH_HIGHEST
+    recv = ndi.recv_create_v3(recv_create_desc)
+    if recv is None:
+        ring.set_header(SharedFrameRing.HEADER_STATUS, SharedFrameRing.STATUS_FAILED)
+        ndi.find_destroy(find)
+        return
+
+    ndi.recv_connect(recv, source)
+    ndi.find_destroy(find)  # The source object was copied by the receiver
+    ring.set_header(SharedFrameRing.HEADER_STATUS, SharedFrameRing.STATUS_RUNNING)
+
+    heartbeat_timeout = ReceiveWorker.HEARTBEAT_TIMEOUT * 1000
+    while ring.get_header(SharedFrameRing.HEADER_STOP) == 0:
+        if time.monotonic() * 1000 - ring.get_header(SharedFrameRing.HEADER_HEARTBEAT) > heartbeat_timeout:
+            break  # The extension is gone or frozen
+
+        t, v, a, m = ndi.recv_capture_v2(recv, CAPTURE_TIMEOUT)
+        if t == ndi.FRAME_TYPE_VIDEO:
+            # UYVY has 2 bytes per pixel and UYVA its alpha plane after, the slot keeps the pixel dimensions
+            frame = v.data.reshape(v.yres, v.xres, -1)
+            ring.write(frame, int(v.FourCC), v.frame_rate_N, v.frame_rate_D, v.timestamp)
+            ndi.recv_free_video_v2(recv, v)
+        elif t == ndi.FRAME_TYPE_AUDIO:
+            ndi.recv_free_audio_v2(recv, a)
+        elif t == ndi.FRAME_TYPE_METADATA:
+            ndi.recv_free_metadata(recv, m)
+
+    ndi.recv_destroy(recv)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receives a NDI® source into a shared memory frame ring")
+    parser.add_argument("--source", required=True)
+    parser.add_argument("--ring", required=True)
+    parser.add_argument("--slots", type=int, required=True)
+    parser.add_argument("--slot-size", type=int, required=True)
+    parser.add_argument("--lowbandwidth", action="store_true")
+    parser.add_argument("--color-format", type=int, default=None)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "deps"))
+    import NDIlib as ndi
+
+    ring = SharedFrameRing(args.slots, args.slot_size, args.ring)
+    if not ndi.initialize():
+        ring.set_header(SharedFrameRing.HEADER_STATUS, SharedFrameRing.STATUS_FAILED)
+        ring.destroy()
+        return 1
+
+    try:
+        _receive(ndi, ring, args.source, args.lowbandwidth, args.color_format)
+    finally:
+        if ring.get_header(SharedFrameRing.HEADER_STATUS) != SharedFrameRing.STATUS_FAILED:
+            ring.set_header(SharedFrameRing.HEADER_STATUS, SharedFrameRing.STATUS_EXITED)
+        ring.destroy()
+        ndi.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+# endregion
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+import numpy as np
+from typing import Tuple
+import warp as wp
+
+
+class StagingBufferPool():
+    """
+    Keeps preallocated warp arrays to upload frames into, instead of allocating a new one for every frame.
+
+    Buffers are keyed by (width, height, channels, device) and kept in least recently used order, so switching back
+    and forth between a few resolutions doesn't allocate. Not thread safe, each stream owns its pool.
+    """
+    DEFAULT_CAPACITY = 3  # buffers
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._capacity = capacity
+        self._buffers: "OrderedDict[Tuple[int, int, int, str], wp.array]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_allocated = 0  # currently held by the pool
+        self.bytes_allocated_total = 0  # since the pool was created
+
+    def destroy(self):
+        self._buffers.clear()
+        self.bytes_allocated = 0
+
+    def get_stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "buffers": len(self._buffers),
+            "bytes_allocated": self.bytes_allocated,
+            "bytes_allocated_total": self.bytes_allocated_total,
+        }
+
+    def acquire(self, width: int, height: int, channels: int, device: str) -> wp.array:
+        key = (width, height, channels, str(device))
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            self.hits += 1
+            self._buffers.move_to_end(key)
+            return buffer
+
+        self.misses += 1
+        buffer = wp.empty(shape=(height, width, channels), dtype=wp.uint8, device=device)
+        size = height * width * channels
+        self.bytes_allocated += size
+        self.bytes_allocated_total += size
+        self._buffers[key] = buffer
+
+        while len(self._buffers) > self._capacity:
+            (evicted_width, evicted_height, evicted_channels, _), _ = self._buffers.popitem(last=False)
+            self.bytes_allocated -= evicted_width * evicted_height * evicted_channels
+            self.evictions += 1
+        return buffer
+
+    def upload(self, frame: np.ndarray, device: str) -> wp.array:
+        """Copies the (height, width, channels) uint8 frame into a pooled array on the device and returns it."""
+        height, width, channels = frame.shape
+        buffer = self.acquire(width, height, channels, device)
+        # Aliases the numpy memory, the only copy is the one into the pooled buffer
+        source = wp.array(np.ascontiguousarray(frame), dtype=wp.uint8, device="cpu", copy=False)
+        wp.copy(buffer, source)
+        return buffer
@@ -0,0 +1,56 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import logging
+import threading
+from typing import Set
+
+
+class StreamReaper():
+    """
+    Tears streams down on background threads, a slow receiver shutdown never stalls the Kit update loop.
+
+    A reaped stream must implement `stop()`, which only flags it so it isn't serviced anymore, and `destroy()`, which
+    releases its receiver and leaves its dynamic textures in their final state. The reaper unschedules the stream,
+    waiting for a worker still servicing it, before destroying it.
+    """
+    WORKERS = 2
+    SHUTDOWN_DEADLINE = 5.0  # seconds destroy waits for the streams still being torn down
+
+    def __init__(self, scheduler, worker_count: int = WORKERS):
+        self._scheduler = scheduler
+        self._executor = ThreadPoolExecutor(worker_count, thread_name_prefix="mf.ov.ndi.reap")
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+
+    def destroy(self, deadline: float = SHUTDOWN_DEADLINE) -> bool:
+        """Waits for the streams being torn down, False if some didn't make it before the deadline."""
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, deadline)
+        self._executor.shutdown(wait=False)
+        if len(not_done) > 0:
+            logger = logging.getLogger(__name__)
+            logger.warning(f"{len(not_done)} NDI® stream(s) still shutting down after {deadline} seconds")
+            return False
+        return True
+
+    def reap(self, stream):
+        stream.stop()
+        future = self._executor.submit(self._reap, stream)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_reaped)
+
+    def get_pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _reap(self, stream):
+        self._scheduler.remove(stream)
+        stream.destroy()
+
+    def _on_reaped(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+        if future.exception() is not None:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Stream failed to shut down: {future.exception()}")
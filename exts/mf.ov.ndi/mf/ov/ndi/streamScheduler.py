@@ -0,0 +1,131 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Set, Tuple
+
+
+class StreamScheduler():
+    """
+    Services every stream from a small pool of worker threads instead of one thread per stream.
+
+    A scheduled stream must implement `service() -> float`, which does one step of work and returns the monotonic
+    time at which it wants to be serviced again, or None once it is done. Streams wait in a queue ordered by that
+    deadline, a worker picks the earliest one when it is due. A stream whose `service()` raises is unscheduled and
+    `stop()` is called on it so its owner sees it stopped.
+    """
+    MAX_WORKERS = 4
+
+    def __init__(self, worker_count: int = None):
+        if worker_count is None:
+            worker_count = min(StreamScheduler.MAX_WORKERS, os.cpu_count() or 1)
+
+        self._condition = threading.Condition()
+        self._queue: List[Tuple[float, int, object]] = []  # heap of (deadline, entry id, stream)
+        self._streams: Set[object] = set()
+        self._entries: Dict[object, int] = {}  # stream -> id of its valid queue entry
+        self._in_service: Set[object] = set()
+        self._next_entry_id = 0
+
+        self._is_running = True
+        self._workers: List[threading.Thread] = []
+        for i in range(worker_count):
+            worker = threading.Thread(target=self._work, name=f"mf.ov.ndi.StreamScheduler-{i}")
+            worker.start()
+            self._workers.append(worker)
+
+    def destroy(self):
+        with self._condition:
+            self._is_running = False
+            self._queue.clear()
+            self._entries.clear()
+            self._streams.clear()
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+        self._workers.clear()
+
+    def add(self, stream, deadline: float = None):
+        with self._condition:
+            self._streams.add(stream)
+            self._push(stream, time.monotonic() if deadline is None else deadline)
+            self._condition.notify()
+
+    def remove(self, stream):
+        """Unschedules the stream, waits for a worker currently servicing it to be done."""
+        with self._condition:
+            self._streams.discard(stream)
+            self._entries.pop(stream, None)
+            while stream in self._in_service:
+                self._condition.wait()
+
+    def is_scheduled(self, stream) -> bool:
+        with self._condition:
+            return stream in self._streams
+
+    def get_queue_depth(self) -> int:
+        """Number of streams that are due but waiting for a free worker."""
+        now = time.monotonic()
+        with self._condition:
+            return sum(1 for deadline, entry_id, stream in self._queue
+                       if deadline <= now and self._entries.get(stream) == entry_id)
+
+    def get_stream_count(self) -> int:
+        with self._condition:
+            return len(self._streams)
+
+    def _push(self, stream, deadline: float):
+        entry_id = self._next_entry_id
+        self._next_entry_id += 1
+        self._entries[stream] = entry_id
+        heapq.heappush(self._queue, (deadline, entry_id, stream))
+
+    def _pop_due(self):
+        with self._condition:
+            while self._is_running:
+                if len(self._queue) == 0:
+                    self._condition.wait()
+                    continue
+
+                deadline, entry_id, stream = self._queue[0]
+                if self._entries.get(stream) != entry_id:  # Stale entry from a removed or rescheduled stream
+                    heapq.heappop(self._queue)
+                    continue
+
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                heapq.heappop(self._queue)
+                del self._entries[stream]
+                self._in_service.add(stream)
+                return stream
+        return None
+
+    def _work(self):
+        while True:
+            stream = self._pop_due()
+            if stream is None:
+                return
+
+            deadline = None
+            try:
+                deadline = stream.service()
+            except Exception:
+                logger = logging.getLogger(__name__)
+                logger.exception("Stream failed and was unscheduled")
+                try:
+                    stream.stop()
+                except Exception:
+                    logger.exception("Failed stream could not be stopped")
+
+            with self._condition:
+                self._in_service.discard(stream)
+                if stream in self._streams:
+                    if deadline is not None:
+                        self._push(stream, deadline)
+                    else:
+                        self._streams.discard(stream)
+                self._condition.notify_all()
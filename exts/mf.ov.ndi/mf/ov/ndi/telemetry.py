@@ -0,0 +1,188 @@
+import bisect
+import numpy as np
+import threading
+from typing import Dict, List, Tuple
+
+
+class StreamTelemetry():
+    """
+    Per frame measurements of a stream, kept in a fixed size ring where the newest frames overwrite the oldest.
+
+    Recording a frame only writes into preallocated arrays, snapshots are taken from another thread and summarize
+    the ring with percentiles.
+    """
+    CAPACITY = 1024  # frames, about 17 seconds at 60 fps
+    PERCENTILES = (50, 95, 99)
+
+    LATENCY = 0  # seconds from the sender timestamp to the reception, only meaningful with synchronized clocks
+    CAPTURE = 1  # seconds spent capturing the frame, draining the queue included
+    UPLOAD = 2  # seconds spent converting and uploading the frame, 0 when it wasn't uploaded
+    INTERVAL = 3  # seconds since the previous video frame
+    JITTER = 4  # seconds between the interval and the frame period of the source, absolute
+    FIELDS = 5
+    FIELD_NAMES = ("latency", "capture", "upload", "interval", "jitter")
+    UPLOAD_BUCKETS = (0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.066, 0.133)  # seconds, upper bounds
+
+    def __init__(self, capacity: int = CAPACITY):
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self._samples = np.full((capacity, StreamTelemetry.FIELDS), np.nan)
+        self._snapshot = np.empty_like(self._samples)
+        self._snapshot_lock = threading.Lock()  # The snapshot buffer is reused, callers take turns
+        self._count = 0  # frames recorded since the stream started
+
+        # Unlike the ring, the histogram covers every upload since the stream started
+        self._upload_counts = np.zeros(len(StreamTelemetry.UPLOAD_BUCKETS) + 1, dtype=np.int64)  # last one is +Inf
+        self._upload_sum = 0.0
+
+        self._sdk_frames_total = 0
+        self._sdk_frames_dropped = 0
+        self._sdk_queue_depth = 0
+
+    def record(self, latency: float, capture: float, upload: float, interval: float, period: float):
+        """NaN for a measurement that isn't available for this frame (no sender timestamp, first frame)."""
+        with self._lock:
+            index = self._count % self._capacity
+            samples = self._samples
+            samples[index, StreamTelemetry.LATENCY] = latency
+            samples[index, StreamTelemetry.CAPTURE] = capture
+            samples[index, StreamTelemetry.UPLOAD] = upload
+            samples[index, StreamTelemetry.INTERVAL] = interval
+            samples[index, StreamTelemetry.JITTER] = abs(interval - period)
+            self._count += 1
+            if upload > 0:
+                self._upload_counts[bisect.bisect_left(StreamTelemetry.UPLOAD_BUCKETS, upload)] += 1
+                self._upload_sum += upload
+
+    def record_sdk(self, frames_total: int, frames_dropped: int, queue_depth: int):
+        """Video frame counters as reported by the NDI® receiver."""
+        self._sdk_frames_total = frames_total
+        self._sdk_frames_dropped = frames_dropped
+        self._sdk_queue_depth = queue_depth
+
+    def get_count(self) -> int:
+        return self._count
+
+    def get_sdk_frames_dropped(self) -> int:
+        return self._sdk_frames_dropped
+
+    def get_upload_histogram(self) -> Tuple[Tuple[float, ...], List[int], float]:
+        """Bucket upper bounds, cumulative counts with the +Inf bucket last, and sum of the upload durations."""
+        with self._lock:
+            return StreamTelemetry.UPLOAD_BUCKETS, np.cumsum(self._upload_counts).tolist(), self._upload_sum
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        Percentiles over the frames in the ring, keyed by field name then "p50", "p95" and "p99", None without any
+        measurement. Also reports the number of frames recorded and the latest NDI® receiver counters.
+        """
+        with self._snapshot_lock:
+            with self._lock:
+                count = min(self._count, self._capacity)
+                frames = self._count
+                np.copyto(self._snapshot[:count], self._samples[:count])
+
+            snapshot = {
+                "frames": frames,
+                "sdk_frames_total": self._sdk_frames_total,
+                "sdk_frames_dropped": self._sdk_frames_dropped,
+                "sdk_queue_depth": self._sdk_queue_depth,
+            }
+            for field, name in enumerate(StreamTelemetry.FIELD_NAMES):
+                snapshot[name] = self._percentiles(self._snapshot[:count, field])
+            return snapshot
+
+    def _percentiles(self, values: np.ndarray) -> Dict[str, float]:
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return {f"p{p}": None for p in StreamTelemetry.PERCENTILES}
+        results = np.percentile(values, StreamTelemetry.PERCENTILES)
+        return {f"p{p}": float(x) for p, x in zip(StreamTelemetry.PERCENTILES, results)}
+
+
+class StreamStats():
+    """
+    Latest statistics of a dynamic texture, published by the thread servicing its stream and pulled by the UI.
+
+    Values live in a preallocated array guarded by a sequence number instead of a lock: the writer makes it odd while
+    it writes, a reader copies the values and tries again if the sequence was odd or moved in the meantime.
+    """
+    FPS_CURRENT = 0
+    FPS_AVERAGE = 1
+    FPS_EXPECTED = 2
+    FRAMES_DROPPED = 3
+    UPLOADS_SKIPPED = 4
+    FRAMES_UNCHANGED = 5
+    WIDTH = 6
+    HEIGHT = 7
+    FOURCC = 8  # 0 until a frame was uploaded
+    FRAMES_TORN = 9  # worker frames overwritten in shared memory while they were uploaded
+    FRAMES_OVERSIZED = 10  # worker frames too large for a shared memory slot, never received
+    STAGING_HITS = 11  # uploads into a buffer already in the staging pool of the stream
+    STAGING_MISSES = 12  # uploads that allocated a staging buffer
+    STAGING_BYTES = 13  # held by the staging pool of the stream
+    FIELDS = 14
+    READ_ATTEMPTS = 8
+
+    def __init__(self):
+        self._values = np.zeros(StreamStats.FIELDS)
+        self._read = np.zeros(StreamStats.FIELDS)
+        self._sequence = 0
+
+    def publish(self, fps_current: float, fps_average: float, fps_expected: float, frames_dropped: int,
+                uploads_skipped: int, frames_unchanged: int, frames_torn: int = 0, frames_oversized: int = 0):
+        self._sequence += 1
+        values = self._values
+        values[StreamStats.FPS_CURRENT] = fps_current
+        values[StreamStats.FPS_AVERAGE] = fps_average
+        values[StreamStats.FPS_EXPECTED] = fps_expected
+        values[StreamStats.FRAMES_DROPPED] = frames_dropped
+        values[StreamStats.UPLOADS_SKIPPED] = uploads_skipped
+        values[StreamStats.FRAMES_UNCHANGED] = frames_unchanged
+        values[StreamStats.FRAMES_TORN] = frames_torn
+        values[StreamStats.FRAMES_OVERSIZED] = frames_oversized
+        self._sequence += 1
+
+    def publish_format(self, width: int, height: int, fourcc: int):
+        self._sequence += 1
+        values = self._values
+        values[StreamStats.WIDTH] = width
+        values[StreamStats.HEIGHT] = height
+        values[StreamStats.FOURCC] = fourcc
+        self._sequence += 1
+
+    def publish_staging(self, hits: int, misses: int, bytes_allocated: int):
+        self._sequence += 1
+        values = self._values
+        values[StreamStats.STAGING_HITS] = hits
+        values[StreamStats.STAGING_MISSES] = misses
+        values[StreamStats.STAGING_BYTES] = bytes_allocated
+        self._sequence += 1
+
+    def read(self) -> Dict[str, float]:
+        """Only one reader at a time, the UI. Gives up on consistency after a few attempts rather than waiting."""
+        for _ in range(StreamStats.READ_ATTEMPTS):
+            sequence = self._sequence
+            if sequence % 2 == 1:
+                continue
+            np.copyto(self._read, self._values)
+            if sequence == self._sequence:
+                break
+
+        values = self._read
+        return {
+            "fps_current": float(values[StreamStats.FPS_CURRENT]),
+            "fps_average": float(values[StreamStats.FPS_AVERAGE]),
+            "fps_expected": float(values[StreamStats.FPS_EXPECTED]),
+            "frames_dropped": int(values[StreamStats.FRAMES_DROPPED]),
+            "uploads_skipped": int(values[StreamStats.UPLOADS_SKIPPED]),
+            "frames_unchanged": int(values[StreamStats.FRAMES_UNCHANGED]),
+            "frames_torn": int(values[StreamStats.FRAMES_TORN]),
+            "frames_oversized": int(values[StreamStats.FRAMES_OVERSIZED]),
+            "staging_hits": int(values[StreamStats.STAGING_HITS]),
+            "staging_misses": int(values[StreamStats.STAGING_MISSES]),
+            "staging_bytes": int(values[StreamStats.STAGING_BYTES]),
+            "width": int(values[StreamStats.WIDTH]),
+            "height": int(values[StreamStats.HEIGHT]),
+            "fourcc": int(values[StreamStats.FOURCC]),
+        }
@@ -1,2 +1,15 @@
+from .test_bindingPatch import *
+from .test_bindings import *
+from .test_colorConversion import *
+from .test_dynamicPrimCache import *
+from .test_frameFingerprint import *
+from .test_metrics import *
+from .test_NDItools import *
+from .test_receiveWorker import *
+from .test_stagingPool import *
+from .test_streamReaper import *
+from .test_streamScheduler import *
+from .test_telemetry import *
+from .test_tracing import *
 from .test_USDtools import *
 from .test_ui import *
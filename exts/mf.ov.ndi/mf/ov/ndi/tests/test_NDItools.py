@@ -0,0 +1,220 @@
+from ..deps import NDIlib as ndi
+from ..frameFingerprint import FrameFingerprint
+from ..NDItools import NDIfinder, NDItools, NDIVideoStream
+from ..tracing import Tracer
+from .test_utils import DYNAMIC_ID1, DYNAMIC_ID2, SOURCE1
+
+import asyncio
+import carb.settings
+from dataclasses import dataclass
+import numpy as np
+import omni.kit.test
+import queue
+import threading
+import time
+from typing import List, Tuple
+from unittest import mock
+
+
+class FakeTools():
+    """What a stream needs from NDItools, without NDI® it never creates a receiver."""
+    def get_tracer(self) -> Tracer:
+        return Tracer(False)
+
+    def is_ndi_ok(self) -> bool:
+        return False
+
+
+class FakeReceiver():
+    """Stands in for a shared NDIVideoStream, it only keeps track of the dynamic textures it feeds."""
+    def __init__(self, key: Tuple[str, bool]):
+        self._key = key
+        self._ids: List[str] = []
+        self._is_running = True
+        self.destroyed = threading.Event()
+
+    def add_target(self, dynamic_id: str, lowlatency: bool, region=None, max_fps: float = 0.0):
+        self._ids.append(dynamic_id)
+
+    def remove_target(self, dynamic_id: str, release: bool = True) -> int:
+        self._ids.remove(dynamic_id)
+        return len(self._ids)
+
+    def get_ids(self) -> List[str]:
+        return list(self._ids)
+
+    def get_receiver_key(self) -> Tuple[str, bool]:
+        return self._key
+
+    def is_running(self) -> bool:
+        return self._is_running
+
+    def service(self) -> float:
+        return time.monotonic() + 0.01 if self._is_running else None
+
+    def stop(self):
+        self._is_running = False
+
+    def destroy(self):
+        self._is_running = False
+        self.destroyed.set()
+
+
+@dataclass
+class FakeSource():
+    ndi_name: str
+    url_address: str = "127.0.0.1:5961"
+
+
+class FakeFind():
+    """Stands for the NDI® finder instance, the test publishes the network sources the finder thread then reads."""
+    def __init__(self):
+        self.updates: "queue.Queue[List[FakeSource]]" = queue.Queue()
+        self.current: List[FakeSource] = []
+
+    def publish(self, names: List[str]):
+        self.updates.put([FakeSource(x) for x in names])
+
+    def wait_for_sources(self, timeout: int) -> bool:
+        try:
+            self.current = self.updates.get(timeout=timeout / 1000)
+        except queue.Empty:
+            return False
+        return True
+
+
+class FakeFinderTools():
+    def __init__(self, find: FakeFind):
+        self._find = find
+
+    def get_ndi_find(self) -> FakeFind:
+        return self._find
+
+
+class NDIVideoStreamUnitTest(omni.kit.test.AsyncTestCase):
+    async def test_static_frames_per_target(self):
+        stream = NDIVideoStream("HOST (A)", False, FakeTools(), fingerprint=FrameFingerprint())
+        stream.add_target("capped", False, max_fps=1.0)
+        stream.add_target("uncapped", False)
+        frame_a = np.zeros((4, 16, 4), dtype=np.uint8)
+        frame_b = np.ones((4, 16, 4), dtype=np.uint8)
+
+        def select(frame: np.ndarray, now: float):
+            targets = stream._get_changed_targets(frame, stream._get_targets_due(now), now)
+            return [x.dynamic_id for x in targets]
+
+        self.assertEqual(select(frame_a, 0.0), ["capped", "uncapped"])
+        self.assertEqual(select(frame_b, 0.1), ["uncapped"])  # The capped target isn't due yet
+        # The frame is unchanged for the uncapped target only, the capped one never got it
+        self.assertEqual(select(frame_b, 1.1), ["capped"])
+        self.assertEqual(select(frame_b, 2.2), [])
+        self.assertEqual(stream.get_uploads_unchanged(), 2)
+
+        stream.remove_target("capped", release=False)
+        stream.remove_target("uncapped", release=False)
+
+
+class SharedReceiverUnitTest(omni.kit.test.AsyncTestCase):
+    def setUp(self):
+        self._tools = NDItools()
+        self._receivers: List[FakeReceiver] = []
+
+        def create_receiver(ndi_source: str, lowbandwidth: bool) -> FakeReceiver:
+            self._receivers.append(FakeReceiver((ndi_source, lowbandwidth)))
+            return self._receivers[-1]
+
+        patcher = mock.patch.object(self._tools, "_create_receiver", create_receiver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tools.destroy()
+
+    async def test_refcount(self):
+        self.assertTrue(self._tools.try_add_stream(DYNAMIC_ID1, SOURCE1, True))
+        self.assertTrue(self._tools.try_add_stream(DYNAMIC_ID2, SOURCE1, True))
+        self.assertEqual(len(self._receivers), 1)
+        receiver = self._receivers[0]
+        self.assertIs(self._tools.get_stream(DYNAMIC_ID1), receiver)
+        self.assertIs(self._tools.get_stream(DYNAMIC_ID2), receiver)
+
+        # The other dynamic texture keeps the receiver running
+        self._tools.stop_stream(DYNAMIC_ID1)
+        self.assertIsNone(self._tools.get_stream(DYNAMIC_ID1))
+        self.assertIs(self._tools.get_stream(DYNAMIC_ID2), receiver)
+        self.assertEqual(receiver.get_ids(), [DYNAMIC_ID2])
+        self.assertTrue(receiver.is_running())
+        self.assertFalse(receiver.destroyed.is_set())
+
+        # Only a NDIVideoStream is parked, the last stop destroys the fake in the background
+        self._tools.stop_stream(DYNAMIC_ID2)
+        self.assertEqual(self._tools.get_stream_ids(), [])
+        self.assertTrue(receiver.destroyed.wait(1.0))
+
+    async def test_bandwidths_not_shared(self):
+        self.assertTrue(self._tools.try_add_stream(DYNAMIC_ID1, SOURCE1, True))
+        self.assertTrue(self._tools.try_add_stream(DYNAMIC_ID2, SOURCE1, False))
+        self.assertEqual([x.get_receiver_key() for x in self._receivers], [(SOURCE1, True), (SOURCE1, False)])
+
+        self._tools.stop_stream(DYNAMIC_ID1)
+        self.assertTrue(self._receivers[0].destroyed.wait(1.0))
+        self.assertTrue(self._receivers[1].is_running())
+
+
+class TracingSettingUnitTest(omni.kit.test.AsyncTestCase):
+    def setUp(self):
+        self._settings = carb.settings.get_settings()
+        self._recording = bool(self._settings.get(NDItools.SETTING_TRACING))
+        self._tools = NDItools()
+
+    def tearDown(self):
+        self._tools.destroy()
+        self._settings.set(NDItools.SETTING_TRACING, self._recording)
+
+    async def test_live_toggle(self):
+        self._settings.set(NDItools.SETTING_TRACING, not self._recording)
+        self.assertEqual(self._tools.get_tracer().is_recording(), not self._recording)
+        self._settings.set(NDItools.SETTING_TRACING, self._recording)
+        self.assertEqual(self._tools.get_tracer().is_recording(), self._recording)
+
+
+class NDIfinderUnitTest(omni.kit.test.AsyncTestCase):
+    def setUp(self):
+        self._find = FakeFind()
+        for name, fn in [("find_wait_for_sources", lambda find, timeout: find.wait_for_sources(timeout)),
+                         ("find_get_current_sources", lambda find: find.current)]:
+            patcher = mock.patch.object(ndi, name, fn)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self._finder = NDIfinder(FakeFinderTools(self._find))
+
+    def tearDown(self):
+        self._finder.destroy()
+
+    async def test_cache_hit(self):
+        self._find.publish(["HOST (A)"])
+        self.assertEqual(self._finder.find_source("HOST (A)").ndi_name, "HOST (A)")
+
+        # Gone from the network, it stays in the cache within its TTL and is found without waiting
+        self._find.publish(["HOST (B)"])
+        self.assertIsNotNone(self._finder.find_source("HOST (B)"))
+        start = time.monotonic()
+        self.assertEqual(self._finder.find_source("HOST (A)", timeout=5).ndi_name, "HOST (A)")
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(self._finder.get_sources(), ["HOST (B)"])
+
+    async def test_cache_expiry(self):
+        with mock.patch.object(NDIfinder, "SOURCE_TTL", 0.2):
+            self._find.publish(["HOST (A)"])
+            self.assertIsNotNone(self._finder.find_source("HOST (A)"))
+            await asyncio.sleep(0.3)
+
+            self._find.publish(["HOST (B)"])
+            self.assertIsNotNone(self._finder.find_source("HOST (B)"))
+            self.assertIsNone(self._finder.get_last_seen("HOST (A)"))
+            self.assertIsNone(self._finder.find_source("HOST (A)", timeout=0))
+
+    async def test_wait_timeout(self):
+        start = time.monotonic()
+        self.assertIsNone(self._finder.find_source("HOST (A)", timeout=0.2))
+        self.assertGreater(time.monotonic() - start, 0.15)
@@ -1,9 +1,14 @@
 from ..USDtools import USDtools
-from .test_utils import make_stage, close_stage, create_dynamic_material, create_dynamic_rectlight, SOURCE1
+from .test_utils import make_stage, close_stage, create_dynamic_material, create_dynamic_rectlight, SOURCE1, \
+    DYNAMIC_ID2
 
 import omni.kit.test
 
 
+def set_attribute(path, name: str, value):
+    USDtools.set_prims_attributes([(str(path), name, value)])
+
+
 class USDValidNameUnitTest(omni.kit.test.AsyncTestCase):
     async def test_name_valid(self):
         self.check_name_valid("myDynamicMaterial", "myDynamicMaterial")
@@ -43,6 +48,14 @@ class USDToolsUnitTest(omni.kit.test.AsyncTestCase):
         sources = USDtools.find_all_dynamic_sources()
         self.assertEqual(len(sources), 2)
 
+    async def test_find_dynamic_sources_skips_inactive(self):
+        material = create_dynamic_material()
+        create_dynamic_rectlight()
+        material.GetPrim().SetActive(False)
+
+        sources = USDtools.find_all_dynamic_sources()
+        self.assertEqual([x.dynamic_id for x in sources], [DYNAMIC_ID2])
+
     async def test_set_property_ndi(self):
         material = create_dynamic_material()
         path = material.GetPath()
@@ -61,3 +74,56 @@ class USDToolsUnitTest(omni.kit.test.AsyncTestCase):
 
         USDtools.set_prim_lowbandwidth_attribute(path, False)
         self.assertFalse(attr.Get())
+
+    async def test_set_property_latency(self):
+        material = create_dynamic_material()
+        path = material.GetPath()
+        set_attribute(path, USDtools.ATTR_LATENCY_NAME, True)
+
+        attr = material.GetPrim().GetAttribute(USDtools.ATTR_LATENCY_NAME)
+        self.assertTrue(attr.Get())
+
+        set_attribute(path, USDtools.ATTR_LATENCY_NAME, False)
+        self.assertFalse(attr.Get())
+
+    async def test_set_property_maxfps(self):
+        material = create_dynamic_material()
+        path = material.GetPath()
+        set_attribute(path, USDtools.ATTR_MAXFPS_NAME, 30.0)
+
+        attr = material.GetPrim().GetAttribute(USDtools.ATTR_MAXFPS_NAME)
+        self.assertEqual(attr.Get(), 30.0)
+
+        set_attribute(path, USDtools.ATTR_MAXFPS_NAME, 0.0)
+        self.assertEqual(attr.Get(), 0.0)
+
+    async def test_set_property_region(self):
+        material = create_dynamic_material()
+        shader_path = f"{material.GetPath()}/Shader"
+        set_attribute(shader_path, USDtools.ATTR_REGION_NAME, (0, 540, 960, 540))
+
+        sources = USDtools.find_all_dynamic_sources()
+        self.assertEqual(sources[0].region_attr, (0, 540, 960, 540))
+
+        set_attribute(shader_path, USDtools.ATTR_REGION_NAME, None)
+        sources = USDtools.find_all_dynamic_sources()
+        self.assertIsNone(sources[0].region_attr)
+
+    async def test_set_prims_attributes(self):
+        material = create_dynamic_material()
+        shader_path = f"{material.GetPath()}/Shader"
+        set_attribute(shader_path, USDtools.ATTR_REGION_NAME, (0, 540, 960, 540))
+
+        count = USDtools.set_prims_attributes([(shader_path, USDtools.ATTR_NDI_NAME, SOURCE1),
+                                               (shader_path, USDtools.ATTR_BANDWIDTH_NAME, True),
+                                               (shader_path, USDtools.ATTR_REGION_NAME, None),
+                                               ("/World/Missing", USDtools.ATTR_NDI_NAME, SOURCE1)])
+        self.assertEqual(count, 3)
+
+        sources = USDtools.find_all_dynamic_sources()
+        self.assertEqual(sources[0].ndi_source_attr, SOURCE1)
+        self.assertTrue(sources[0].lowbandwidth_attr)
+        self.assertIsNone(sources[0].region_attr)
+
+        stage = USDtools.get_stage()
+        self.assertTrue(stage.GetPrimAtPath(shader_path).GetAttribute(USDtools.ATTR_NDI_NAME).IsCustom())
@@ -0,0 +1,30 @@
+from ..bindingPatch import BindingPatch, BindingPatchReader
+
+import omni.kit.test
+
+
+class BindingPatchReaderUnitTest(omni.kit.test.AsyncTestCase):
+    async def test_read_csv(self):
+        text = ("dynamic_id,source,lowbandwidth,maxfps,region\n"
+                "screen_01,HOST (Canvas),yes,,\"0, 0, 960, 540\"\n"
+                "screen_02,,false,30,none\n")
+        patches = BindingPatchReader.read_csv(text)
+        self.assertEqual(patches, [BindingPatch("screen_01", "HOST (Canvas)", True, region=(0, 0, 960, 540)),
+                                   BindingPatch("screen_02", lowbandwidth=False, max_fps=30.0, region=())])
+
+    async def test_read_json(self):
+        text = '[{"dynamic_id": "screen_01", "source": "HOST (Canvas)", "region": [0, 540, 960, 540]}, ' \
+               '{"dynamic_id": "screen_02", "lowlatency": true, "region": null}]'
+        patches = BindingPatchReader.read_json(text)
+        self.assertEqual(patches, [BindingPatch("screen_01", "HOST (Canvas)", region=(0, 540, 960, 540)),
+                                   BindingPatch("screen_02", lowlatency=True, region=())])
+
+    async def test_invalid_patches(self):
+        with self.assertRaises(ValueError):
+            BindingPatchReader.read_csv("source\nHOST (Canvas)\n")
+        with self.assertRaises(ValueError):
+            BindingPatchReader.read_csv("dynamic_id,lowbandwidth\nscreen_01,maybe\n")
+        with self.assertRaises(ValueError):
+            BindingPatchReader.read_json('[{"dynamic_id": "screen_01", "region": [0, 0, 960]}]')
+        with self.assertRaises(ValueError):
+            BindingPatchReader.read_json('{"dynamic_id": "screen_01"}')
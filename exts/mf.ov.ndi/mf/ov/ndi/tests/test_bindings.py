@@ -0,0 +1,62 @@
+from ..bindings import BindingsModel, DynamicPrim
+
+import omni.kit.test
+
+
+class BindingsModelUnitTest(omni.kit.test.AsyncTestCase):
+    def setUp(self):
+        self._model = BindingsModel()
+
+    def tearDown(self):
+        self._model.destroy()
+
+    async def test_indexes(self):
+        prims = [DynamicPrim("/World/a", "tex_a", "HOST (A)", False),
+                 DynamicPrim("/World/b", "tex_b", None, True),
+                 DynamicPrim("/World/light_a", "tex_a", "HOST (A)", False)]
+        self._model.update_dynamic_prims(prims)
+
+        # Prims sharing a dynamic id share a single binding
+        self.assertEqual(self._model.count(), 2)
+        self.assertEqual(len(self._model.get_prims_with_id("tex_a")), 2)
+        self.assertIs(self._model.find_prim_from_path("/World/b"), prims[1])
+
+        binding, prim, ndi = self._model.get(1)
+        self.assertIs(self._model.find_binding_from_id("tex_b"), binding)
+        self.assertEqual(binding.ndi_source, BindingsModel.NONE_DATA.source)
+        self.assertIs(prim, prims[1])
+        self.assertIs(ndi, BindingsModel.NONE_DATA)
+        self.assertEqual(self._model.get_source_list(), [BindingsModel.NONE_DATA.source, "HOST (A)"])
+
+    async def test_source_activity(self):
+        self._model.update_dynamic_prims([DynamicPrim("/World/a", "tex_a", "HOST (A)", False)])
+        _, _, ndi = self._model.get(0)
+        self.assertFalse(ndi.active)
+
+        self._model.update_ndi_sources(["HOST (A)", "HOST (B)"], [])
+        self.assertTrue(ndi.active)
+        self.assertEqual(len(self._model.get_source_list()), 3)
+
+        self._model.update_ndi_sources([], ["HOST (A)"])
+        self.assertFalse(ndi.active)
+        self.assertEqual(len(self._model.get_source_list()), 3)  # Removed sources are kept, inactive
+
+    async def test_update_keeps_bindings(self):
+        self._model.update_dynamic_prims([DynamicPrim("/World/a", "tex_a", "HOST (A)", False),
+                                          DynamicPrim("/World/b", "tex_b", "HOST (A)", False)])
+        binding_a = self._model.find_binding_from_id("tex_a")
+        binding_b = self._model.find_binding_from_id("tex_b")
+
+        self._model.update_dynamic_prims([DynamicPrim("/World/c", "tex_c", None, False),
+                                          DynamicPrim("/World/b", "tex_b", "HOST (B)", False),
+                                          DynamicPrim("/World/a", "tex_a", "HOST (A)", False)])
+
+        # Unchanged bindings are kept as they were, new ones come last
+        self.assertIs(self._model.find_binding_from_id("tex_a"), binding_a)
+        self.assertIsNot(self._model.find_binding_from_id("tex_b"), binding_b)
+        self.assertEqual(self._model.find_binding_from_id("tex_b").ndi_source, "HOST (B)")
+        self.assertEqual([x.dynamic_id for x in self._model.get_bindings()], ["tex_a", "tex_b", "tex_c"])
+
+        self._model.update_dynamic_prims([DynamicPrim("/World/c", "tex_c", None, False)])
+        self.assertEqual(self._model.count(), 1)
+        self.assertIsNone(self._model.find_binding_from_id("tex_a"))
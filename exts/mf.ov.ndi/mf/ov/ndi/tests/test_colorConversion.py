@@ -0,0 +1,53 @@
+from ..colorConversion import UYVYConverter
+
+import numpy as np
+import omni.kit.test
+
+
+class UYVYConverterUnitTest(omni.kit.test.AsyncTestCase):
+    WIDTH = 8
+    HEIGHT = 4
+
+    def make_uyvy(self, y: int, u: int, v: int) -> np.ndarray:
+        frame = np.empty((UYVYConverterUnitTest.HEIGHT, UYVYConverterUnitTest.WIDTH * 2), dtype=np.uint8)
+        frame[:, 0::4] = u
+        frame[:, 1::2] = y
+        frame[:, 2::4] = v
+        return frame
+
+    def convert(self, converter: UYVYConverter, frame: np.ndarray, alpha: np.ndarray = None) -> np.ndarray:
+        return converter.convert(frame, UYVYConverterUnitTest.WIDTH, UYVYConverterUnitTest.HEIGHT, alpha)
+
+    async def test_black_and_white(self):
+        converter = UYVYConverter()
+        rgba = self.convert(converter, self.make_uyvy(16, 128, 128))
+        self.assertEqual(rgba.shape, (UYVYConverterUnitTest.HEIGHT, UYVYConverterUnitTest.WIDTH, 4))
+        self.assertTrue(np.array_equal(rgba[0, 0], [0, 0, 0, 255]))
+
+        rgba = self.convert(converter, self.make_uyvy(235, 128, 128))
+        self.assertTrue(np.array_equal(rgba[0, 0], [255, 255, 255, 255]))
+
+    async def test_red(self):
+        rgba = self.convert(UYVYConverter(UYVYConverter.BT709), self.make_uyvy(63, 102, 240))
+        self.assertGreaterEqual(rgba[0, 0, 0], 253)
+        self.assertLessEqual(rgba[0, 0, 1], 2)
+        self.assertLessEqual(rgba[0, 0, 2], 2)
+
+        rgba = self.convert(UYVYConverter(UYVYConverter.BT601), self.make_uyvy(81, 90, 240))
+        self.assertGreaterEqual(rgba[0, 0, 0], 253)
+        self.assertLessEqual(rgba[0, 0, 1], 2)
+        self.assertLessEqual(rgba[0, 0, 2], 2)
+
+    async def test_alpha(self):
+        converter = UYVYConverter()
+        alpha = np.full((UYVYConverterUnitTest.HEIGHT, UYVYConverterUnitTest.WIDTH), 42, dtype=np.uint8)
+        rgba = self.convert(converter, self.make_uyvy(16, 128, 128), alpha)
+        self.assertEqual(rgba[0, 0, 3], 42)
+
+        rgba = self.convert(converter, self.make_uyvy(16, 128, 128))
+        self.assertEqual(rgba[0, 0, 3], 255)
+
+    async def test_auto_colorimetry(self):
+        converter = UYVYConverter()
+        self.assertEqual(converter.get_colorimetry(480), UYVYConverter.BT601)
+        self.assertEqual(converter.get_colorimetry(1080), UYVYConverter.BT709)
@@ -0,0 +1,66 @@
+from ..dynamicPrimCache import DynamicPrimCache
+from ..USDtools import USDtools
+from .test_utils import make_stage, close_stage, create_dynamic_material, create_dynamic_rectlight, SOURCE1, \
+    DYNAMIC_ID1, DYNAMIC_ID2
+
+import omni.kit.test
+from pxr import Sdf, UsdShade
+
+
+class DynamicPrimCacheUnitTest(omni.kit.test.AsyncTestCase):
+    def setUp(self):
+        self._stage = make_stage()
+        self._updates = []
+        self._cache = DynamicPrimCache(self._stage, self._updates.append)
+
+    def tearDown(self):
+        self._cache.destroy()
+        close_stage()
+
+    async def test_resynced_prims(self):
+        self.assertEqual(self._cache.get_dynamic_prims(), [])
+
+        create_dynamic_material()
+        create_dynamic_rectlight()
+        self.assertTrue(self._cache.has_pending_changes())
+        self.assertTrue(self._cache.flush())
+        self.assertEqual([x.dynamic_id for x in self._updates[-1]], [DYNAMIC_ID1, DYNAMIC_ID2])
+        self.assertEqual(self._updates[-1], USDtools.find_all_dynamic_sources(self._stage))
+
+        self._stage.GetDefaultPrim().GetChild(USDtools.SCOPE_NAME).SetActive(False)
+        self.assertTrue(self._cache.flush())
+        self.assertEqual([x.dynamic_id for x in self._updates[-1]], [DYNAMIC_ID2])
+
+    async def test_changed_attributes(self):
+        material = create_dynamic_material()
+        self._cache.flush()
+        shader_path = f"{material.GetPath()}/Shader"
+
+        USDtools.set_prims_attributes([(shader_path, USDtools.ATTR_NDI_NAME, SOURCE1)])
+        self.assertTrue(self._cache.flush())
+        self.assertEqual(self._updates[-1][0].ndi_source_attr, SOURCE1)
+
+        # Attributes that don't change a binding are ignored
+        self._stage.GetPrimAtPath(shader_path).CreateAttribute("inputs:albedo_add", Sdf.ValueTypeNames.Float).Set(1.0)
+        self.assertFalse(self._cache.has_pending_changes())
+        self.assertFalse(self._cache.flush())
+
+    async def test_traversal_order(self):
+        # Two shaders share a dynamic id, the first one in the stage makes the binding
+        for name, source in (("First", SOURCE1), ("Second", None)):
+            shader = UsdShade.Shader.Define(self._stage, f"/World/{name}")
+            shader.CreateInput("diffuse_texture", Sdf.ValueTypeNames.Asset).Set(f"{USDtools.PREFIX}{DYNAMIC_ID1}")
+            if source is not None:
+                shader.GetPrim().CreateAttribute(USDtools.ATTR_NDI_NAME, Sdf.ValueTypeNames.String).Set(source)
+        self._cache.flush()
+        self.assertEqual(self._updates[-1][0].path, "/World/First")
+
+        # Traversed again after a resync, it still comes first
+        first = self._stage.GetPrimAtPath("/World/First")
+        first.SetActive(False)
+        self._cache.flush()
+        self.assertEqual(self._updates[-1][0].path, "/World/Second")
+        first.SetActive(True)
+        self._cache.flush()
+        self.assertEqual(self._updates[-1][0].path, "/World/First")
+        self.assertEqual(self._cache.get_dynamic_prims(), USDtools.find_all_dynamic_sources(self._stage))
@@ -0,0 +1,35 @@
+from ..frameFingerprint import FrameFingerprint
+
+import numpy as np
+import omni.kit.test
+
+
+class FrameFingerprintUnitTest(omni.kit.test.AsyncTestCase):
+    async def test_unchanged(self):
+        fingerprint = FrameFingerprint()
+        frame = np.random.default_rng(1).integers(0, 256, size=(1080, 1920, 4), dtype=np.uint8)
+        self.assertEqual(fingerprint.compute(frame), fingerprint.compute(frame.copy()))
+
+    async def test_changed(self):
+        fingerprint = FrameFingerprint()
+        frame = np.zeros((1080, 1920, 4), dtype=np.uint8)
+        first = fingerprint.compute(frame)
+
+        frame[0, 0, 0] = 1  # First row and first tile are always sampled
+        second = fingerprint.compute(frame)
+        self.assertNotEqual(second, first)
+        frame[-1, -1, -1] = 1  # So are the last ones
+        self.assertNotEqual(fingerprint.compute(frame), second)
+
+    async def test_resolution_change(self):
+        fingerprint = FrameFingerprint()
+        first = fingerprint.compute(np.zeros((1080, 1920, 4), dtype=np.uint8))
+        self.assertNotEqual(fingerprint.compute(np.zeros((720, 1280, 4), dtype=np.uint8)), first)
+
+    async def test_narrow_rows(self):
+        fingerprint = FrameFingerprint()
+        frame = np.zeros((4, 16), dtype=np.uint8)  # UYVY as received, rows narrower than the default tiles
+        first = fingerprint.compute(frame)
+        self.assertEqual(fingerprint.compute(frame.copy()), first)
+        frame[-1, -1] = 1
+        self.assertNotEqual(fingerprint.compute(frame), first)
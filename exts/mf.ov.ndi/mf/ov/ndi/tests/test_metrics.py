@@ -0,0 +1,65 @@
+from ..metrics import MetricsServer, MetricsWriter
+
+import asyncio
+import omni.kit.test
+import urllib.error
+import urllib.request
+
+
+class MetricsWriterUnitTest(omni.kit.test.AsyncTestCase):
+    async def test_families_are_grouped(self):
+        writer = MetricsWriter()
+        writer.declare("frames_total", MetricsWriter.COUNTER, "Frames")
+        writer.declare("streams", MetricsWriter.GAUGE, "Streams")
+        writer.sample("streams", 2)
+        writer.sample("frames_total", 10, {"source": "A"})
+        writer.sample("frames_total", 20, {"source": "B"})
+
+        lines = writer.to_text().splitlines()
+        self.assertEqual(lines, [
+            "# HELP frames_total Frames",
+            "# TYPE frames_total counter",
+            'frames_total{source="A"} 10',
+            'frames_total{source="B"} 20',
+            "# HELP streams Streams",
+            "# TYPE streams gauge",
+            "streams 2",
+        ])
+
+    async def test_label_escaping(self):
+        writer = MetricsWriter()
+        writer.declare("streams", MetricsWriter.GAUGE, "Streams")
+        writer.sample("streams", 1, {"source": 'HOST (Cam "1")\\'})
+        self.assertIn('streams{source="HOST (Cam \\"1\\")\\\\"} 1', writer.to_text())
+
+    async def test_histogram(self):
+        writer = MetricsWriter()
+        writer.declare("upload_seconds", MetricsWriter.HISTOGRAM, "Upload")
+        writer.histogram("upload_seconds", (0.001, 0.01), [1, 3, 4], 0.5, {"source": "A"})
+
+        text = writer.to_text()
+        self.assertIn('upload_seconds_bucket{source="A",le="0.001"} 1', text)
+        self.assertIn('upload_seconds_bucket{source="A",le="0.01"} 3', text)
+        self.assertIn('upload_seconds_bucket{source="A",le="+Inf"} 4', text)
+        self.assertIn('upload_seconds_sum{source="A"} 0.5', text)
+        self.assertIn('upload_seconds_count{source="A"} 4', text)
+
+
+class MetricsServerUnitTest(omni.kit.test.AsyncTestCase):
+    def get(self, server: MetricsServer, path: str):
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.get_port()}{path}", timeout=5) as response:
+            return response.status, response.headers["Content-Type"], response.read().decode("utf-8")
+
+    async def test_serve(self):
+        server = MetricsServer(lambda: "streams 1\n", 0)  # Any free port
+        try:
+            status, content_type, body = await asyncio.get_event_loop().run_in_executor(
+                None, self.get, server, MetricsServer.PATH)
+            self.assertEqual(status, 200)
+            self.assertEqual(content_type, MetricsServer.CONTENT_TYPE)
+            self.assertEqual(body, "streams 1\n")
+
+            with self.assertRaises(urllib.error.HTTPError):
+                await asyncio.get_event_loop().run_in_executor(None, self.get, server, "/other")
+        finally:
+            server.destroy()
@@ -0,0 +1,79 @@
+from ..receiveWorker import FIND_TIMEOUT, ReceiveWorker, SharedFrameRing
+
+import asyncio
+import numpy as np
+import omni.kit.test
+import time
+
+
+class SharedFrameRingUnitTest(omni.kit.test.AsyncTestCase):
+    def setUp(self):
+        self._ring = SharedFrameRing(3, 4 * 4 * 4)
+
+    def tearDown(self):
+        self._ring.destroy()
+
+    def make_frame(self, value: int) -> np.ndarray:
+        return np.full((4, 4, 4), value, dtype=np.uint8)
+
+    async def test_empty(self):
+        self.assertIsNone(self._ring.read_latest(-1))
+
+    async def test_read_latest_only(self):
+        for i in range(5):
+            self.assertTrue(self._ring.write(self.make_frame(i), 0, 30, 1, i))
+
+        sequence, slot, view = self._ring.read_latest(-1)
+        self.assertEqual(sequence, 4)
+        self.assertEqual(slot[SharedFrameRing.SLOT_TIMESTAMP], 4)
+        self.assertTrue(np.array_equal(view, self.make_frame(4)))
+        self.assertTrue(self._ring.is_intact(sequence))
+
+        self.assertIsNone(self._ring.read_latest(sequence))
+
+    async def test_claimed_slot(self):
+        self._ring.write(self.make_frame(0), 0, 30, 1, 0)
+        sequence, _, view = self._ring.read_latest(-1)
+
+        # The writer goes around the slot the reader uses, the view is never copied
+        for i in range(1, 6):
+            self.assertTrue(self._ring.write(self.make_frame(i), 0, 30, 1, i))
+        self.assertTrue(np.array_equal(view, self.make_frame(0)))
+        self.assertTrue(self._ring.release(sequence))
+
+        sequence, slot, view = self._ring.read_latest(sequence)
+        self.assertEqual(slot[SharedFrameRing.SLOT_TIMESTAMP], 5)
+        self.assertTrue(np.array_equal(view, self.make_frame(5)))
+        self._ring.release(sequence)
+
+        # Once released, the slot is written again
+        for i in range(6, 9):
+            self._ring.write(self.make_frame(i), 0, 30, 1, i)
+        self.assertFalse(np.array_equal(view, self.make_frame(5)))
+
+    async def test_torn_slot(self):
+        self._ring.write(self.make_frame(0), 0, 30, 1, 0)
+        sequence, _, _ = self._ring.read_latest(-1)
+
+        # The writer marked the slot just before the reader claimed it
+        self._ring._slots()[0][SharedFrameRing.SLOT_SEQUENCE] = -1
+        self.assertFalse(self._ring.release(sequence))
+
+    async def test_oversized(self):
+        self.assertFalse(self._ring.write(np.zeros((8, 8, 4), dtype=np.uint8), 0, 30, 1, 0))
+        self.assertEqual(self._ring.get_header(SharedFrameRing.HEADER_OVERSIZED), 1)
+        self.assertIsNone(self._ring.read_latest(-1))
+
+
+class ReceiveWorkerUnitTest(omni.kit.test.AsyncTestCase):
+    async def test_worker_process(self):
+        # A worker that can't import its modules exits while still starting, this one gets to look for the source
+        worker = ReceiveWorker("MISSING-PC (No Source)", True)
+        try:
+            deadline = time.monotonic() + FIND_TIMEOUT + 10
+            while worker.is_starting() and worker.is_alive() and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+            self.assertFalse(worker.is_starting())
+            self.assertFalse(worker.is_alive())  # The source doesn't exist
+        finally:
+            worker.destroy()
@@ -0,0 +1,46 @@
+from ..stagingPool import StagingBufferPool
+
+import numpy as np
+import omni.kit.test
+import warp as wp
+
+
+class StagingBufferPoolUnitTest(omni.kit.test.AsyncTestCase):
+    def setUp(self):
+        wp.init()
+        self._pool = StagingBufferPool(capacity=2)
+
+    def tearDown(self):
+        self._pool.destroy()
+
+    async def test_upload_reuses_buffer(self):
+        frame = np.full((4, 8, 4), 7, dtype=np.uint8)
+        first = self._pool.upload(frame, "cpu")
+        self.assertTrue(np.array_equal(first.numpy(), frame))
+
+        frame[:] = 9
+        second = self._pool.upload(frame, "cpu")
+        self.assertEqual(first.ptr, second.ptr)
+        self.assertTrue(np.array_equal(second.numpy(), frame))
+
+        self.assertEqual(self._pool.hits, 1)
+        self.assertEqual(self._pool.misses, 1)
+        self.assertEqual(self._pool.bytes_allocated, frame.nbytes)
+
+    async def test_lru_eviction(self):
+        small = np.zeros((2, 2, 4), dtype=np.uint8)
+        medium = np.zeros((4, 4, 4), dtype=np.uint8)
+        large = np.zeros((8, 8, 4), dtype=np.uint8)
+
+        self._pool.upload(small, "cpu")
+        self._pool.upload(medium, "cpu")
+        self._pool.upload(small, "cpu")  # medium is now the least recently used
+        self._pool.upload(large, "cpu")
+
+        stats = self._pool.get_stats()
+        self.assertEqual(stats["buffers"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["bytes_allocated"], small.nbytes + large.nbytes)
+
+        self._pool.upload(small, "cpu")
+        self.assertEqual(self._pool.hits, 2)
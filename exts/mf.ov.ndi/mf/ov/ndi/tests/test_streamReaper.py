@@ -0,0 +1,59 @@
+from ..streamReaper import StreamReaper
+from ..streamScheduler import StreamScheduler
+
+import omni.kit.test
+import threading
+import time
+
+
+class SlowStream():
+    """Stands in for a receiver whose shutdown blocks until it is released."""
+    def __init__(self):
+        self.is_running = True
+        self.destroyed = threading.Event()
+        self.release = threading.Event()
+
+    def service(self) -> float:
+        return None if not self.is_running else time.monotonic() + 0.001
+
+    def stop(self):
+        self.is_running = False
+
+    def destroy(self):
+        self.release.wait()
+        self.destroyed.set()
+
+
+class StreamReaperUnitTest(omni.kit.test.AsyncTestCase):
+    def setUp(self):
+        self._scheduler = StreamScheduler(worker_count=1)
+
+    def tearDown(self):
+        self._scheduler.destroy()
+
+    async def test_reap_does_not_block(self):
+        reaper = StreamReaper(self._scheduler)
+        stream = SlowStream()
+        self._scheduler.add(stream)
+
+        start = time.monotonic()
+        reaper.reap(stream)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(stream.is_running)
+        self.assertEqual(reaper.get_pending_count(), 1)
+
+        stream.release.set()
+        self.assertTrue(reaper.destroy())
+        self.assertTrue(stream.destroyed.is_set())
+        self.assertFalse(self._scheduler.is_scheduled(stream))
+        self.assertEqual(reaper.get_pending_count(), 0)
+
+    async def test_deadline(self):
+        reaper = StreamReaper(self._scheduler)
+        stream = SlowStream()
+        reaper.reap(stream)
+
+        self.assertFalse(reaper.destroy(deadline=0.1))
+        stream.release.set()
+        stream.destroyed.wait(1.0)
+        self.assertTrue(stream.destroyed.is_set())
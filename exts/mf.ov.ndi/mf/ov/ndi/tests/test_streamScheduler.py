@@ -0,0 +1,97 @@
+from ..streamScheduler import StreamScheduler
+
+import omni.kit.test
+import threading
+import time
+
+
+class FakeStream():
+    """Records when it is serviced, asks for the next service `period` seconds later or not at all once stopped."""
+    def __init__(self, name: str, log: list, period: float = None):
+        self.name = name
+        self.period = period
+        self.is_running = True
+        self._log = log
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def service(self) -> float:
+        self.entered.set()
+        self.release.wait()
+        self._log.append(self.name)
+        if not self.is_running or self.period is None:
+            return None
+        return time.monotonic() + self.period
+
+    def stop(self):
+        self.is_running = False
+
+
+class FailingStream(FakeStream):
+    def service(self) -> float:
+        raise RuntimeError("receiver lost")
+
+
+class StreamSchedulerUnitTest(omni.kit.test.AsyncTestCase):
+    def tearDown(self):
+        self._scheduler.destroy()
+
+    def _wait(self, condition, timeout: float = 1.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return condition()
+
+    async def test_deadline_order(self):
+        self._scheduler = StreamScheduler(worker_count=1)
+        log = []
+        now = time.monotonic()
+        for name, delay in (("late", 0.06), ("early", 0.02), ("middle", 0.04)):
+            self._scheduler.add(FakeStream(name, log), now + delay)
+
+        self.assertTrue(self._wait(lambda: len(log) == 3))
+        self.assertEqual(log, ["early", "middle", "late"])
+        self.assertEqual(self._scheduler.get_stream_count(), 0)  # Done streams are unscheduled
+
+    async def test_queue_depth(self):
+        self._scheduler = StreamScheduler(worker_count=1)
+        log = []
+        busy = FakeStream("busy", log)
+        busy.release.clear()
+        self._scheduler.add(busy)
+        self.assertTrue(busy.entered.wait(1.0))
+
+        # The only worker is busy, the due streams wait for it
+        self._scheduler.add(FakeStream("a", log))
+        self._scheduler.add(FakeStream("b", log))
+        self._scheduler.add(FakeStream("later", log), time.monotonic() + 10.0)
+        self.assertEqual(self._scheduler.get_queue_depth(), 2)
+
+        busy.release.set()
+        self.assertTrue(self._wait(lambda: self._scheduler.get_queue_depth() == 0))
+
+    async def test_remove_in_service(self):
+        self._scheduler = StreamScheduler(worker_count=1)
+        log = []
+        stream = FakeStream("stream", log, period=0.001)
+        stream.release.clear()
+        self._scheduler.add(stream)
+        self.assertTrue(stream.entered.wait(1.0))
+
+        threading.Timer(0.05, stream.release.set).start()
+        self._scheduler.remove(stream)  # Waits for the worker to be done servicing it
+        self.assertTrue(stream.release.is_set())
+        self.assertFalse(self._scheduler.is_scheduled(stream))
+
+        count = len(log)
+        time.sleep(0.02)
+        self.assertEqual(len(log), count)  # Not serviced anymore, even though it asked to be
+
+    async def test_failing_stream(self):
+        self._scheduler = StreamScheduler(worker_count=1)
+        stream = FailingStream("failing", [], period=0.001)
+        with self.assertLogs(StreamScheduler.__module__, level="ERROR"):
+            self._scheduler.add(stream)
+            self.assertTrue(self._wait(lambda: not self._scheduler.is_scheduled(stream)))
+        self.assertFalse(stream.is_running)  # Stopped so its owner reaps it
@@ -0,0 +1,70 @@
+from ..telemetry import StreamStats, StreamTelemetry
+
+import math
+import omni.kit.test
+
+
+class StreamTelemetryUnitTest(omni.kit.test.AsyncTestCase):
+    PERIOD = 1.0 / 60.0
+
+    async def test_empty(self):
+        snapshot = StreamTelemetry().snapshot()
+        self.assertEqual(snapshot["frames"], 0)
+        self.assertIsNone(snapshot["interval"]["p50"])
+
+    async def test_percentiles(self):
+        telemetry = StreamTelemetry()
+        for i in range(100):
+            capture = (i + 1) / 1000  # 1 to 100 ms
+            telemetry.record(0.05, capture, 0.002, StreamTelemetryUnitTest.PERIOD, StreamTelemetryUnitTest.PERIOD)
+
+        snapshot = telemetry.snapshot()
+        self.assertEqual(snapshot["frames"], 100)
+        self.assertAlmostEqual(snapshot["capture"]["p50"], 0.0505)
+        self.assertGreater(snapshot["capture"]["p99"], snapshot["capture"]["p95"])
+        self.assertAlmostEqual(snapshot["latency"]["p95"], 0.05)
+        self.assertAlmostEqual(snapshot["jitter"]["p99"], 0.0)
+
+    async def test_ring_overwrites_oldest(self):
+        telemetry = StreamTelemetry(capacity=10)
+        for _ in range(10):
+            telemetry.record(math.nan, 1.0, 0.0, StreamTelemetryUnitTest.PERIOD, StreamTelemetryUnitTest.PERIOD)
+        for _ in range(10):
+            telemetry.record(math.nan, 2.0, 0.0, StreamTelemetryUnitTest.PERIOD, StreamTelemetryUnitTest.PERIOD)
+
+        snapshot = telemetry.snapshot()
+        self.assertEqual(snapshot["frames"], 20)
+        self.assertEqual(snapshot["capture"]["p50"], 2.0)
+        self.assertIsNone(snapshot["latency"]["p50"])  # No sender timestamp
+
+    async def test_sdk_counters(self):
+        telemetry = StreamTelemetry()
+        telemetry.record_sdk(120, 3, 1)
+        snapshot = telemetry.snapshot()
+        self.assertEqual(snapshot["sdk_frames_total"], 120)
+        self.assertEqual(snapshot["sdk_frames_dropped"], 3)
+        self.assertEqual(snapshot["sdk_queue_depth"], 1)
+
+
+class StreamStatsUnitTest(omni.kit.test.AsyncTestCase):
+    async def test_publish_and_read(self):
+        stats = StreamStats()
+        stats.publish(59.9, 60.0, 60.0, 2, 3, 4, 5, 6)
+        stats.publish_format(1920, 1080, 0x41424752)
+        stats.publish_staging(7, 1, 1920 * 1080 * 4)
+
+        values = stats.read()
+        self.assertAlmostEqual(values["fps_current"], 59.9)
+        self.assertEqual(values["frames_dropped"], 2)
+        self.assertEqual(values["uploads_skipped"], 3)
+        self.assertEqual(values["frames_unchanged"], 4)
+        self.assertEqual((values["frames_torn"], values["frames_oversized"]), (5, 6))
+        self.assertEqual((values["width"], values["height"]), (1920, 1080))
+        self.assertEqual(values["fourcc"], 0x41424752)
+        self.assertEqual((values["staging_hits"], values["staging_misses"]), (7, 1))
+        self.assertEqual(values["staging_bytes"], 1920 * 1080 * 4)
+
+    async def test_read_before_publish(self):
+        values = StreamStats().read()
+        self.assertEqual(values["fourcc"], 0)
+        self.assertEqual(values["fps_current"], 0.0)
@@ -0,0 +1,85 @@
+from ..tracing import Tracer
+
+import json
+import omni.kit.test
+import os
+import tempfile
+
+
+class TracerUnitTest(omni.kit.test.AsyncTestCase):
+    def get_spans(self, tracer: Tracer) -> list:
+        return [x for x in tracer.to_chrome_trace()["traceEvents"] if x["ph"] == "X"]
+
+    async def test_nested_zones(self):
+        tracer = Tracer()
+        track = tracer.create_track("source")
+        with track.zone("outer"):
+            with track.zone("inner"):
+                pass
+            with track.zone("inner 2"):
+                pass
+
+        spans = self.get_spans(tracer)
+        self.assertEqual([x["name"] for x in spans], ["inner", "inner 2", "outer"])
+        outer = spans[2]
+        for inner in spans[:2]:
+            self.assertGreaterEqual(inner["ts"], outer["ts"])
+            self.assertLessEqual(inner["ts"] + inner["dur"], outer["ts"] + outer["dur"])
+
+    async def test_zone_closed_on_exception(self):
+        tracer = Tracer()
+        track = tracer.create_track("source")
+        with self.assertRaises(ValueError):
+            with track.zone("outer"):
+                raise ValueError()
+        with track.zone("after"):
+            pass
+
+        self.assertEqual([x["name"] for x in self.get_spans(tracer)], ["outer", "after"])
+
+    async def test_ring(self):
+        tracer = Tracer()
+        track = tracer.create_track("source", capacity=4)
+        for i in range(10):
+            with track.zone(str(i)):
+                pass
+
+        self.assertEqual(track.get_count(), 10)
+        self.assertEqual([x["name"] for x in self.get_spans(tracer)], ["6", "7", "8", "9"])
+
+    async def test_not_recording(self):
+        tracer = Tracer(recording=False)
+        track = tracer.create_track("source")
+        with track.zone("zone"):
+            pass
+        self.assertEqual(len(self.get_spans(tracer)), 0)
+
+    async def test_dump(self):
+        tracer = Tracer()
+        for name in ["source A", "source B"]:
+            with tracer.create_track(name).zone("zone"):
+                pass
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "trace.json")
+            tracer.dump(path)
+            with open(path) as file:
+                trace = json.load(file)
+
+        names = [x["args"]["name"] for x in trace["traceEvents"] if x["ph"] == "M"]
+        self.assertEqual(names, ["source A", "source B"])
+        self.assertEqual(len({x["tid"] for x in trace["traceEvents"] if x["ph"] == "X"}), 2)
+
+    async def test_closed_tracks_dropped(self):
+        tracer = Tracer()
+        running = [tracer.create_track(f"running {i}") for i in range(Tracer.MAX_TRACKS)]
+        closed = tracer.create_track("closed")
+        closed.close()
+        tracer.create_track("new")
+
+        names = [x["args"]["name"] for x in tracer.to_chrome_trace()["traceEvents"] if x["ph"] == "M"]
+        self.assertEqual(names, [x.get_name() for x in running] + ["new"])
+
+        tracer.create_track("more")  # Nothing closed left to drop, running streams keep their track
+        names = [x["args"]["name"] for x in tracer.to_chrome_trace()["traceEvents"] if x["ph"] == "M"]
+        self.assertEqual(len(names), Tracer.MAX_TRACKS + 2)
@@ -98,6 +98,23 @@ class UITestsPanel(omni.kit.test.AsyncTestCase):
         binding, _, _ = panel.widget._get_data()
         self.assertFalse(binding.lowbandwidth)
 
+    async def test_low_latency_btn(self):
+        await refresh_dynamic_list(self._window)
+
+        button = self._window.find(f"**/Button[*].text=='{Window.NEW_TEXTURE_BTN_TXT}'")
+        await button.click()
+
+        panel = self._window.find("**/BindingPanel[*]")
+        binding, _, _ = panel.widget._get_data()
+        self.assertFalse(binding.lowlatency)
+        button = panel.find(f"**/ToolButton[*].name=='{BindingPanel.LATENCY_BTN_NAME}'")
+        await button.click()
+        binding, _, _ = panel.widget._get_data()
+        self.assertTrue(binding.lowlatency)
+        await button.click()
+        binding, _, _ = panel.widget._get_data()
+        self.assertFalse(binding.lowlatency)
+
     async def test_low_bandwidth_stream(self):
         await refresh_dynamic_list(self._window)
         add_proxy_source(self._window.widget)
@@ -106,7 +123,7 @@ class UITestsPanel(omni.kit.test.AsyncTestCase):
         await button.click()
 
         combobox = self._window.find("**/ComboBox[*]")
-        combobox.widget.model._set_current_from_value(ComboboxModel.PROXY_VALUE)
+        combobox.widget.model.set_current_value(ComboboxModel.PROXY_VALUE)
 
         panel = self._window.find("**/BindingPanel[*]")
         button_bandwidth = panel.find(f"**/ToolButton[*].name=='{BindingPanel.BANDWIDTH_BTN_NAME}'")
@@ -133,7 +150,7 @@ class UITestsPanel(omni.kit.test.AsyncTestCase):
         await button_create.click()
 
         combobox = self._window.find("**/ComboBox[*]")
-        combobox.widget.model._set_current_from_value(ComboboxModel.PROXY_VALUE)
+        combobox.widget.model.set_current_value(ComboboxModel.PROXY_VALUE)
 
         panel = self._window.find("**/BindingPanel[*]")
         button_playpause = panel.find(f"**/Button[*].name=='{BindingPanel.PLAYPAUSE_BTN_NAME}'")
@@ -161,7 +178,7 @@ class UITestsPanel(omni.kit.test.AsyncTestCase):
 
         comboboxes = self._window.find_all("**/ComboBox[*]")
         for combobox in comboboxes:
-            combobox.widget.model._set_current_from_value(ComboboxModel.PROXY_VALUE)
+            combobox.widget.model.set_current_value(ComboboxModel.PROXY_VALUE)
 
         buttons_playpause = self._window.find_all(f"**/Button[*].name=='{BindingPanel.PLAYPAUSE_BTN_NAME}'")
         for button_playpause in buttons_playpause:
@@ -177,3 +194,95 @@ class UITestsPanel(omni.kit.test.AsyncTestCase):
         for panel in panels:
             self.assertTrue(panel.widget._combobox_ui.visible)
             self.assertFalse(panel.widget._combobox_alt.visible)
+
+    async def test_proxy_start_all(self):
+        await refresh_dynamic_list(self._window)
+
+        field = self._window.find("**/StringField[*]")
+        button_create = self._window.find(f"**/Button[*].text=='{Window.NEW_TEXTURE_BTN_TXT}'")
+
+        field.widget.model.set_value(DYNAMIC_ID1)
+        await button_create.click()
+        field.widget.model.set_value(DYNAMIC_ID2)
+        await button_create.click()
+
+        comboboxes = self._window.find_all("**/ComboBox[*]")
+        comboboxes[0].widget.model.set_current_value(ComboboxModel.PROXY_VALUE)
+
+        # The proxy starts right away, the binding without source resolves to False without connecting
+        button_startall = self._window.find(f"**/Button[*].text=='{Window.START_STREAMS_BTN_TXT}'")
+        await button_startall.click()
+        self.assertEquals(len(self._window.widget._model._ndi._streams), 1)
+
+        panels = self._window.find_all("**/BindingPanel[*]")
+        self.assertFalse(panels[0].widget.is_stopped())
+        self.assertTrue(panels[1].widget.is_stopped())
+        self.assertTrue(panels[1].widget._combobox_ui.visible)
+
+        button_stopall = self._window.find(f"**/Button[*].text=='{Window.STOP_STREAMS_BTN_TXT}'")
+        await button_stopall.click()
+        self.assertEquals(len(self._window.widget._model._ndi._streams), 0)
+        self.assertTrue(panels[0].widget.is_stopped())
+
+    async def test_proxy_standby(self):
+        await refresh_dynamic_list(self._window)
+        add_proxy_source(self._window.widget)
+
+        button_create = self._window.find(f"**/Button[*].text=='{Window.NEW_TEXTURE_BTN_TXT}'")
+        await button_create.click()
+
+        model = self._window.widget._model
+        binding, _, _ = model.get_binding_data_from_index(0)
+        self.assertFalse(model.add_standby(binding, ComboboxModel.PROXY_VALUE).result())
+        self.assertEquals(len(model.get_standbys(binding.dynamic_id)), 0)
+
+        # Without a standby the switch restarts the stream, the proxy starts right away
+        self.assertTrue(model.switch_stream(binding, ComboboxModel.PROXY_VALUE, False).result())
+        self.assertTrue(model.is_stream_playing(binding.dynamic_id))
+        model.stop_stream(binding)
+        self.assertFalse(model.is_stream_playing(binding.dynamic_id))
+
+    async def test_switch_to_missing_source(self):
+        await refresh_dynamic_list(self._window)
+        add_proxy_source(self._window.widget)
+
+        button_create = self._window.find(f"**/Button[*].text=='{Window.NEW_TEXTURE_BTN_TXT}'")
+        await button_create.click()
+
+        combobox = self._window.find("**/ComboBox[*]")
+        self.assertTrue(combobox.widget.model.set_current_value(ComboboxModel.PROXY_VALUE))
+        self.assertFalse(combobox.widget.model.set_current_value("missing source"))
+
+        # A source that isn't in the combobox is bound as is, not replaced by NONE
+        panel = self._window.find("**/BindingPanel[*]")
+        panel.widget._switch_source("missing source")
+        self.assertEquals(panel.widget.get_binding().ndi_source, "missing source")
+        panel.widget._window.stop_stream(panel.widget.get_binding())
+
+    async def test_proxy_survives_discovery(self):
+        await refresh_dynamic_list(self._window)
+        add_proxy_source(self._window.widget)
+
+        field = self._window.find("**/StringField[*]")
+        button_create = self._window.find(f"**/Button[*].text=='{Window.NEW_TEXTURE_BTN_TXT}'")
+        field.widget.model.set_value(DYNAMIC_ID1)
+        await button_create.click()
+
+        combobox = self._window.find("**/ComboBox[*]")
+        combobox.widget.model.set_current_value(ComboboxModel.PROXY_VALUE)
+        button_playpause = self._window.find(f"**/Button[*].name=='{BindingPanel.PLAYPAUSE_BTN_NAME}'")
+        await button_playpause.click()
+        stream = self._window.widget._model._ndi._streams[0]
+
+        # Neither discovering nor creating another texture restarts the stream, the rebuilt panel shows it playing
+        field.widget.model.set_value(DYNAMIC_ID2)
+        await button_create.click()
+        await refresh_dynamic_list(self._window)
+        self.assertEquals(self._window.widget._model._ndi._streams, [stream])
+
+        panel = next(x for x in self._window.find_all("**/BindingPanel[*]") if x.widget.get_dynamic_id() == DYNAMIC_ID1)
+        self.assertFalse(panel.widget.is_stopped())
+        self.assertFalse(panel.widget._combobox_ui.visible)
+
+        button_stopall = self._window.find(f"**/Button[*].text=='{Window.STOP_STREAMS_BTN_TXT}'")
+        await button_stopall.click()
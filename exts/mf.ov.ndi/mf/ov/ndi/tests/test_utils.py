@@ -67,4 +67,4 @@ async def refresh_dynamic_list(window):
 
 
 def add_proxy_source(window):
-    EventSystem.send_event(EventSystem.NDIFINDER_NEW_SOURCES, payload={"sources": [ComboboxModel.PROXY_VALUE]})
+    EventSystem.send_event(EventSystem.NDIFINDER_NEW_SOURCES, payload={"added": [ComboboxModel.PROXY_VALUE]})
@@ -0,0 +1,160 @@
+import carb.profiler
+import json
+import numpy as np
+import os
+import threading
+import time
+from typing import Dict, List
+
+
+class TraceZone():
+    """Context manager of a single zone, reused by the track so entering a zone doesn't allocate."""
+    def __init__(self, track: "TraceTrack"):
+        self._track = track
+        self.name: str = None
+
+    def __enter__(self):
+        self._track.begin(self.name)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._track.end()
+
+
+class TraceTrack():
+    """
+    Spans of a single stream, kept in a fixed size ring where the newest spans overwrite the oldest.
+
+    Zones are closed in the reverse order they were opened, so nesting is always correct, and are forwarded to
+    carb.profiler as well. A stream is only ever serviced by one thread at a time, the track isn't thread safe.
+    """
+    CAPACITY = 8192  # spans, a few seconds of a 60 fps stream
+    PROFILER_MASK = 1
+
+    def __init__(self, tracer: "Tracer", name: str, capacity: int = CAPACITY):
+        self._tracer = tracer
+        self._name = name
+        self._capacity = capacity
+        self._names: List[str] = [None] * capacity
+        self._starts = np.zeros(capacity)  # seconds since the tracer was created
+        self._durations = np.zeros(capacity)
+        self._threads = np.zeros(capacity, dtype=np.int64)
+        self._count = 0
+        self._closed = False
+
+        self._stack_names: List[str] = []
+        self._stack_starts: List[float] = []
+        self._zones: List[TraceZone] = []
+
+    def get_name(self) -> str:
+        return self._name
+
+    def close(self):
+        """The stream was destroyed, the tracer may drop the track once it has too many."""
+        self._closed = True
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def zone(self, name: str) -> TraceZone:
+        """`with track.zone("Omniverse NDI®::step"):`, zones can be nested."""
+        depth = len(self._stack_names)
+        if depth == len(self._zones):
+            self._zones.append(TraceZone(self))
+        zone = self._zones[depth]
+        zone.name = name
+        return zone
+
+    def begin(self, name: str):
+        carb.profiler.begin(TraceTrack.PROFILER_MASK, name)
+        self._stack_names.append(name)
+        self._stack_starts.append(time.perf_counter())
+
+    def end(self):
+        end = time.perf_counter()
+        carb.profiler.end(TraceTrack.PROFILER_MASK)
+        name = self._stack_names.pop()
+        start = self._stack_starts.pop()
+        if not self._tracer.is_recording():
+            return
+
+        index = self._count % self._capacity
+        self._names[index] = name
+        self._starts[index] = start - self._tracer.get_epoch()
+        self._durations[index] = end - start
+        self._threads[index] = threading.get_ident()
+        self._count += 1
+
+    def get_count(self) -> int:
+        return self._count
+
+    def to_events(self, pid: int, tid: int) -> List[Dict[str, object]]:
+        """Chrome trace complete events, oldest first. Copied from another thread, the newest span may be torn."""
+        count = min(self._count, self._capacity)
+        first = self._count - count
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": self._name}}]
+        for i in range(first, first + count):
+            index = i % self._capacity
+            events.append({
+                "name": self._names[index],
+                "cat": "mf.ov.ndi",
+                "ph": "X",
+                "ts": self._starts[index] * 1e6,
+                "dur": self._durations[index] * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": {"thread": int(self._threads[index])},
+            })
+        return events
+
+
+class Tracer():
+    """
+    Owns a TraceTrack per stream and dumps them as Chrome trace JSON, which chrome://tracing and Perfetto open.
+
+    Each stream gets its own track, the thread that serviced a span is kept in its arguments.
+    """
+    MAX_TRACKS = 64  # tracks of stopped streams are kept for the next dump until there are more than this
+
+    def __init__(self, recording: bool = True):
+        self._recording = recording
+        self._epoch = time.perf_counter()
+        self._lock = threading.Lock()
+        self._tracks: List[TraceTrack] = []
+
+    def is_recording(self) -> bool:
+        return self._recording
+
+    def set_recording(self, recording: bool):
+        self._recording = recording
+
+    def get_epoch(self) -> float:
+        return self._epoch
+
+    def create_track(self, name: str, capacity: int = TraceTrack.CAPACITY) -> TraceTrack:
+        track = TraceTrack(self, name, capacity)
+        with self._lock:
+            self._tracks.append(track)
+            excess = len(self._tracks) - Tracer.MAX_TRACKS
+            if excess > 0:
+                # Tracks of running streams are never dropped, only the oldest closed ones
+                closed = [x for x in self._tracks if x.is_closed()][:excess]
+                self._tracks = [x for x in self._tracks if x not in closed]
+        return track
+
+    def clear(self):
+        with self._lock:
+            self._tracks.clear()
+
+    def to_chrome_trace(self) -> Dict[str, object]:
+        with self._lock:
+            tracks = list(self._tracks)
+
+        pid = os.getpid()
+        events = []
+        for tid, track in enumerate(tracks):
+            events.extend(track.to_events(pid, tid))
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
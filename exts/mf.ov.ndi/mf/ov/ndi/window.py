@@ -6,10 +6,16 @@ from .USDtools import USDtools
 
 import asyncio
 import carb.events
+import carb.settings
+import carb.tokens
+from concurrent.futures import Future
+import logging
 import omni.ui as ui
 import omni.kit.app
+import os
 import pyperclip
-from typing import List
+import time
+from typing import Dict, List
 
 
 class Window(ui.Window):
@@ -18,12 +24,24 @@ class Window(ui.Window):
     DEFAULT_TEXTURE_NAME = "myDynamicMaterial"
     NEW_TEXTURE_BTN_TXT = "Create Dynamic Texture"
     DISCOVER_TEX_BTN_TXT = "Discover Dynamic Textures"
+    START_STREAMS_BTN_TXT = "Start all streams"
     STOP_STREAMS_BTN_TXT = "Stop all streams"
+    SAVE_TRACE_BTN_TXT = "Save trace"
+    SAVE_TRACE_TOOLTIP_TXT = "Save the recent spans of every stream as Chrome trace JSON in the logs folder"
+    TRACING_OFF_TOOLTIP_TXT = "Tracing is off, turn on the /exts/mf.ov.ndi/tracing setting to record spans"
     EMPTY_TEXTURE_LIST_TXT = "No dynamic texture found"
 
+    SETTING_STATS_REFRESH_RATE = "/exts/mf.ov.ndi/statsRefreshRate"
+    DEFAULT_STATS_REFRESH_RATE = 10.0  # Hz
+
     def __init__(self, delegate=None, **kwargs):
         self._model: Model = Model()
-        self._bindingPanels: List[BindingPanel] = []
+        self._bindingPanels: Dict[str, BindingPanel] = {}  # dynamic id -> panel, in the order of the bindings
+        self._panelFrames: Dict[str, ui.Frame] = {}  # dynamic id -> frame holding its panel
+        self._bindingsStack: ui.VStack = None
+        self._emptyLabel: ui.Label = None
+        self._saveTraceButton: ui.Button = None
+        self._next_stats_refresh = 0.0
 
         self._last_material_name = Window.DEFAULT_TEXTURE_NAME
 
@@ -34,7 +52,7 @@ class Window(ui.Window):
         self._model.search_for_dynamic_material()
 
     def destroy(self):
-        for panel in self._bindingPanels:
+        for panel in self._bindingPanels.values():
             panel.destroy()
         self._model.destroy()
         self._unsubscribe()
@@ -50,7 +68,13 @@ class Window(ui.Window):
                                                self._ndi_status_change_evt_callback))
         self._sub.append(EventSystem.subscribe(EventSystem.STREAM_STOP_TIMEOUT_EVENT,
                                                self._stream_stop_timeout_evt_callback))
+        self._sub.append(EventSystem.subscribe(EventSystem.STANDBYS_CHANGED_EVENT,
+                                               self._standbys_changed_evt_callback))
+        self._sub.append(EventSystem.subscribe(EventSystem.TRACING_CHANGED_EVENT,
+                                               self._tracing_changed_evt_callback))
         self._sub.append(USDtools.subscribe_to_stage_events(self._stage_event_evt_callback))
+        self._sub.append(omni.kit.app.get_app().get_update_event_stream().create_subscription_to_pop(
+            self._update_evt_callback, name="mf.ov.ndi stats"))
 
     def _unsubscribe(self):
         for sub in self._sub:
@@ -65,30 +89,49 @@ class Window(ui.Window):
 
 # region events callback
     def _bindings_updated_evt_callback(self, e: carb.events.IEvent):
-        self.frame.rebuild()
+        # Only the panels of the bindings that changed are touched, until the bindings section is built there's none
+        if self._bindingsStack is None:
+            return
+        for dynamic_id in e.payload.get("removed", []):
+            self._remove_panel(dynamic_id)
+        for dynamic_id in e.payload.get("changed", []):
+            panel: BindingPanel = self._bindingPanels.get(dynamic_id, None)
+            if panel is not None:
+                panel.on_binding_changed()
+        for dynamic_id in e.payload.get("added", []):
+            self._add_panel(dynamic_id)
+        self._emptyLabel.visible = len(self._bindingPanels) == 0
 
     def _combobox_changed_evt_callback(self, e: carb.events.IEvent):
         value: str = e.payload["value"]
         dynamic_id = e.payload["id"]
-        panel_index = e.payload["index"]
 
-        self._model.apply_new_binding_source(dynamic_id, value)
-        self._model.set_ndi_source_prim_attr(dynamic_id, value)
+        self.apply_source_value(dynamic_id, value)
 
-        if (len(self._bindingPanels) > panel_index):
-            self._bindingPanels[panel_index].combobox_item_changed()
+        panel: BindingPanel = self._bindingPanels.get(dynamic_id, None)
+        if panel is not None:
+            panel.combobox_item_changed()
 
     def _ndi_sources_changed_evt_callback(self, e: carb.events.IEvent):
-        for panel in self._bindingPanels:
+        for panel in self._bindingPanels.values():
             panel.combobox_items_changed(e.payload["sources"])
 
     def _ndi_status_change_evt_callback(self, e: carb.events.IEvent):
-        for panel in self._bindingPanels:
+        for panel in self._bindingPanels.values():
             panel.check_for_ndi_status()
 
     def _stream_stop_timeout_evt_callback(self, e: carb.events.IEvent):
-        panel: BindingPanel = next(x for x in self._bindingPanels if x.get_dynamic_id() == e.payload["dynamic_id"])
-        panel.on_stop_stream()
+        panel: BindingPanel = self._bindingPanels.get(e.payload["dynamic_id"], None)
+        if panel is not None:
+            panel.on_stop_stream()
+
+    def _standbys_changed_evt_callback(self, e: carb.events.IEvent):
+        panel: BindingPanel = self._bindingPanels.get(e.payload["dynamic_id"], None)
+        if panel is not None:
+            panel.update_standby_button()
+
+    def _tracing_changed_evt_callback(self, e: carb.events.IEvent):
+        self._update_save_trace_button()
 
     def _stage_event_evt_callback(self, e: carb.events.IEvent):
         if USDtools.is_StageEventType_OPENED(e.type):
@@ -96,7 +139,19 @@ class Window(ui.Window):
             self._model.stop_all_streams()
 
         if USDtools.is_StageEventType_CLOSE(e.type):
+            self._model.stop_watching_stage()
             self._model.stop_all_streams()
+
+    def _update_evt_callback(self, e: carb.events.IEvent):
+        # Streams only publish their statistics, they are pulled here at a fixed rate for the open info windows
+        now = time.monotonic()
+        if now < self._next_stats_refresh:
+            return
+        rate = carb.settings.get_settings().get(Window.SETTING_STATS_REFRESH_RATE) or Window.DEFAULT_STATS_REFRESH_RATE
+        self._next_stats_refresh = now + 1.0 / rate
+        for panel in self._bindingPanels.values():
+            if panel.has_info_window():
+                panel.refresh_stats()
 # endregion
 
 # region UI
@@ -112,53 +167,142 @@ class Window(ui.Window):
         with ui.HStack(height=0):
             ui.Button(Window.DISCOVER_TEX_BTN_TXT, image_url="resources/glyphs/menu_refresh.svg", image_width=24,
                       style=button_style, clicked_fn=self._on_click_refresh_materials)
+            ui.Button(Window.START_STREAMS_BTN_TXT, clicked_fn=self._on_click_start_all_streams)
             ui.Button(Window.STOP_STREAMS_BTN_TXT, clicked_fn=self._on_click_stop_all_streams)
+            self._saveTraceButton = ui.Button(Window.SAVE_TRACE_BTN_TXT, width=0, clicked_fn=self._on_click_save_trace)
+            self._update_save_trace_button()
+
+    def _update_save_trace_button(self):
+        if self._saveTraceButton is None:
+            return
+        tracing = self._model.is_tracing()
+        self._saveTraceButton.enabled = tracing
+        self._saveTraceButton.tooltip = Window.SAVE_TRACE_TOOLTIP_TXT if tracing else Window.TRACING_OFF_TOOLTIP_TXT
 
     def _ui_section_bindings(self):
-        self._bindingPanels = []
+        for panel in self._bindingPanels.values():
+            panel.destroy()
+        self._bindingPanels = {}
+        self._panelFrames = {}
         with ui.ScrollingFrame():
-            with ui.VStack():
-                count: int = self._model.get_bindings_count()
-                if count == 0:
-                    ui.Label(Window.EMPTY_TEXTURE_LIST_TXT)
-                else:
-                    for i in range(count):
-                        self._bindingPanels.append(BindingPanel(i, self, height=0))
+            self._bindingsStack = ui.VStack()
+            with self._bindingsStack:
+                self._emptyLabel = ui.Label(Window.EMPTY_TEXTURE_LIST_TXT)
+            for dynamic_id in self._model.get_binding_ids():
+                self._add_panel(dynamic_id)
+            self._emptyLabel.visible = len(self._bindingPanels) == 0
+
+    def _add_panel(self, dynamic_id: str):
+        # Each panel lives in its own frame, so it can be detached from the stack without rebuilding the others
+        with self._bindingsStack:
+            frame = ui.Frame(height=0)
+        with frame:
+            self._bindingPanels[dynamic_id] = BindingPanel(dynamic_id, self, height=0)
+        self._panelFrames[dynamic_id] = frame
+
+    def _remove_panel(self, dynamic_id: str):
+        panel: BindingPanel = self._bindingPanels.pop(dynamic_id, None)
+        if panel is not None:
+            panel.destroy()
+        frame: ui.Frame = self._panelFrames.pop(dynamic_id, None)
+        if frame is not None:
+            frame.clear()
+            # The stack keeps its children until cleared, the remaining frames are attached again in their order
+            self._bindingsStack.clear()
+            self._bindingsStack.add_child(self._emptyLabel)
+            for remaining in self._panelFrames.values():
+                self._bindingsStack.add_child(remaining)
+            frame.destroy()
 # endregion
 
 # region controls
     def _on_click_create_dynamic_material(self):
-        self._stop_all_streams()
         name: str = self._dynamic_name.model.get_value_as_string()
         self._last_material_name = name
         self._model.create_dynamic_material(name)
 
     def _on_click_refresh_materials(self):
-        self._stop_all_streams()
         self._model.search_for_dynamic_material()
 
+    def _on_click_start_all_streams(self):
+        panels = [x for x in self._bindingPanels.values() if x.is_stopped()]
+        bindings = [(x.get_binding(), x.get_lowbandwidth_value()) for x in panels]
+        futures = self._model.start_streams_async(bindings)
+        for panel, future in zip(panels, futures):
+            panel.on_start_pending(future)
+
     def _on_click_stop_all_streams(self):
         self._stop_all_streams()
 
+    def _on_click_save_trace(self):
+        if not self._model.is_tracing():
+            logger = logging.getLogger(__name__)
+            logger.warning(Window.TRACING_OFF_TOOLTIP_TXT)
+            return
+        folder = carb.tokens.get_tokens_interface().resolve("${logs}")
+        path = os.path.join(folder, f"mf.ov.ndi-trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        self._model.dump_trace(path)
+        logger = logging.getLogger(__name__)
+        logger.info(f"NDI® trace saved to {path}")
+
     def _stop_all_streams(self):
         self._model.stop_all_streams()
-        for panel in self._bindingPanels:
+        for panel in self._bindingPanels.values():
             panel.on_stop_stream()
 # endregion
 
 # region BindingPanel Callable
-    def get_binding_data_from_index(self, index: int):
-        return self._model.get_binding_data_from_index(index)
+    def get_binding_data(self, dynamic_id: str):
+        return self._model.get_binding_data(dynamic_id)
 
     def get_choices_for_combobox(self) -> List[str]:
         return self._model.get_ndi_source_list()
 
+    def apply_source_value(self, dynamic_id: str, value: str):
+        self._model.apply_new_binding_source(dynamic_id, value)
+        self._model.set_ndi_source_prim_attr(dynamic_id, value)
+
     def apply_lowbandwidth_value(self, dynamic_id: str, value: bool):
         self._model.apply_lowbandwidth_value(dynamic_id, value)
         self._model.set_lowbandwidth_prim_attr(dynamic_id, value)
 
-    def try_add_stream(self, binding: Binding, lowbandwidth: bool, update_fps_fn, update_dimensions_fn) -> bool:
-        return self._model.try_add_stream(binding, lowbandwidth, update_fps_fn, update_dimensions_fn)
+    def apply_lowlatency_value(self, dynamic_id: str, value: bool):
+        self._model.apply_lowlatency_value(dynamic_id, value)
+        self._model.set_lowlatency_prim_attr(dynamic_id, value)
+
+    def apply_maxfps_value(self, dynamic_id: str, value: float):
+        self._model.apply_maxfps_value(dynamic_id, value)
+        self._model.set_maxfps_prim_attr(dynamic_id, value)
+
+    def try_add_stream(self, binding: Binding, lowbandwidth: bool) -> bool:
+        return self._model.try_add_stream(binding, lowbandwidth)
+
+    def start_stream_async(self, binding: Binding, lowbandwidth: bool) -> Future:
+        return self._model.start_stream_async(binding, lowbandwidth)
+
+    def switch_stream(self, binding: Binding, ndi_source: str, lowbandwidth: bool) -> Future:
+        return self._model.switch_stream(binding, ndi_source, lowbandwidth)
+
+    def is_stream_playing(self, dynamic_id: str) -> bool:
+        return self._model.is_stream_playing(dynamic_id)
+
+    def get_pending_start(self, dynamic_id: str) -> Future:
+        return self._model.get_pending_start(dynamic_id)
+
+    def add_standby(self, binding: Binding, ndi_source: str) -> Future:
+        return self._model.add_standby(binding, ndi_source)
+
+    def remove_standby(self, binding: Binding, ndi_source: str):
+        self._model.remove_standby(binding, ndi_source)
+
+    def get_standbys(self, dynamic_id: str) -> Dict[str, bool]:
+        return self._model.get_standbys(dynamic_id)
+
+    def get_stream_stats(self, dynamic_id: str) -> dict:
+        return self._model.get_stream_stats(dynamic_id)
+
+    def get_stream_telemetry(self, dynamic_id: str) -> dict:
+        return self._model.get_stream_telemetry(dynamic_id)
 
     def stop_stream(self, binding: Binding):
         return self._model.stop_stream(binding)
@@ -170,27 +314,40 @@ class BindingPanel(ui.CollapsableFrame):
     NDI_COLOR_PLAYING = "#78B159"
     NDI_COLOR_WARNING = "#F4900C"
     NDI_COLOR_INACTIVE = "#DD2E45"
+    NDI_COLOR_CONNECTING = "#55ACEE"
 
     NDI_STATUS = "resources/glyphs/circle.svg"
     PLAY_ICON = "resources/glyphs/timeline_play.svg"
     PAUSE_ICON = "resources/glyphs/toolbar_pause.svg"
     COPY_ICON = "resources/glyphs/copy.svg"
     LOW_BANDWIDTH_ICON = "resources/glyphs/AOV_dark.svg"
+    LOW_LATENCY_TXT = "LL"
+    STANDBY_TXT = "SB"
 
     PLAYPAUSE_BTN_NAME = "play_pause_btn"
     BANDWIDTH_BTN_NAME = "low_bandwidth_btn"
+    LATENCY_BTN_NAME = "low_latency_btn"
     COPYPATH_BTN_NAME = "copy_path_btn"
+    MAXFPS_FIELD_NAME = "max_fps_field"
+    STANDBY_BTN_NAME = "standby_btn"
 
     RUNNING_LABEL_SUFFIX = " - running"
+    CONNECTING_LABEL_SUFFIX = " - connecting"
+    HIGH_BANDWIDTH_FAILED_TXT = "High bandwidth stream could not start, playing the low bandwidth standby"
 
-    def __init__(self, index: int, window: Window, **kwargs):
-        self._index = index
+    def __init__(self, dynamic_id: str, window: Window, **kwargs):
+        self._dynamic_id = dynamic_id
         self._window = window
         binding, _, ndi = self._get_data()
         choices = self._get_choices()
-        self._dynamic_id = binding.dynamic_id
         self._lowbandwidth_value = binding.lowbandwidth
+        self._lowlatency_value = binding.lowlatency
+        self._maxfps_value = binding.max_fps
         self._is_playing = False
+        self._is_connecting = False
+        self._pending_start: Future = None  # Only the latest start of the panel updates it
+        self._stream_error: str = None  # Shown on the status icon while the stream plays
+        self._standby_menu: ui.Menu = None
 
         super().__init__(binding.dynamic_id, **kwargs)
 
@@ -206,7 +363,7 @@ class BindingPanel(ui.CollapsableFrame):
                 self._set_combobox_alt_text(binding.ndi_source)
                 self._combobox_alt.visible = False
 
-                self._combobox = ComboboxModel(choices, binding.ndi_source, binding.dynamic_id, self._index)
+                self._combobox = ComboboxModel(choices, binding.ndi_source, binding.dynamic_id)
                 self._combobox_ui = ui.ComboBox(self._combobox)
 
                 self.play_pause_toolbutton = ui.Button(text="", image_url=BindingPanel.PLAY_ICON, height=30,
@@ -217,10 +374,33 @@ class BindingPanel(ui.CollapsableFrame):
                                                               clicked_fn=self._set_low_bandwidth_value,
                                                               name=BindingPanel.BANDWIDTH_BTN_NAME)
                 self._lowbandwidth_toolbutton.model.set_value(self._lowbandwidth_value)
+                self._lowlatency_toolbutton = ui.ToolButton(text=BindingPanel.LOW_LATENCY_TXT, width=30, height=30,
+                                                            tooltip="Low latency mode (only show the newest frame)",
+                                                            clicked_fn=self._set_low_latency_value,
+                                                            name=BindingPanel.LATENCY_BTN_NAME)
+                self._lowlatency_toolbutton.model.set_value(self._lowlatency_value)
+                self._standby_button = ui.Button(BindingPanel.STANDBY_TXT, width=30, height=30,
+                                                 tooltip="Standby sources, kept connected to switch to them instantly",
+                                                 clicked_fn=self._on_click_standby, name=BindingPanel.STANDBY_BTN_NAME)
+                # Can be changed while playing, 0 means every received frame is uploaded
+                self._maxfps_field = ui.FloatField(width=40, height=30, tooltip="Max uploaded fps (0 = unlimited)",
+                                                   name=BindingPanel.MAXFPS_FIELD_NAME)
+                self._maxfps_field.model.set_value(self._maxfps_value)
+                self._maxfps_field.model.add_end_edit_fn(self._set_max_fps_value)
                 ui.Button("", image_url=BindingPanel.COPY_ICON, width=30, height=30, clicked_fn=self._on_click_copy,
                           tooltip="Copy dynamic texture path(dynamic://*)", name=BindingPanel.COPYPATH_BTN_NAME)
 
+        self.update_standby_button()  # Then kept up to date by STANDBYS_CHANGED_EVENT and the standby menu
+        # A panel can be created for a binding whose stream is already running, e.g. when the window is rebuilt
+        pending_start = self._window.get_pending_start(self._dynamic_id)
+        if pending_start is not None:
+            self.on_start_pending(pending_start)
+        elif self._window.is_stream_playing(self._dynamic_id):
+            self._on_play_stream()
+
     def destroy(self):
+        self._pending_start = None
+        self._standby_menu = None
         self._info_window_destroy()
 
     # region Info Window
@@ -229,7 +409,7 @@ class BindingPanel(ui.CollapsableFrame):
             binding, _, _ = self._get_data()
             if not self._info_window:
                 self._info_window = StreamInfoWindow(f"{self._dynamic_id} info", binding.ndi_source,
-                                                     width=280, height=200)
+                                                     width=280, height=280)
                 self._info_window.set_visibility_changed_fn(self._info_window_visibility_changed)
             elif self._info_window:
                 self._info_window_destroy()
@@ -248,13 +428,15 @@ class BindingPanel(ui.CollapsableFrame):
         if self._info_window:
             self._info_window_destroy()
 
-    def update_fps(self, fps_current: float, fps_average: float, fps_expected: float):
-        if self._info_window:
-            self._info_window.set_fps_values(fps_current, fps_average, fps_expected)
+    def has_info_window(self) -> bool:
+        return self._info_window is not None
 
-    def update_details(self, width: int, height: int, color_format: str):
-        if self._info_window:
-            self._info_window.set_stream_details(width, height, color_format)
+    def refresh_stats(self):
+        if not self._info_window or not self._is_playing:
+            return
+        stats = self._window.get_stream_stats(self._dynamic_id)
+        if stats is not None:
+            self._info_window.set_stats(stats, self._window.get_stream_telemetry(self._dynamic_id))
     # endregion
 
     def combobox_items_changed(self, items: List[str]):
@@ -272,11 +454,36 @@ class BindingPanel(ui.CollapsableFrame):
         if self._info_window:
             self._info_window.set_stream_name(binding.ndi_source)
 
+    def on_binding_changed(self):
+        binding, _, _ = self._get_data()
+        self._lowbandwidth_value = binding.lowbandwidth
+        self._lowlatency_value = binding.lowlatency
+        self._maxfps_value = binding.max_fps
+        self._lowbandwidth_toolbutton.model.set_value(self._lowbandwidth_value)
+        self._lowlatency_toolbutton.model.set_value(self._lowlatency_value)
+        self._maxfps_field.model.set_value(self._maxfps_value)
+        self._combobox.set_items_and_current(self._get_choices(), binding.ndi_source)
+        self.combobox_item_changed()
+        # Discovery stops the stream of a binding whose source or mode changed
+        if not self._window.is_stream_playing(self._dynamic_id) and \
+                self._window.get_pending_start(self._dynamic_id) is None:
+            self.on_stop_stream()
+
     def get_dynamic_id(self) -> str:
         return self._dynamic_id
 
+    def get_binding(self) -> Binding:
+        binding, _, _ = self._get_data()
+        return binding
+
+    def get_lowbandwidth_value(self) -> bool:
+        return self._lowbandwidth_value
+
+    def is_stopped(self) -> bool:
+        return not self._is_playing and not self._is_connecting
+
     def _get_data(self):
-        return self._window.get_binding_data_from_index(self._index)
+        return self._window.get_binding_data(self._dynamic_id)
 
     def _get_choices(self):
         return self._window.get_choices_for_combobox()
@@ -288,40 +495,143 @@ class BindingPanel(ui.CollapsableFrame):
         self._lowbandwidth_value = not self._lowbandwidth_value
         self._window.apply_lowbandwidth_value(self._dynamic_id, self._lowbandwidth_value)
 
+    def _set_low_latency_value(self):
+        self._lowlatency_value = not self._lowlatency_value
+        self._window.apply_lowlatency_value(self._dynamic_id, self._lowlatency_value)
+
+    def _set_max_fps_value(self, model: ui.AbstractValueModel):
+        self._maxfps_value = max(model.get_value_as_float(), 0.0)
+        model.set_value(self._maxfps_value)
+        self._window.apply_maxfps_value(self._dynamic_id, self._maxfps_value)
+
+    def on_start_pending(self, future: Future):
+        self._pending_start = future
+        self._stream_error = None
+        if future.done():
+            self._on_stream_started(future)
+            return
+
+        self._is_connecting = True
+        self.play_pause_toolbutton.image_url = BindingPanel.PAUSE_ICON
+        self._lowbandwidth_toolbutton.enabled = False
+        self._lowlatency_toolbutton.enabled = False
+        self._combobox_ui.visible = False
+        self._set_combobox_alt_text(self.get_binding().ndi_source, BindingPanel.CONNECTING_LABEL_SUFFIX)
+        self._combobox_alt.visible = True
+        self.check_for_ndi_status()
+        future.add_done_callback(self._on_stream_started)
+
+    def _on_stream_started(self, future: Future):
+        # Resolved on the main thread by NDItools, a stop or a newer start makes this one stale
+        if future is not self._pending_start:
+            return
+        self._pending_start = None
+        if future.result():
+            self._on_play_stream()
+        else:
+            self.on_stop_stream()
+
     def _on_play_stream(self):
         self._is_playing = True
+        self._is_connecting = False
         self.play_pause_toolbutton.image_url = BindingPanel.PAUSE_ICON
         self._lowbandwidth_toolbutton.enabled = False
+        self._lowlatency_toolbutton.enabled = False
         self._combobox_ui.visible = False
+        self._set_combobox_alt_text(self.get_binding().ndi_source)
         self._combobox_alt.visible = True
         self.check_for_ndi_status()
 
     def on_stop_stream(self):
+        self._stream_error = None
         self._is_playing = False
+        self._is_connecting = False
+        self._pending_start = None
         self.play_pause_toolbutton.image_url = BindingPanel.PLAY_ICON
         self._lowbandwidth_toolbutton.enabled = True
+        self._lowlatency_toolbutton.enabled = True
         self._combobox_ui.visible = True
         self._combobox_alt.visible = False
         self.check_for_ndi_status()
 
     def _on_click_play_pause_ndi(self):
         binding, _, _ = self._get_data()
-        if self._is_playing:
+        if not self.is_stopped():
             self._window.stop_stream(binding)
             self.on_stop_stream()
         else:
-            if self._window.try_add_stream(binding, self._lowbandwidth_value, self.update_fps, self.update_details):
-                self._on_play_stream()
+            self.on_start_pending(self._window.start_stream_async(binding, self._lowbandwidth_value))
+
+    # region Standby
+    def _on_click_standby(self):
+        binding, _, _ = self._get_data()
+        standbys = self._window.get_standbys(self._dynamic_id)
+        excluded = (ComboboxModel.NONE_VALUE, ComboboxModel.PROXY_VALUE, binding.ndi_source)
+
+        self._standby_menu = ui.Menu(BindingPanel.STANDBY_TXT)
+        with self._standby_menu:
+            ui.Separator("Keep connected")
+            for source in [x for x in self._get_choices() if x not in excluded]:
+                ui.MenuItem(source, checkable=True, checked=source in standbys,
+                            triggered_fn=lambda s=source: self._toggle_standby(s))
+            if self._is_playing and len(standbys) > 0:
+                ui.Separator("Switch to")
+                for source, ready in standbys.items():
+                    text = source if ready else f"{source}{BindingPanel.CONNECTING_LABEL_SUFFIX}"
+                    ui.MenuItem(text, triggered_fn=lambda s=source: self._switch_source(s))
+        self._standby_menu.show()
+
+    def _toggle_standby(self, source: str):
+        binding, _, _ = self._get_data()
+        if source in self._window.get_standbys(self._dynamic_id):
+            self._window.remove_standby(binding, source)
+        else:
+            self._window.add_standby(binding, source)
+        self.update_standby_button()
 
-    def _set_combobox_alt_text(self, text: str):
-        self._combobox_alt.text = f"{text}{BindingPanel.RUNNING_LABEL_SUFFIX}"
+    def _switch_source(self, source: str):
+        binding, _, _ = self._get_data()
+        future = self._window.switch_stream(binding, source, self._lowbandwidth_value)
+        # The binding and its prim follow the new source, selecting it in the combobox applies it
+        if not self._combobox.set_current_value(source):
+            # Not discovered anymore, it is bound as is rather than falling back to NONE
+            self._window.apply_source_value(self._dynamic_id, source)
+            self.combobox_item_changed()
+        if not self._window.is_stream_playing(self._dynamic_id):
+            self.on_start_pending(future)  # No standby ready, the stream is restarted
+        else:
+            self._pending_start = future
+            future.add_done_callback(self._on_stream_switched)
+        self.update_standby_button()
+
+    def _on_stream_switched(self, future: Future):
+        # Cut over to a standby, only a failed high bandwidth replacement is left to report
+        if future is not self._pending_start:
+            return
+        self._pending_start = None
+        if not future.result() and self._window.is_stream_playing(self._dynamic_id):
+            self._stream_error = BindingPanel.HIGH_BANDWIDTH_FAILED_TXT
+            self.check_for_ndi_status()
+
+    def update_standby_button(self):
+        count = len(self._window.get_standbys(self._dynamic_id))
+        text = f"{BindingPanel.STANDBY_TXT} {count}" if count > 0 else BindingPanel.STANDBY_TXT
+        if self._standby_button.text != text:
+            self._standby_button.text = text
+    # endregion
+
+    def _set_combobox_alt_text(self, text: str, suffix: str = RUNNING_LABEL_SUFFIX):
+        self._combobox_alt.text = f"{text}{suffix}"
 
     def _set_ndi_status_icon(self, active: bool):
-        if active and self._is_playing:
+        self._status_icon.tooltip = self._stream_error or ""
+        if self._is_connecting:
+            self._status_icon.style = {"color": ui.color(BindingPanel.NDI_COLOR_CONNECTING)}
+        elif active and self._is_playing and self._stream_error is None:
             self._status_icon.style = {"color": ui.color(BindingPanel.NDI_COLOR_PLAYING)}
         elif active and not self._is_playing:
             self._status_icon.style = {"color": ui.color(BindingPanel.NDI_COLOR_STOPPED)}
-        elif not active and self._is_playing:
+        elif self._is_playing:  # not active, or playing with an error
             self._status_icon.style = {"color": ui.color(BindingPanel.NDI_COLOR_WARNING)}
         else:  # not active and not self._is_playing
             self._status_icon.style = {"color": ui.color(BindingPanel.NDI_COLOR_INACTIVE)}
@@ -366,13 +676,71 @@ class StreamInfoWindow(ui.Window):
                 ui.Label("Color format:")
                 self._color_format_model = ui.StringField(enabled=False).model
                 self._color_format_model.set_value("")
+            with ui.HStack():
+                ui.Label("Dropped frames:")
+                self._frames_dropped_model = ui.IntField(enabled=False).model
+                self._frames_dropped_model.set_value(0)
+            with ui.HStack():
+                ui.Label("Torn frames:")
+                self._frames_torn_model = ui.IntField(enabled=False).model
+                self._frames_torn_model.set_value(0)
+            with ui.HStack():
+                ui.Label("Oversized frames:")
+                self._frames_oversized_model = ui.IntField(enabled=False).model
+                self._frames_oversized_model.set_value(0)
+            with ui.HStack():
+                ui.Label("Uploads skipped:")
+                self._uploads_skipped_model = ui.IntField(enabled=False).model
+                self._uploads_skipped_model.set_value(0)
+            with ui.HStack():
+                ui.Label("Unchanged frames:")
+                self._frames_unchanged_model = ui.IntField(enabled=False).model
+                self._frames_unchanged_model.set_value(0)
+            with ui.HStack():
+                ui.Label("Staging hits / misses:")
+                self._staging_hits_model = ui.IntField(enabled=False).model
+                self._staging_hits_model.set_value(0)
+                self._staging_misses_model = ui.IntField(enabled=False).model
+                self._staging_misses_model.set_value(0)
+            with ui.HStack():
+                ui.Label("Staging memory (MB):")
+                self._staging_memory_model = ui.FloatField(enabled=False).model
+                self._staging_memory_model.set_value(0.0)
+            with ui.HStack():
+                ui.Label("Latency p95 (ms):")
+                self._latency_model = ui.FloatField(enabled=False).model
+                self._latency_model.set_value(0.0)
+            with ui.HStack():
+                ui.Label("Jitter p95 (ms):")
+                self._jitter_model = ui.FloatField(enabled=False).model
+                self._jitter_model.set_value(0.0)
 
-    def set_fps_values(self, fps_current: float, fps_average: float, fps_expected: float):
+    def set_stats(self, stats: dict, telemetry: dict = None):
         # If this property exists, all the other do as well since its the last one to be initialized
-        if hasattr(self, "_fps_expected_model"):
-            self._fps_current_model.set_value(fps_current)
-            self._fps_average_model.set_value(fps_average)
-            self._fps_expected_model.set_value(fps_expected)
+        if not hasattr(self, "_jitter_model"):
+            return
+
+        self._fps_current_model.set_value(stats["fps_current"])
+        self._fps_average_model.set_value(stats["fps_average"])
+        self._fps_expected_model.set_value(stats["fps_expected"])
+        self._frames_dropped_model.set_value(stats["frames_dropped"])
+        self._frames_torn_model.set_value(stats["frames_torn"])
+        self._frames_oversized_model.set_value(stats["frames_oversized"])
+        self._uploads_skipped_model.set_value(stats["uploads_skipped"])
+        self._frames_unchanged_model.set_value(stats["frames_unchanged"])
+        self._staging_hits_model.set_value(stats["staging_hits"])
+        self._staging_misses_model.set_value(stats["staging_misses"])
+        self._staging_memory_model.set_value(stats["staging_bytes"] / (1024 * 1024))
+        self._dimensions_width_model.set_value(stats["width"])
+        self._dimensions_height_model.set_value(stats["height"])
+
+        # Original format is similar to FourCCVideoType.FOURCC_VIDEO_TYPE_RGBA, we want to display only "RGBA"
+        color_format_simple = stats["color_format"].split("_")[-1]
+        self._color_format_model.set_value(color_format_simple)
+
+        if telemetry is not None:
+            self._latency_model.set_value((telemetry["latency"]["p95"] or 0.0) * 1000)
+            self._jitter_model.set_value((telemetry["jitter"]["p95"] or 0.0) * 1000)
 
     def set_stream_name(self, name: str):
         # No need to check if attribute exists because no possibility of concurrency between build fn and caller
@@ -385,12 +753,13 @@ class StreamInfoWindow(ui.Window):
         self._dimensions_width_model.set_value(0)
         self._dimensions_height_model.set_value(0)
         self._color_format_model.set_value("")
-
-    def set_stream_details(self, width: int, height: int, color_format: str):
-        if hasattr(self, "_color_format_model"):
-            self._dimensions_width_model.set_value(width)
-            self._dimensions_height_model.set_value(height)
-
-            # Original format is similar to FourCCVideoType.FOURCC_VIDEO_TYPE_RGBA, we want to display only "RGBA"
-            color_format_simple = color_format.split("_")[-1]
-            self._color_format_model.set_value(color_format_simple)
+        self._frames_dropped_model.set_value(0)
+        self._frames_torn_model.set_value(0)
+        self._frames_oversized_model.set_value(0)
+        self._uploads_skipped_model.set_value(0)
+        self._frames_unchanged_model.set_value(0)
+        self._staging_hits_model.set_value(0)
+        self._staging_misses_model.set_value(0)
+        self._staging_memory_model.set_value(0.0)
+        self._latency_model.set_value(0.0)
+        self._jitter_model.set_value(0.0)
@@ -0,0 +1,90 @@
+"""
+Measures BindingsModel on a stage of 5,000 dynamic textures bound over 500 NDI® sources: rebuilding it from the prims,
+the lookups the binding panels and the model do, and source activity updates. Each is compared with the linear scans
+over plain lists the model used to do.
+
+Needs Kit (omni.ui, the event bus), see README.md.
+"""
+import time
+
+import omni.kit.app
+from mf.ov.ndi.bindings import BindingsModel, DynamicPrim
+
+BINDINGS = 5000
+SOURCES = 500
+DELTA = 50  # sources appearing and as many disappearing in a single activity update
+ITERATIONS = 10
+
+
+def bench(fn) -> float:
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+def make_prims():
+    sources = [f"HOST-{i // 8} (Source {i})" for i in range(SOURCES)]
+    prims = [DynamicPrim(f"/World/NDI_Textures/dynamic_{i}", f"dynamic_{i}", sources[i % SOURCES], i % 2 == 0)
+             for i in range(BINDINGS)]
+    return sources, prims
+
+
+def main():
+    sources, prims = make_prims()
+    model = BindingsModel()
+    ids = [x.dynamic_id for x in prims]
+
+    def rebuild():
+        model.update_dynamic_prims(prims)
+
+    def refresh_panels():
+        # What the panels do on a status change, the binding, its prim and the status of its source
+        for i in range(model.count()):
+            model.get(i)
+
+    def refresh_panels_linear():
+        bindings, ndi_sources = model._bindings, model._ndi_sources
+        for binding in bindings:
+            next(x for x in prims if x.dynamic_id == binding.dynamic_id)
+            next(x for x in ndi_sources if x.source == binding.ndi_source)
+
+    def find_prims():
+        for dynamic_id in ids:
+            model.get_prims_with_id(dynamic_id)
+
+    def find_prims_linear():
+        for dynamic_id in ids[::10]:  # Ten times fewer, it would take a while
+            [x for x in prims if x.dynamic_id == dynamic_id]
+
+    toggle = [0]
+
+    def update_sources():
+        toggle[0] = 1 - toggle[0]
+        half = sources[:DELTA], sources[DELTA:2 * DELTA]
+        model.update_ndi_sources(half[toggle[0]], half[1 - toggle[0]])
+
+    def update_sources_linear():
+        ndi_sources = model._ndi_sources
+        for source in sources[:2 * DELTA]:
+            next(x for x in ndi_sources if x.source == source)
+
+    model.update_ndi_sources(sources, [])
+    results = {
+        "rebuild from prims": (bench(rebuild), None),
+        f"{BINDINGS} panel refreshes": (bench(refresh_panels), bench(refresh_panels_linear)),
+        f"{BINDINGS} prim lookups": (bench(find_prims), bench(find_prims_linear) * 10),
+        f"+{DELTA}/-{DELTA} sources update": (bench(update_sources), bench(update_sources_linear)),
+    }
+
+    print(f"BindingsModel, {BINDINGS} bindings, {SOURCES} sources")
+    for name, (indexed, linear) in results.items():
+        reference = f", linear scans {linear:9.2f} ms" if linear is not None else ""
+        print(f"{name:>28}: indexed {indexed:7.2f} ms{reference}")
+
+    model.destroy()
+
+
+main()
+omni.kit.app.get_app().post_quit()
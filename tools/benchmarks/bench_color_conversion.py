@@ -0,0 +1,110 @@
+"""
+Measures the numpy UYVY to RGBA conversion at 1080p and 4K.
+
+With --source, also receives that NDI® source twice, once converted to RGBA by the SDK and once as UYVY converted by
+UYVYConverter, and compares the time spent per frame. Requires numpy, and the NDI® runtime for --source.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+NDI_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "..", "exts", "mf.ov.ndi", "mf", "ov", "ndi")
+sys.path.insert(0, NDI_DIRECTORY)
+from colorConversion import UYVYConverter  # noqa: E402
+
+RESOLUTIONS = {"1080p": (1080, 1920), "4K": (2160, 3840)}
+ITERATIONS = 30
+SOURCE_FRAMES = 120
+
+
+def bench_converter():
+    for name, (height, width) in RESOLUTIONS.items():
+        uyvy = np.random.randint(16, 235, (height, width * 2), dtype=np.uint8)
+        converter = UYVYConverter()
+        converter.convert(uyvy, width, height)  # Allocates the buffers
+
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            converter.convert(uyvy, width, height)
+        elapsed = (time.perf_counter() - start) / ITERATIONS * 1000
+
+        copy = np.empty((height, width, 4), dtype=np.uint8)
+        rgba = np.random.randint(0, 255, (height, width, 4), dtype=np.uint8)
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            np.copyto(copy, rgba)
+        copy_elapsed = (time.perf_counter() - start) / ITERATIONS * 1000
+
+        print(f"{name:>5}: UYVYConverter {elapsed:7.2f} ms/frame, RGBA frame copy {copy_elapsed:6.2f} ms/frame, "
+              f"bytes received {uyvy.nbytes / rgba.nbytes:.0%} of RGBA")
+
+
+def receive(ndi, source, color_format, converter: UYVYConverter = None) -> float:
+    recv_create_desc = ndi.RecvCreateV3()
+    recv_create_desc.color_format = color_format
+    recv_create_desc.bandwidth = ndi.RECV_BANDWIDTH_HIGHEST
+    recv = ndi.recv_create_v3(recv_create_desc)
+    ndi.recv_connect(recv, source)
+
+    frames = 0
+    busy = 0.0
+    while frames < SOURCE_FRAMES:
+        start = time.perf_counter()
+        t, v, a, m = ndi.recv_capture_v2(recv, 1000)
+        if t == ndi.FRAME_TYPE_VIDEO:
+            data = v.data
+            if converter is not None:
+                converter.convert(data, v.xres, v.yres)
+            ndi.recv_free_video_v2(recv, v)
+            busy += time.perf_counter() - start
+            frames += 1
+        elif t == ndi.FRAME_TYPE_AUDIO:
+            ndi.recv_free_audio_v2(recv, a)
+        elif t == ndi.FRAME_TYPE_METADATA:
+            ndi.recv_free_metadata(recv, m)
+
+    ndi.recv_destroy(recv)
+    return busy / frames * 1000
+
+
+def bench_source(name: str):
+    sys.path.insert(0, os.path.join(NDI_DIRECTORY, "deps"))
+    import NDIlib as ndi
+
+    if not ndi.initialize():
+        print("Could not initialize NDI®")
+        return
+    find = ndi.find_create_v2()
+    source = None
+    deadline = time.monotonic() + 5
+    while source is None and time.monotonic() < deadline:
+        ndi.find_wait_for_sources(find, 500)
+        source = next((s for s in ndi.find_get_current_sources(find) if s.ndi_name == name), None)
+
+    if source is None:
+        print(f"Could not find source \"{name}\"")
+    else:
+        # Time includes the wait for the frame, the source must send faster than it is received to compare
+        sdk = receive(ndi, source, ndi.RECV_COLOR_FORMAT_RGBX_RGBA)
+        native = receive(ndi, source, ndi.RECV_COLOR_FORMAT_FASTEST, UYVYConverter())
+        print(f"{name}: SDK RGBA {sdk:.2f} ms/frame, UYVY + UYVYConverter {native:.2f} ms/frame")
+
+    ndi.find_destroy(find)
+    ndi.destroy()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", help="NDI® source name to compare with the SDK conversion")
+    args = parser.parse_args()
+
+    bench_converter()
+    if args.source:
+        bench_source(args.source)
+
+
+if __name__ == "__main__":
+    main()
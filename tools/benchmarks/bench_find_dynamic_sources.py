@@ -0,0 +1,122 @@
+"""
+Measures USDtools.find_all_dynamic_sources on a generated stage of about 200,000 prims: groups of meshes with their
+subsets, materials whose shaders hold a dynamic texture or a regular one, rect lights, a deactivated branch and
+instances. It is compared with the two full traversals the extension used to do, one for the shaders and one for the
+rect lights.
+
+Needs Kit (USD, omni.usd), see README.md.
+"""
+import time
+
+import omni.kit.app
+from mf.ov.ndi.USDtools import USDtools
+from pxr import Sdf, Usd, UsdLux, UsdShade
+
+PRIMS = 200_000
+GROUP_SIZE = 100  # prims per group (99 in practice), a group is an Xform with meshes, a material and a rect light
+DYNAMIC_EVERY = 10  # one material in that many has a dynamic texture
+INACTIVE_GROUPS = 50  # groups below a deactivated Xform
+INSTANCES = 200  # instanceable references to the first active group
+ITERATIONS = 5
+
+
+def bench(fn) -> float:
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+def define(layer: Sdf.Layer, path: str, type_name: str) -> Sdf.PrimSpec:
+    spec = Sdf.CreatePrimInLayer(layer, path)
+    spec.specifier = Sdf.SpecifierDef
+    spec.typeName = type_name
+    return spec
+
+
+def set_asset(spec: Sdf.PrimSpec, name: str, value: str):
+    attr = Sdf.AttributeSpec(spec, name, Sdf.ValueTypeNames.Asset)
+    attr.default = Sdf.AssetPath(value)
+
+
+def make_group(layer: Sdf.Layer, path: str, index: int):
+    define(layer, path, "Xform")
+    meshes = (GROUP_SIZE - 5) // 2
+    for i in range(meshes):
+        define(layer, f"{path}/Mesh_{i}", "Mesh")
+        define(layer, f"{path}/Mesh_{i}/Subset", "GeomSubset")
+
+    define(layer, f"{path}/Looks", "Scope")
+    define(layer, f"{path}/Looks/Material", "Material")
+    shader = define(layer, f"{path}/Looks/Material/Shader", "Shader")
+    texture = f"{USDtools.PREFIX}tex_{index}" if index % DYNAMIC_EVERY == 0 else f"./textures/tex_{index}.png"
+    set_asset(shader, "inputs:diffuse_texture", texture)
+    set_asset(shader, "inputs:emissive_color_texture", texture)
+
+    light = define(layer, f"{path}/Light", "RectLight")
+    set_asset(light, "texture:file", f"{USDtools.PREFIX}light_{index}" if index % DYNAMIC_EVERY == 0 else "")
+
+
+def make_stage() -> Usd.Stage:
+    stage = Usd.Stage.CreateInMemory()
+    layer = stage.GetRootLayer()
+    groups = PRIMS // GROUP_SIZE
+    with Sdf.ChangeBlock():
+        define(layer, "/World", "Xform")
+        define(layer, "/World/Inactive", "Xform").active = False
+        for i in range(groups):
+            parent = "/World/Inactive" if i < INACTIVE_GROUPS else "/World"
+            make_group(layer, f"{parent}/Group_{i}", i)
+        for i in range(INSTANCES):
+            spec = define(layer, f"/World/Instance_{i}", "Xform")
+            spec.instanceable = True
+            spec.referenceList.Prepend(Sdf.Reference(primPath=f"/World/Group_{INACTIVE_GROUPS}"))
+    return stage
+
+
+def find_two_passes(stage: Usd.Stage):
+    # What the extension used to do, materializing every shader and rect light through their schema
+    sources = []
+    result = []
+    shaders = [UsdShade.Shader(x) for x in stage.Traverse() if x.IsA(UsdShade.Shader)]
+    for shader in shaders:
+        albedo = shader.GetInput("diffuse_texture").Get()
+        emissive = shader.GetInput("emissive_color_texture").Get()
+        for value in set([albedo, emissive]):
+            if value and value.path.startswith(USDtools.PREFIX):
+                name = value.path[len(USDtools.PREFIX):]
+                if name not in sources:
+                    sources.append(name)
+                    result.append((shader.GetPrim(), name))
+    lights = [UsdLux.RectLight(x) for x in stage.Traverse() if x.IsA(UsdLux.RectLight)]
+    for light in lights:
+        value = light.GetPrim().GetAttribute("texture:file").Get()
+        if value and value.path.startswith(USDtools.PREFIX):
+            name = value.path[len(USDtools.PREFIX):]
+            if name not in sources:
+                result.append((light.GetPrim(), name))
+    return result
+
+
+def main():
+    start = time.perf_counter()
+    stage = make_stage()
+    generation = (time.perf_counter() - start) * 1000
+    prims = sum(1 for _ in stage.TraverseAll())
+
+    found = len(USDtools.find_all_dynamic_sources(stage))
+    reference = len(find_two_passes(stage))
+    if found != reference:
+        print(f"Mismatch: {found} dynamic textures found, {reference} with two passes")
+
+    single = bench(lambda: USDtools.find_all_dynamic_sources(stage))
+    double = bench(lambda: find_two_passes(stage))
+
+    print(f"find_all_dynamic_sources, {prims} prims generated in {generation:.0f} ms, {found} dynamic textures")
+    print(f"{'single pruned pass':>20}: {single:8.2f} ms")
+    print(f"{'two passes':>20}: {double:8.2f} ms")
+
+
+main()
+omni.kit.app.get_app().post_quit()
@@ -0,0 +1,45 @@
+"""
+Compares allocating a warp array per frame (wp.from_numpy) with uploading into a StagingBufferPool.
+
+Requires numpy and warp-lang. Runs on the warp cpu device, and on cuda when available.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import warp as wp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "exts", "mf.ov.ndi", "mf", "ov", "ndi"))
+from stagingPool import StagingBufferPool  # noqa: E402
+
+RESOLUTIONS = {"1080p": (1080, 1920), "4K": (2160, 3840)}
+ITERATIONS = 50
+
+
+def bench(fn, device: str) -> float:
+    fn()  # Warm up
+    wp.synchronize_device(device)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    wp.synchronize_device(device)
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+def main():
+    wp.init()
+    devices = ["cpu"] + (["cuda"] if wp.is_cuda_available() else [])
+    for device in devices:
+        for name, (height, width) in RESOLUTIONS.items():
+            frame = np.random.randint(0, 255, (height, width, 4), dtype=np.uint8)
+            pool = StagingBufferPool()
+
+            allocate = bench(lambda: wp.from_numpy(frame, dtype=wp.uint8, device=device), device)
+            pooled = bench(lambda: pool.upload(frame, device), device)
+            print(f"{device:>4} {name:>5}: from_numpy {allocate:7.2f} ms, pooled {pooled:7.2f} ms, "
+                  f"pool {pool.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()